@@ -2,7 +2,7 @@ const fs = require('fs');
 const path = require('path');
 
 // Create necessary directories
-const dirs = ['public', 'public/css', 'public/js', 'public/challenges', 'node_modules'];
+const dirs = ['public', 'public/css', 'public/js', 'public/challenges', 'public/other', 'node_modules'];
 
 dirs.forEach(dir => {
   if (!fs.existsSync(dir)) {
@@ -10,14 +10,37 @@ dirs.forEach(dir => {
   }
 });
 
-// Copy challenge files to public directory
+// Files written by the Python publish step (build-index.py --fingerprint or
+// --minify), listed in public/pens.json; copying over them would replace the
+// published pages with the plain sources
+function publishedFiles() {
+  const manifest = path.join(__dirname, 'public', 'pens.json');
+  try {
+    const pens = JSON.parse(fs.readFileSync(manifest, 'utf8')).pens || {};
+    return new Set(Object.values(pens).flatMap(entry => entry.outputs || []));
+  } catch (error) {
+    return new Set();
+  }
+}
+
+// Copy project files to public directory
 function copyChallengeFiles() {
-  const challengesDir = path.join(__dirname, 'challenges');
-  const publicChallengesDir = path.join(__dirname, 'public', 'challenges');
+  const published = publishedFiles();
+  const keepPublished = (src, dest) =>
+    !published.has(path.relative(__dirname, dest).split(path.sep).join('/'));
 
-  if (fs.existsSync(challengesDir)) {
-    fs.cpSync(challengesDir, publicChallengesDir, { recursive: true });
-    console.log('✅ Copied challenge files to public directory');
+  ['challenges', 'other'].forEach(root => {
+    const sourceDir = path.join(__dirname, root);
+    if (fs.existsSync(sourceDir)) {
+      fs.cpSync(sourceDir, path.join(__dirname, 'public', root), {
+        recursive: true,
+        filter: keepPublished,
+      });
+      console.log(`✅ Copied ${root} files to public directory`);
+    }
+  });
+  if (published.size > 0) {
+    console.log(`✅ Kept ${published.size} published files`);
   }
 }
 
@@ -0,0 +1,746 @@
+#!/usr/bin/env python3
+"""Asset build stages for build-index.py.
+
+Every stage follows the same shape: discover sources, skip the ones whose
+manifest entry still matches (stat signature first, content hash second),
+process the rest in a process pool and record the results in a JSON
+manifest next to the outputs. The helpers at the top are shared by the
+stages; the image optimizer lives here too.
+
+Pillow is an optional dependency: stages that need it raise ImportError,
+which the builder reports and skips. The audio stage shells out to ffmpeg
+and skips itself with a warning when it isn't installed.
+"""
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+from pathlib import Path
+
+from file_utils import bytes_digest, file_digest, stat_signature, write_atomic
+
+MANIFEST_VERSION = 1
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif'}
+DEFAULT_WIDTHS = (480, 960, 1920)
+DEFAULT_FORMATS = ('webp', 'avif')
+# Per-variant budget; quality steps down (to 40 at most) until a variant fits
+DEFAULT_MAX_IMAGE_BYTES = 200_000
+
+
+def load_manifest(path, section):
+    """Return the `section` mapping from a stage manifest, or {} if unusable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('version') != MANIFEST_VERSION:
+        return {}
+    return data.get(section, {})
+
+
+def save_manifest(path, section, entries):
+    """Atomically write a stage manifest with sorted keys for stable diffs"""
+    write_atomic(path, json.dumps({'version': MANIFEST_VERSION, section: entries},
+                                  indent=2, sort_keys=True))
+
+
+def run_tasks(func, tasks, jobs=None):
+    """Run func over tasks, in a process pool when that can help, keeping order"""
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            return list(pool.map(func, tasks))
+    return [func(task) for task in tasks]
+
+
+def is_fresh(entry, source, options, base_dir):
+    """Whether a manifest entry still describes source built with options.
+
+    Updates the entry's stat signature in place when only the stat changed.
+    """
+    if not entry or entry.get('options') != options:
+        return False
+    outputs = [base_dir / output for output in entry.get('outputs', [])]
+    if not all(output.exists() for output in outputs):
+        return False
+    signature = stat_signature(source)
+    if entry.get('stat') == signature:
+        return True
+    if entry.get('hash') == file_digest(source):
+        entry['stat'] = signature
+        return True
+    return False
+
+
+def remove_outputs(base_dir, entry):
+    for output in (entry or {}).get('outputs', []):
+        try:
+            (base_dir / output).unlink()
+        except OSError:
+            pass
+
+
+def find_files(root, extensions):
+    """Sorted files under root with one of the given (lowercase) extensions"""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if os.path.splitext(name)[1].lower() in extensions:
+                found.append(Path(dirpath) / name)
+    return found
+
+
+def run_stage(name, sources, options, process, base_dir, manifest_path,
+              make_task, jobs=None):
+    """Shared driver: skip fresh sources, process the rest, update the manifest.
+
+    `make_task(source, rel)` builds the picklable task for `process`, which
+    returns a manifest entry with at least 'outputs'; the driver adds the
+    source hash, stat signature and options.
+    """
+    base_dir = Path(base_dir)
+    manifest = load_manifest(manifest_path, name)
+    entries = {}
+    tasks = []
+    for source in sources:
+        try:
+            rel = source.relative_to(base_dir).as_posix()
+        except ValueError:
+            print(f"⚠️  {name}: skipping {source}, it is outside the repo")
+            continue
+        entry = manifest.get(rel)
+        if is_fresh(entry, source, options, base_dir):
+            entries[rel] = entry
+        else:
+            remove_outputs(base_dir, entry)
+            tasks.append((rel, make_task(source, rel)))
+
+    results = run_tasks(process, [task for _, task in tasks], jobs)
+    failed = 0
+    for (rel, _), result in zip(tasks, results):
+        if result is None:
+            failed += 1
+            continue
+        source = base_dir / rel
+        result.update({'hash': file_digest(source),
+                       'stat': stat_signature(source),
+                       'options': options})
+        entries[rel] = result
+
+    # Sources that disappeared or are no longer selected take their
+    # outputs with them
+    for rel, entry in manifest.items():
+        if rel not in entries:
+            remove_outputs(base_dir, entry)
+
+    save_manifest(manifest_path, name, entries)
+    print(f"✅ {name}: {len(tasks) - failed} processed, "
+          f"{len(sources) - len(tasks)} unchanged, {failed} failed")
+    return entries
+
+
+def encode_image(image, fmt, quality, max_bytes, animated):
+    """Encode image, stepping quality down until it fits max_bytes"""
+    from io import BytesIO
+
+    while True:
+        buffer = BytesIO()
+        if animated:
+            image[0].save(buffer, fmt.upper(), save_all=True,
+                          append_images=image[1:], quality=quality, loop=0,
+                          duration=[frame.info['duration'] for frame in image])
+        else:
+            image.save(buffer, fmt.upper(), quality=quality)
+        data = buffer.getvalue()
+        if not max_bytes or len(data) <= max_bytes or quality <= 40:
+            return data
+        quality -= 10
+
+
+def resize_frames(img, size):
+    """Resized RGBA copies of every frame, each keeping its own duration"""
+    from PIL import Image, ImageSequence
+
+    frames = []
+    for frame in ImageSequence.Iterator(img):
+        resized = frame.convert('RGBA').resize(size, Image.LANCZOS)
+        resized.info['duration'] = frame.info.get('duration', 100)
+        frames.append(resized)
+    return frames
+
+
+def optimize_image(task):
+    """Write the resized/re-encoded variants of one source image"""
+    from PIL import Image, features
+
+    source = Path(task['source'])
+    out_dir = Path(task['out_dir'])
+    try:
+        with Image.open(source) as img:
+            width, height = img.size
+            animated = getattr(img, 'is_animated', False)
+            formats = [fmt for fmt in task['formats'] if features.check(fmt)]
+            if animated:
+                # AVIF encoders don't reliably keep animation; WebP does
+                formats = [fmt for fmt in formats if fmt == 'webp']
+
+            targets = sorted({w for w in task['widths'] if w < width} |
+                             {min(width, max(task['widths']))})
+            out_dir.mkdir(parents=True, exist_ok=True)
+            variants = []
+            for target in targets:
+                size = (target, max(1, round(height * target / width)))
+                if animated:
+                    image = resize_frames(img, size)
+                else:
+                    mode = 'RGBA' if 'A' in img.getbands() or \
+                        'transparency' in img.info else 'RGB'
+                    image = img.convert(mode).resize(size, Image.LANCZOS)
+                for fmt in formats:
+                    data = encode_image(image, fmt, task['quality'],
+                                        task['max_bytes'], animated)
+                    name = f"{source.stem}-{target}w.{bytes_digest(data, 5)}.{fmt}"
+                    write_atomic(out_dir / name, data)
+                    variants.append({'path': (Path(task['out_rel']) / name).as_posix(),
+                                     'width': size[0], 'height': size[1],
+                                     'format': fmt, 'bytes': len(data)})
+    except Exception as e:
+        print(f"Error optimizing {source}: {e}")
+        return None
+
+    return {'width': width, 'height': height, 'variants': variants,
+            'outputs': [variant['path'] for variant in variants]}
+
+
+def optimize_images(base_dir, source_dir="assets", output_dir="public/assets",
+                    widths=DEFAULT_WIDTHS, formats=DEFAULT_FORMATS, quality=80,
+                    max_bytes=DEFAULT_MAX_IMAGE_BYTES, jobs=None):
+    """Build responsive WebP/AVIF variants of every image under source_dir.
+
+    Variants are written under output_dir with content-hashed names and
+    listed in output_dir/images.json, keyed by source path. Variants over
+    max_bytes are re-encoded at lower quality (None disables the cap).
+    """
+    import PIL  # noqa: F401 -- fail early if Pillow is missing
+
+    base_dir = Path(base_dir)
+    sources = find_files(base_dir / source_dir, IMAGE_EXTENSIONS)
+    output_root = Path(output_dir)
+    options = {'widths': list(widths), 'formats': list(formats),
+               'quality': quality, 'max_bytes': max_bytes}
+
+    def make_task(source, rel):
+        out_rel = output_root / Path(rel).relative_to(source_dir).parent
+        return {'source': str(source), 'out_dir': str(base_dir / out_rel),
+                'out_rel': out_rel.as_posix(), **options}
+
+    return run_stage('images', sources, options, optimize_image, base_dir,
+                     base_dir / output_root / "images.json", make_task, jobs)
+
+
+THUMBNAIL_SIZE = (400, 225)
+THUMBNAIL_EXTENSIONS = IMAGE_EXTENSIONS | {'.webp'}
+
+
+def make_thumbnail(task):
+    """Crop/scale one preview image to a compact WebP thumbnail"""
+    from PIL import Image, ImageOps
+
+    source = Path(task['source'])
+    size = tuple(task['size'])
+    try:
+        with Image.open(source) as img:
+            img.seek(0)
+            mode = 'RGBA' if 'A' in img.getbands() or \
+                'transparency' in img.info else 'RGB'
+            thumb = ImageOps.fit(img.convert(mode), size, Image.LANCZOS)
+            data = encode_image(thumb, 'webp', task['quality'], None, False)
+    except Exception as e:
+        print(f"Error making thumbnail for {task['project']}: {e}")
+        return None
+
+    out_rel = Path(task['out_rel']) / \
+        f"{task['project'].replace('/', '__')}.{bytes_digest(data, 5)}.webp"
+    write_atomic(Path(task['base_dir']) / out_rel, data)
+    return {'src': out_rel.as_posix(), 'width': size[0], 'height': size[1],
+            'outputs': [out_rel.as_posix()]}
+
+
+def thumbnail_is_fresh(entry, project_hash, configured, base_dir):
+    if not entry or entry.get('project_hash') != project_hash:
+        return False
+    if entry.get('configured') != configured:
+        return False
+    if not all((base_dir / output).exists() for output in entry.get('outputs', [])):
+        return False
+    source = entry.get('source')
+    if source is None:
+        return True
+    try:
+        return stat_signature(base_dir / source) == entry.get('source_stat')
+    except OSError:
+        return False
+
+
+def thumbnail_source(base_dir, source):
+    """Repo-relative path of a usable preview image, or None"""
+    if source is None or source.suffix.lower() not in THUMBNAIL_EXTENSIONS:
+        return None
+    try:
+        return source.relative_to(base_dir).as_posix()
+    except ValueError:
+        print(f"⚠️  thumbnails: skipping {source}, it is outside the repo")
+        return None
+
+
+def build_thumbnails(base_dir, projects, find_source, output_dir="public/thumbs",
+                     size=THUMBNAIL_SIZE, quality=75, configured=None, jobs=None):
+    """Attach a lazily-loadable WebP thumbnail to each project that has a preview.
+
+    Thumbnails are cached by the project's cache hash, its configured
+    preview (`configured` maps project paths to the "thumbnails" config
+    value) and the preview image's stat signature in
+    output_dir/thumbnails.json. `find_source` returns the preview image path
+    or None; it is called for changed projects and for projects that had no
+    preview yet, since a thumbnail.* file or a referenced image can appear
+    without the page changing. Previews outside base_dir are skipped. Sets
+    project['thumbnail'] for projects that have one.
+    """
+    import PIL  # noqa: F401 -- fail early if Pillow is missing
+
+    base_dir = Path(base_dir)
+    configured = configured or {}
+    manifest_path = base_dir / output_dir / "thumbnails.json"
+    manifest = load_manifest(manifest_path, 'thumbnails')
+    entries = {}
+    tasks = []
+    for project in projects:
+        path = project['path']
+        entry = manifest.get(path)
+        if thumbnail_is_fresh(entry, project.get('hash'), configured.get(path),
+                              base_dir):
+            if entry.get('source') is not None:
+                entries[path] = entry
+                continue
+            source = find_source(project)
+            if thumbnail_source(base_dir, source) is None:
+                entries[path] = entry
+                continue
+        else:
+            source = find_source(project)
+        remove_outputs(base_dir, entry)
+        entry = {'project_hash': project.get('hash'),
+                 'configured': configured.get(path), 'source': None,
+                 'outputs': []}
+        rel = thumbnail_source(base_dir, source)
+        if rel is not None:
+            entry['source'] = rel
+            entry['source_stat'] = stat_signature(source)
+            tasks.append((entry, {'project': path, 'source': str(source),
+                                  'base_dir': str(base_dir),
+                                  'out_rel': str(output_dir), 'size': list(size),
+                                  'quality': quality}))
+        entries[path] = entry
+
+    for (entry, _), result in zip(tasks, run_tasks(make_thumbnail,
+                                                   [task for _, task in tasks], jobs)):
+        if result:
+            entry.update(result)
+
+    for path, entry in manifest.items():
+        if path not in entries:
+            remove_outputs(base_dir, entry)
+
+    for project in projects:
+        entry = entries[project['path']]
+        if entry.get('src'):
+            project['thumbnail'] = {'src': entry['src'], 'width': entry['width'],
+                                    'height': entry['height']}
+
+    save_manifest(manifest_path, 'thumbnails', entries)
+    print(f"✅ thumbnails: {len(tasks)} generated, "
+          f"{sum(1 for e in entries.values() if e.get('src'))} total")
+    return entries
+
+
+COMPRESSIBLE_EXTENSIONS = {'.html', '.css', '.js', '.mjs', '.json', '.svg',
+                           '.txt', '.xml', '.map', '.md', '.wasm'}
+COMPRESSION_MANIFEST = "compressed.json"
+# The build's own state under output_dir; never served, so never compressed
+STATE_FILES = (COMPRESSION_MANIFEST, "synced.json", "pens.json",
+               "thumbs/thumbnails.json")
+
+
+def compression_formats():
+    """gzip always; brotli when the optional `brotli` package is installed"""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return ['gz']
+    return ['gz', 'br']
+
+
+def compress_file(task):
+    """Write .gz/.br siblings of one file at maximum compression levels"""
+    import gzip
+
+    source = Path(task['source'])
+    try:
+        data = source.read_bytes()
+        encoded = {}
+        if 'gz' in task['formats']:
+            # mtime=0 keeps the output byte-identical across builds
+            encoded['gz'] = gzip.compress(data, compresslevel=9, mtime=0)
+        if 'br' in task['formats']:
+            import brotli
+            encoded['br'] = brotli.compress(data, quality=11)
+    except Exception as e:
+        print(f"Error compressing {source}: {e}")
+        return None
+
+    outputs = []
+    sizes = {'raw': len(data)}
+    for fmt, payload in encoded.items():
+        # Only keep variants that are actually smaller than the original
+        if len(payload) >= len(data):
+            continue
+        write_atomic(f"{source}.{fmt}", payload)
+        outputs.append(f"{task['rel']}.{fmt}")
+        sizes[fmt] = len(payload)
+    return {'outputs': outputs, 'bytes': sizes}
+
+
+def precompress(base_dir, output_dir="public", jobs=None):
+    """Write .gz and .br siblings for every text artifact under output_dir.
+
+    Unchanged files are skipped via the manifest in
+    output_dir/compressed.json. The stage manifests in STATE_FILES are
+    left alone.
+    """
+    base_dir = Path(base_dir)
+    root = base_dir / output_dir
+    manifest_path = root / COMPRESSION_MANIFEST
+    state_files = {root / name for name in STATE_FILES}
+    sources = [source for source in find_files(root, COMPRESSIBLE_EXTENSIONS)
+               if source not in state_files]
+    formats = compression_formats()
+    if 'br' not in formats:
+        print("⚠️  brotli is not installed, writing .gz files only")
+    options = {'formats': formats}
+
+    def make_task(source, rel):
+        return {'source': str(source), 'rel': rel, 'formats': formats}
+
+    return run_stage('compressed', sources, options, compress_file, base_dir,
+                     manifest_path, make_task, jobs)
+
+
+AUDIO_EXTENSIONS = {'.wav', '.aif', '.aiff', '.flac'}
+# format -> (extension, ffmpeg arguments, MIME type for canPlayType)
+AUDIO_CODECS = {
+    'opus': ('ogg', ['-c:a', 'libopus', '-vbr', 'on'], 'audio/ogg; codecs=opus'),
+    'aac': ('m4a', ['-c:a', 'aac', '-movflags', '+faststart'],
+            'audio/mp4; codecs="mp4a.40.2"'),
+}
+DEFAULT_AUDIO_BITRATES = {'opus': '64k', 'aac': '96k'}
+# Leading/trailing audio quieter than this is trimmed so loops don't stall
+SILENCE_FILTER = ("silenceremove=start_periods=1:start_threshold={threshold},areverse,"
+                  "silenceremove=start_periods=1:start_threshold={threshold},areverse")
+
+
+def probe_loop_points(path):
+    """(loop_start, loop_end) in seconds of the audio in an encoded file.
+
+    Encoders prepend priming samples (AAC ~1024-2112, Opus 312 pre-skip)
+    and pad the last frame. The points are positions in the decoded
+    buffer, which starts with the priming: loop_start skips it and
+    loop_end stops before the padding. Returns (None, None) without
+    ffprobe or when the file can't be probed.
+    """
+    import json
+    import subprocess
+
+    if shutil.which('ffprobe') is None:
+        return None, None
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-select_streams', 'a:0', '-show_entries',
+         'stream=start_time,sample_rate,initial_padding:format=duration',
+         '-of', 'json', str(path)],
+        capture_output=True, text=True, check=False)
+    try:
+        info = json.loads(result.stdout)
+        stream = info['streams'][0]
+        duration = float(info['format']['duration'])
+        start_time = float(stream.get('start_time') or 0)
+        padding = int(stream.get('initial_padding') or 0)
+        sample_rate = int(stream.get('sample_rate') or 0)
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None, None
+
+    # A negative start time means the priming is part of the reported
+    # duration; otherwise the container (edit list, pre-skip) already
+    # trimmed it and only initial_padding says how long it is
+    if start_time < 0:
+        delay = -start_time
+        duration += start_time
+    else:
+        delay = padding / sample_rate if sample_rate else 0.0
+    return round(delay, 6), round(delay + duration, 6)
+
+
+def transcode_audio(task):
+    """Encode one source with ffmpeg into each configured format"""
+    import subprocess
+
+    source = Path(task['source'])
+    out_dir = Path(task['out_dir'])
+    out_dir.mkdir(parents=True, exist_ok=True)
+    audio_filter = []
+    if task['trim_silence']:
+        audio_filter = ['-af', SILENCE_FILTER.format(threshold=task['trim_silence'])]
+
+    variants = []
+    try:
+        for fmt in task['formats']:
+            extension, codec_args, mime = AUDIO_CODECS[fmt]
+            bitrate = task['bitrates'][fmt]
+            tmp_path = out_dir / f".{source.stem}.{os.getpid()}.tmp.{extension}"
+            subprocess.run(
+                ['ffmpeg', '-nostdin', '-v', 'error', '-y', '-i', str(source),
+                 *audio_filter, '-vn', '-map_metadata', '-1', *codec_args,
+                 '-b:a', bitrate, str(tmp_path)],
+                check=True, capture_output=True, text=True)
+            name = f"{source.stem}.{file_digest(tmp_path, 5)}.{extension}"
+            os.replace(tmp_path, out_dir / name)
+            loop_start, loop_end = probe_loop_points(out_dir / name)
+            variants.append({'path': (Path(task['out_rel']) / name).as_posix(),
+                             'format': fmt, 'type': mime, 'bitrate': bitrate,
+                             'bytes': (out_dir / name).stat().st_size,
+                             'loop_start': loop_start, 'loop_end': loop_end})
+    except (OSError, subprocess.CalledProcessError) as e:
+        detail = getattr(e, 'stderr', None) or e
+        print(f"Error transcoding {source}: {str(detail).strip()}")
+        for variant in variants:
+            (Path(task['base_dir']) / variant['path']).unlink(missing_ok=True)
+        return None
+
+    return {'bytes': source.stat().st_size, 'variants': variants,
+            'outputs': [variant['path'] for variant in variants]}
+
+
+def transcode_audios(base_dir, source_dir="assets/audio",
+                     output_dir="public/assets/audio", formats=('opus', 'aac'),
+                     bitrates=None, trim_silence='-60dB', jobs=None):
+    """Transcode every WAV/AIFF/FLAC under source_dir to Opus and AAC.
+
+    Variants get content-hashed names under output_dir and are listed in
+    output_dir/../audio.json with their MIME type and loop points, so pages
+    can pick the first format the browser can play. Needs ffmpeg on PATH;
+    without it the stage is skipped with a warning.
+    """
+    if shutil.which('ffmpeg') is None:
+        print("⚠️  ffmpeg is not installed, skipping audio transcoding")
+        return None
+
+    base_dir = Path(base_dir)
+    sources = find_files(base_dir / source_dir, AUDIO_EXTENSIONS)
+    output_root = Path(output_dir)
+    options = {'formats': [fmt for fmt in formats if fmt in AUDIO_CODECS],
+               'bitrates': {**DEFAULT_AUDIO_BITRATES, **(bitrates or {})},
+               'trim_silence': trim_silence}
+
+    def make_task(source, rel):
+        out_rel = output_root / Path(rel).relative_to(source_dir).parent
+        return {'source': str(source), 'base_dir': str(base_dir),
+                'out_dir': str(base_dir / out_rel), 'out_rel': out_rel.as_posix(),
+                **options}
+
+    return run_stage('audio', sources, options, transcode_audio, base_dir,
+                     base_dir / output_root.parent / "audio.json", make_task, jobs)
+
+
+SYNC_MANIFEST = "synced.json"
+# Tried in this order, starting from the requested mode
+SYNC_MODES = ('link', 'reflink', 'copy')
+DEFAULT_SYNC_IGNORE = ('.*', 'node_modules', '__pycache__')
+# Linux ioctl that makes a file share another's extents (btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+
+def reflink(source, dest):
+    import fcntl
+
+    with open(source, 'rb') as src, open(dest, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copystat(source, dest)
+
+
+def place_file(source, dest, mode):
+    """Replace dest with a hardlink, reflink or copy of source.
+
+    Falls back along SYNC_MODES when the filesystem refuses (e.g. a link
+    across devices) and returns the method that worked. Always goes through
+    a temp file and a rename, so a hardlinked dest is never written through.
+    """
+    tmp_path = dest.with_name(f".{dest.name}.{os.getpid()}.sync")
+    for method in SYNC_MODES[SYNC_MODES.index(mode):]:
+        try:
+            if method == 'link':
+                os.link(source, tmp_path)
+            elif method == 'reflink':
+                reflink(source, tmp_path)
+            else:
+                shutil.copy2(source, tmp_path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            if method == 'copy':
+                raise
+            continue
+        os.replace(tmp_path, dest)
+        # rename() is a no-op when both names are links to the same file
+        tmp_path.unlink(missing_ok=True)
+        return method
+    return None
+
+
+def sync_directory(task):
+    """Bring one output directory in line with its source directory.
+
+    A file is up to date when it is the same inode as its source, when the
+    manifest's source and output stat signatures still match, or when size
+    and mtime match; same-size files with another mtime are compared by
+    content hash before anything is written.
+    """
+    base_dir = Path(task['base_dir'])
+    exclude = set(task['exclude'])
+    entries = {}
+    synced = {}
+    for name in task['files']:
+        rel = f"{task['dir']}/{name}"
+        dest_rel = f"{task['output_dir']}/{rel}"
+        if dest_rel in exclude:
+            continue
+        source = base_dir / rel
+        dest = base_dir / dest_rel
+        try:
+            source_stat = os.stat(source)
+            try:
+                dest_stat = os.stat(dest)
+            except FileNotFoundError:
+                dest_stat = None
+            signature = [source_stat.st_size, source_stat.st_mtime_ns, source_stat.st_ino]
+            entry = task['entries'].get(dest_rel)
+
+            if dest_stat is not None:
+                dest_signature = [dest_stat.st_size, dest_stat.st_mtime_ns, dest_stat.st_ino]
+                if os.path.samestat(source_stat, dest_stat):
+                    method = 'link'
+                elif entry and entry['stat'] == signature and \
+                        entry['dest_stat'] == dest_signature:
+                    method = entry['method']
+                elif dest_stat.st_size == source_stat.st_size and (
+                        dest_stat.st_mtime_ns == source_stat.st_mtime_ns or
+                        file_digest(dest) == file_digest(source)):
+                    method = entry['method'] if entry else 'copy'
+                else:
+                    method = None
+                if method is not None:
+                    entries[dest_rel] = {'stat': signature, 'dest_stat': dest_signature,
+                                         'method': method}
+                    continue
+
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            method = place_file(source, dest, task['mode'])
+            dest_stat = os.stat(dest)
+            entries[dest_rel] = {
+                'stat': signature, 'method': method,
+                'dest_stat': [dest_stat.st_size, dest_stat.st_mtime_ns, dest_stat.st_ino]}
+            synced[method] = synced.get(method, 0) + 1
+        except OSError as e:
+            print(f"Error syncing {rel}: {e}")
+    return {'entries': entries, 'synced': synced}
+
+
+def prune_empty_dirs(path, stop):
+    """Remove path and its parents up to (not including) stop while empty"""
+    path = Path(path)
+    while path != stop and stop in path.parents:
+        try:
+            path.rmdir()
+        except OSError:
+            return
+        path = path.parent
+
+
+def sync_trees(base_dir, roots, output_dir="public", ignore=DEFAULT_SYNC_IGNORE,
+               exclude=(), mode='link', jobs=None):
+    """Mirror each root (e.g. challenges/) to output_dir/<root> incrementally.
+
+    Files become hardlinks of their sources where the filesystem allows,
+    else reflinks, else copies, so deploy artifacts share storage with the
+    source tree. Work is split per directory across `jobs` workers. Files
+    this stage created earlier (see output_dir/synced.json) whose source is
+    gone are deleted; other files under output_dir are never touched, and
+    `exclude` lists outputs owned by other stages.
+    """
+    base_dir = Path(base_dir)
+    output_root = base_dir / output_dir
+    manifest_path = output_root / SYNC_MANIFEST
+    manifest = load_manifest(manifest_path, 'synced')
+    output_dir = Path(output_dir).as_posix()
+
+    def ignored(name):
+        return any(fnmatch(name, pattern) for pattern in ignore)
+
+    tasks = []
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(base_dir / root):
+            dirnames[:] = sorted(name for name in dirnames if not ignored(name))
+            files = sorted(name for name in filenames if not ignored(name))
+            if files:
+                rel_dir = Path(dirpath).relative_to(base_dir).as_posix()
+                tasks.append({'base_dir': str(base_dir), 'output_dir': output_dir,
+                              'dir': rel_dir, 'files': files, 'mode': mode,
+                              'entries': {}, 'exclude': []})
+
+    by_dir = {f"{output_dir}/{task['dir']}": task for task in tasks}
+    for dest_rel, entry in manifest.items():
+        task = by_dir.get(dest_rel.rpartition('/')[0])
+        if task is not None:
+            task['entries'][dest_rel] = entry
+    for dest_rel in exclude:
+        task = by_dir.get(dest_rel.rpartition('/')[0])
+        if task is not None:
+            task['exclude'].append(dest_rel)
+
+    entries = {}
+    synced = {}
+    for result in run_tasks(sync_directory, tasks, jobs):
+        entries.update(result['entries'])
+        for method, count in result['synced'].items():
+            synced[method] = synced.get(method, 0) + count
+
+    removed = 0
+    exclude = set(exclude)
+    for dest_rel in manifest:
+        if dest_rel not in entries and dest_rel not in exclude:
+            dest = base_dir / dest_rel
+            try:
+                dest.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Error removing {dest_rel}: {e}")
+            prune_empty_dirs(dest.parent, output_root)
+
+    save_manifest(manifest_path, 'synced', entries)
+    total = sum(synced.values())
+    methods = ', '.join(f"{count} {method}" for method, count in sorted(synced.items()))
+    print(f"✅ sync: {total} synced{f' ({methods})' if methods else ''}, "
+          f"{len(entries) - total} unchanged, {removed} removed")
+    return entries
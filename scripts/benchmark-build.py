@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""Benchmark ProjectIndexBuilder on synthetic portfolios.
+
+Generates trees shaped like challenges/ and other/ with 100 to 100k
+projects, then times cold, warm and one-file-changed builds of
+scan_projects, generate_html and the stats output. Every run happens in a
+fresh worker process, so peak RSS is per run and caches are only what is
+on disk. Results (and deltas against --baseline) are reported as JSON.
+"""
+import argparse
+import json
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from index_builder import load_builder_class
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+GENERATOR_VERSION = 1
+SCENARIOS = ('cold', 'warm', 'one-change')
+PHASES = ('scan_projects', 'generate_html', 'stats')
+CACHE_FILES = ('.project_cache.db', '.project_cache.db-wal',
+               '.project_cache.db-shm', '.project_cache.json')
+
+CHALLENGE_CATEGORIES = ['animations', 'cards', 'forms', 'games', 'layouts',
+                        'loaders', 'menus', 'puzzles', 'text-effects', 'ui']
+OTHER_GROUPS = ['experiments', 'games', 'ui', 'visualizations']
+WORDS = ['neon', 'glass', 'pixel', 'orbit', 'wave', 'spiral', 'grid', 'flip',
+         'glow', 'shadow', 'morph', 'bounce', 'ripple', 'prism', 'tile', 'drift']
+LIBRARIES = [
+    '<script src="https://cdnjs.cloudflare.com/ajax/libs/jquery/3.7.1/jquery.min.js"></script>',
+    '<script src="https://cdnjs.cloudflare.com/ajax/libs/gsap/3.12.2/gsap.min.js"></script>',
+    '<script src="https://cdnjs.cloudflare.com/ajax/libs/three.js/r128/three.min.js"></script>',
+    '<script src="https://unpkg.com/react@18/umd/react.production.min.js"></script>',
+]
+
+
+def filler(rng, line_template, size):
+    """Repeat a templated line until roughly size bytes"""
+    lines = []
+    total = 0
+    while total < size:
+        line = line_template.format(word=rng.choice(WORDS), n=len(lines),
+                                    value=rng.randint(0, 255))
+        lines.append(line)
+        total += len(line) + 1
+    return '\n'.join(lines)
+
+
+def write_project(rng, project_dir, title):
+    """Write index.html/script.js/styles.css with pen-like sizes"""
+    project_dir.mkdir(parents=True, exist_ok=True)
+    libraries = '\n    '.join(rng.sample(LIBRARIES, rng.randint(0, 2)))
+    canvas = '<canvas id="stage"></canvas>' if rng.random() < 0.3 else ''
+    markup = filler(rng, '    <div class="{word}-{n}"><span>{word}</span></div>',
+                    rng.randint(500, 6000))
+    (project_dir / "index.html").write_text(f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta name="description" content="{title} built with HTML, CSS and JavaScript">
+    <title>{title}</title>
+    <link rel="stylesheet" href="styles.css">
+    {libraries}
+</head>
+<body>
+    {canvas}
+{markup}
+    <script src="script.js"></script>
+</body>
+</html>
+""", encoding='utf-8')
+    (project_dir / "script.js").write_text(filler(
+        rng, "const {word}{n} = document.querySelector('.{word}-{n}');"
+             " {word}{n}?.addEventListener('click', () => {word}{n}.classList.toggle('on'));",
+        rng.randint(1000, 20000)), encoding='utf-8')
+    (project_dir / "styles.css").write_text(filler(
+        rng, ".{word}-{n} {{ color: rgb({value}, {value}, {value}); transition: all 0.3s; }}",
+        rng.randint(1000, 10000)), encoding='utf-8')
+
+
+def generate_portfolio(root, count, seed=0):
+    """Generate `count` synthetic projects under root.
+
+    About 60% go to challenges/<category>/<project>, the rest to
+    other/<group>/<project>; one in ten is nested a level deeper. Reuses an
+    existing tree generated with the same parameters.
+    """
+    root = Path(root)
+    marker = root / ".benchmark.json"
+    params = {'version': GENERATOR_VERSION, 'count': count, 'seed': seed}
+    try:
+        if json.loads(marker.read_text()) == params:
+            return root
+    except (OSError, ValueError):
+        pass
+    if root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+    shutil.copy(REPO_DIR / ".index-config.json", root / ".index-config.json")
+
+    rng = random.Random(seed)
+    for i in range(count):
+        title = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}"
+        slug = title.lower().replace(' ', '-')
+        if rng.random() < 0.6:
+            parent = root / "challenges" / rng.choice(CHALLENGE_CATEGORIES)
+        else:
+            parent = root / "other" / rng.choice(OTHER_GROUPS)
+        if rng.random() < 0.1:
+            parent = parent / f"set-{i % 50}"
+        write_project(rng, parent / slug, title)
+
+    marker.write_text(json.dumps(params))
+    return root
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run_worker(base_dir, cache_backend, jobs):
+    """Time one build in this process and print the result as JSON"""
+    builder_class = load_builder_class()
+    timings = {}
+
+    start = time.perf_counter()
+    builder = builder_class(base_dir, jobs=jobs, cache_backend=cache_backend)
+    builder.scan_projects()
+    builder.save_cache()
+    timings['scan_projects'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    builder.generate_html()
+    timings['generate_html'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    builder.write_stats(Path(base_dir) / "stats.json")
+    timings['stats'] = time.perf_counter() - start
+
+    print(json.dumps({'projects': len(builder.projects), 'timings': timings,
+                      'peak_rss_mb': peak_rss_mb()}))
+
+
+def run_build(base_dir, args):
+    """Run one build in a fresh worker process and return its result"""
+    result = subprocess.run(
+        [sys.executable, __file__, '--worker', str(base_dir),
+         '--cache-backend', args.cache_backend, '--jobs', str(args.jobs)],
+        capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def prepare(base_dir, scenario, run):
+    """Put the tree into the state a scenario starts from"""
+    if scenario == 'cold':
+        for name in CACHE_FILES:
+            (base_dir / name).unlink(missing_ok=True)
+    elif scenario == 'one-change':
+        project = next((base_dir / "challenges").rglob("script.js"))
+        with open(project, 'a', encoding='utf-8') as f:
+            f.write(f"\n// benchmark change {time.time_ns()} {run}\n")
+
+
+def benchmark_size(base_dir, args):
+    """Best-of-N timings for every scenario on one generated tree"""
+    results = {}
+    # A warm cache must exist before the warm and one-change scenarios
+    for scenario in SCENARIOS:
+        runs = []
+        for run in range(args.repeat):
+            prepare(base_dir, scenario, run)
+            runs.append(run_build(base_dir, args))
+        best = {phase: min(r['timings'][phase] for r in runs) for phase in PHASES}
+        total = sum(best.values())
+        projects = runs[0]['projects']
+        results[scenario] = {
+            'projects': projects,
+            'seconds': {**best, 'total': total},
+            'projects_per_second': projects / best['scan_projects']
+            if best['scan_projects'] else None,
+            'peak_rss_mb': max(r['peak_rss_mb'] for r in runs),
+        }
+        print(f"  {scenario:<10} {total:8.3f}s  "
+              f"{results[scenario]['projects_per_second'] or 0:10.0f} projects/s  "
+              f"{results[scenario]['peak_rss_mb']:7.1f} MB", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline):
+    """Relative change (new / old - 1) of each timing and RSS vs a baseline"""
+    deltas = {}
+    for size, scenarios in results.items():
+        for scenario, result in scenarios.items():
+            old = baseline.get(size, {}).get(scenario)
+            if not old:
+                continue
+            entry = {}
+            for phase, seconds in result['seconds'].items():
+                old_seconds = old['seconds'].get(phase)
+                if old_seconds:
+                    entry[phase] = round(seconds / old_seconds - 1, 4)
+            if old.get('peak_rss_mb'):
+                entry['peak_rss_mb'] = round(
+                    result['peak_rss_mb'] / old['peak_rss_mb'] - 1, 4)
+            deltas.setdefault(size, {})[scenario] = entry
+    return deltas
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the project index build on synthetic portfolios")
+    parser.add_argument('--sizes', default='100,1000',
+                        help="Comma-separated project counts (default: 100,1000)")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Runs per scenario; the fastest is reported")
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help="Worker processes for the builder")
+    parser.add_argument('--cache-backend', default='sqlite',
+                        help="Project cache backend (default: sqlite)")
+    parser.add_argument('--work-dir',
+                        help="Where generated trees are kept and reused "
+                             "(default: a temporary directory)")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="Random seed for the generator")
+    parser.add_argument('--baseline', metavar='FILE',
+                        help="Earlier results to compute regression deltas against")
+    parser.add_argument('--output', '-o', metavar='FILE',
+                        help="Write the JSON report to FILE instead of stdout")
+    parser.add_argument('--worker', metavar='DIR', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.worker:
+        run_worker(args.worker, args.cache_backend, args.jobs)
+        return
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    temp_dir = None
+    if args.work_dir:
+        work_dir = Path(args.work_dir)
+    else:
+        temp_dir = tempfile.TemporaryDirectory(prefix='index-benchmark-')
+        work_dir = Path(temp_dir.name)
+
+    results = {}
+    try:
+        for size in sizes:
+            print(f"🏗️  Generating {size} projects...", file=sys.stderr)
+            start = time.perf_counter()
+            base_dir = generate_portfolio(work_dir / str(size), size, args.seed)
+            print(f"⏱️  Generated in {time.perf_counter() - start:.1f}s, "
+                  f"benchmarking...", file=sys.stderr)
+            results[str(size)] = benchmark_size(base_dir, args)
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'jobs': args.jobs,
+        'cache_backend': args.cache_backend,
+        'repeat': args.repeat,
+        'results': results,
+    }
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            report['deltas'] = compare(results, json.load(f)['results'])
+
+    data = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(data + '\n')
+        print(f"✅ Benchmark results saved to {args.output}", file=sys.stderr)
+    else:
+        print(data)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Thin client for the build-index.py --daemon build server.
+
+Only imports the socket helper, so a build request costs an interpreter
+start plus one round trip instead of a cold build:
+
+    python3 scripts/build-index.py --daemon &
+    python3 scripts/build-client.py build
+    python3 scripts/build-client.py build challenges/cards/flip/script.js
+    python3 scripts/build-client.py query glass --tech canvas
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from build_daemon import DEFAULT_SOCKET, send_request
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Send requests to a running build-index.py --daemon")
+    parser.add_argument('--dir', default='.',
+                        help="Base directory the daemon builds (locates its socket)")
+    parser.add_argument('--socket', help=f"Daemon socket (default: <dir>/{DEFAULT_SOCKET})")
+    parser.add_argument('--json', action='store_true',
+                        help="Print the raw JSON result")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="Build, or rebuild the projects "
+                                              "containing the given paths")
+    build.add_argument('paths', nargs='*')
+
+    stats = commands.add_parser('stats', help="Print project statistics")
+    stats.add_argument('--format', '-f', choices=('json', 'markdown'), default='json')
+
+    query = commands.add_parser('query', help="List projects matching all filters")
+    query.add_argument('text', nargs='*', help="Words in the title, description or path")
+    query.add_argument('--tech', dest='technology')
+    query.add_argument('--category')
+    query.add_argument('--section', choices=('challenges', 'other'))
+    query.add_argument('--limit', type=int)
+
+    commands.add_parser('ping', help="Check that the daemon is running")
+    commands.add_parser('shutdown', help="Stop the daemon")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    request = {'command': args.command}
+    if args.command == 'build':
+        request['paths'] = [str(Path(path).resolve()) for path in args.paths]
+    elif args.command == 'stats':
+        request['format'] = args.format
+    elif args.command == 'query':
+        request.update(text=' '.join(args.text), technology=args.technology,
+                       category=args.category, section=args.section,
+                       limit=args.limit)
+
+    socket_path = args.socket or Path(args.dir) / DEFAULT_SOCKET
+    try:
+        response = send_request(socket_path, request)
+    except OSError as e:
+        print(f"❌ No build daemon at {socket_path} ({e}); start one with "
+              f"python3 scripts/build-index.py --daemon", file=sys.stderr)
+        return 1
+
+    sys.stdout.write(response.get('output', ''))
+    if not response['ok']:
+        print(f"❌ {response['error']}", file=sys.stderr)
+        return 1
+
+    result = response['result']
+    if args.json or args.command in ('stats', 'ping') and not isinstance(result, str):
+        print(json.dumps(result, indent=2))
+    elif args.command == 'query':
+        for project in result:
+            print(f"{project['path']}  {project['title']} "
+                  f"[{', '.join(project['technologies'])}]")
+        print(f"{len(result)} matching project{'' if len(result) == 1 else 's'}")
+    elif isinstance(result, str):
+        print(result, end='')
+    elif args.command == 'build':
+        print(f"⚡ Built {result['projects']} projects in {response['seconds']:.3f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,20 +1,502 @@
 #!/usr/bin/env python3
 import os
+import re
 import json
+import html
 import hashlib
+import time
 from pathlib import Path
-from bs4 import BeautifulSoup
+from contextlib import nullcontext
+from html.parser import HTMLParser
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import argparse
+import sys
+
+from asset_pipeline import (DEFAULT_MAX_IMAGE_BYTES, DEFAULT_SYNC_IGNORE,
+                            SYNC_MODES, build_thumbnails, load_manifest,
+                            optimize_images, precompress, remove_outputs,
+                            run_tasks, save_manifest, sync_trees,
+                            transcode_audios)
+from build_metrics import BuildMetrics, profiled
+from file_utils import (bytes_digest, file_digest, is_ignored, stat_signature,
+                        write_atomic, write_if_changed)
+from git_state import GitError, read_git_state
+from minify import minify_css, minify_html, minify_js
+from project_cache import CACHE_BACKENDS, open_cache
+from project_stats import STATS_FORMATS, collect_stats, write_stats
+from search_index import SEARCH_SCRIPT, build_search_index, write_search_index
+from tech_detector import (SOURCE_FILES, get_detector, load_technologies,
+                           technologies_key)
+
+# Project discovery defaults, overridable under "discovery" in .index-config.json
+DEFAULT_DISCOVERY_ROOTS = ["challenges", "other"]
+DEFAULT_DISCOVERY_IGNORE = ["assets", "node_modules", ".*", "__pycache__"]
+DEFAULT_DISCOVERY_DEPTH = 8
+
+# Per-category pages of a sharded build, relative to the landing page
+SHARD_DIR = "categories"
+
+# Pens often reference repo assets through GitHub's raw URLs
+REPO_RAW_URL = "https://raw.githubusercontent.com/Philip-Walsh/codepens/"
+
+
+# Tags and attributes whose values may point at a pen's own files
+REFERENCE_TAGS = {'script', 'link', 'img', 'audio', 'video', 'source', 'track'}
+REFERENCE_ATTRS = ('src', 'href', 'poster')
+REFERENCE_RE = re.compile(
+    r'(\s(?:src|href|poster)\s*=\s*)(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))',
+    re.IGNORECASE)
+
+
+class StopParsing(Exception):
+    """Raised by ProjectMetadataParser once everything it needs has been seen"""
+
+
+class ProjectMetadataParser(HTMLParser):
+    """Single-pass extractor for <title>, meta description and asset/image sources.
+
+    With stop_after_head, parsing stops as soon as the <head> is finished (or
+    <body> starts) once a title has been found, so large page bodies are
+    never tokenized. Pass stop_after_head=False to collect body sources too.
+    """
+
+    def __init__(self, stop_after_head=True):
+        super().__init__(convert_charrefs=True)
+        self.stop_after_head = stop_after_head
+        self.title = None
+        self.description = ""
+        self.scripts = []
+        self.stylesheets = []
+        self.images = []
+        self.references = []
+        self.in_title = False
+        self.title_parts = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'body' and self.done():
+            raise StopParsing
+        attrs = dict(attrs)
+        if tag in REFERENCE_TAGS:
+            self.references.extend(attrs[name] for name in REFERENCE_ATTRS
+                                   if attrs.get(name))
+        if tag == 'title' and self.title is None:
+            self.in_title = True
+        elif tag == 'meta' and (attrs.get('name') or '').lower() == 'description':
+            if not self.description:
+                self.description = attrs.get('content') or ''
+        elif tag == 'meta' and attrs.get('property') == 'og:image' and attrs.get('content'):
+            self.images.append(attrs['content'])
+        elif tag == 'img' and attrs.get('src'):
+            self.images.append(attrs['src'])
+        elif tag == 'script' and attrs.get('src'):
+            self.scripts.append(attrs['src'])
+        elif tag == 'link' and attrs.get('href') and \
+                'stylesheet' in (attrs.get('rel') or '').lower():
+            self.stylesheets.append(attrs['href'])
+
+    def handle_endtag(self, tag):
+        if tag == 'title' and self.in_title:
+            self.in_title = False
+            self.title = ''.join(self.title_parts)
+        elif tag == 'head' and self.done():
+            raise StopParsing
+
+    def done(self):
+        return self.stop_after_head and self.title is not None
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.title_parts.append(data)
+
+    def extract(self, html_content):
+        try:
+            self.feed(html_content)
+            self.close()
+        except StopParsing:
+            pass
+        if self.in_title:
+            self.title = ''.join(self.title_parts)
+        return self
+
+
+def extract_metadata_stream(html_content):
+    """Extract (title, description, text to scan) with the streaming parser"""
+    meta = ProjectMetadataParser().extract(html_content)
+    return meta.title, meta.description, html_content
+
+
+def extract_metadata_soup(html_content):
+    """BeautifulSoup fallback for pages the streaming parser mishandles"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_content, 'html.parser')
+    title_tag = soup.find('title')
+    title = title_tag.get_text() if title_tag else None
+    description = ""
+    meta_desc = soup.find('meta', attrs={'name': 'description'})
+    if meta_desc:
+        description = meta_desc.get('content', '')
+    return title, description, str(soup)
+
+
+METADATA_EXTRACTORS = {
+    'stream': extract_metadata_stream,
+    'soup': extract_metadata_soup,
+}
+
+
+def parse_project(task):
+    """Parse a project's index.html into a project record.
+
+    Module-level so it can run in a worker process; `task` comes from
+    ProjectIndexBuilder.lookup_project. Returns (project_info, timing),
+    where timing breaks the work down for BuildMetrics.
+    """
+    project_path = task['project_path']
+    index_file = project_path / "index.html"
+    cache_key = task['cache_key']
+    timing = {'path': cache_key, 'seconds': 0.0, 'read': 0.0, 'extract': 0.0,
+              'detect': 0.0, 'bytes': 0}
+    start = time.perf_counter()
+
+    # Parse HTML to extract info
+    try:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            html_text = f.read()
+            timing['bytes'] += os.fstat(f.fileno()).st_size
+        read_done = time.perf_counter()
+        extract = METADATA_EXTRACTORS[task.get('parser', 'stream')]
+        title, description, html_content = extract(html_text)
+        extract_done = time.perf_counter()
+
+        # Extract title
+        title = title.strip() if title is not None \
+            else project_path.name.replace('-', ' ').title()
+
+        # Detect technologies across index.html and its sibling sources
+        detector = get_detector(task['technologies'])
+        texts = [html_content]
+        for name in task['sources'][1:]:
+            with open(project_path / name, 'r', encoding='utf-8',
+                      errors='replace') as f:
+                texts.append(f.read())
+                timing['bytes'] += os.fstat(f.fileno()).st_size
+        sources_done = time.perf_counter()
+        technologies = detector.detect(*texts)
+        detect_done = time.perf_counter()
+        timing.update(read=(read_done - start) + (sources_done - extract_done),
+                      extract=extract_done - read_done,
+                      detect=detect_done - sources_done)
+
+        # Determine category based on path
+        path_parts = project_path.parts
+        if 'challenges' in path_parts:
+            category = path_parts[path_parts.index(
+                'challenges') + 1] if len(path_parts) > path_parts.index('challenges') + 1 else 'misc'
+        elif 'other' in path_parts:
+            category = 'experiments'
+        else:
+            category = 'projects'
+
+        project_info = {
+            'title': title,
+            'description': description or f"Interactive {category} project",
+            'path': cache_key,
+            'category': category.replace('-', ' ').title(),
+            'technologies': technologies,
+            'modified': datetime.fromtimestamp(task['mtime']),
+            'hash': task['hash'],
+            'stat': task['stat'],
+            'blobs': task.get('blobs')
+        }
+
+    except Exception as e:
+        print(f"Error processing {project_path}: {e}")
+        project_info = None
+
+    timing['seconds'] = time.perf_counter() - start
+    return project_info, timing
+
+
+def resolve_local_path(src, page_dir, base_dir):
+    """Map a relative or root-relative URL from a page to a file, if it is one"""
+    src = src.split('#')[0].split('?')[0]
+    if not src or '://' in src or src.startswith(('data:', '//')):
+        return None
+    if src.startswith('/'):
+        path = Path(base_dir) / src.lstrip('/')
+    else:
+        path = Path(page_dir) / src
+    path = Path(os.path.normpath(path))
+    return path if path.is_file() else None
+
+
+def rewrite_references(html_content, urls):
+    """Replace src/href/poster values found in urls with their new URL"""
+    def replace(match):
+        value = next(group for group in match.groups()[1:] if group is not None)
+        new_url = urls.get(html.unescape(value))
+        if new_url is None:
+            return match.group(0)
+        return f'{match.group(1)}"{html.escape(new_url)}"'
+    return REFERENCE_RE.sub(replace, html_content)
+
+
+LINK_TAG_RE = re.compile(r'<link\b[^>]*>', re.IGNORECASE)
+SCRIPT_TAG_RE = re.compile(r'<script\b([^>]*)>\s*</script\s*>', re.IGNORECASE)
+SRC_ATTR_RE = re.compile(r'\ssrc\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s>]+)', re.IGNORECASE)
+MEDIA_ATTR_RE = re.compile(r'\smedia\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s>]+)', re.IGNORECASE)
+DEFERRED_ATTR_RE = re.compile(r'\s(?:defer|async)\b', re.IGNORECASE)
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+MINIFY_CACHE_VERSION = 1
+
+
+def tag_reference(tag):
+    """The (unescaped) src/href value of a single tag, if any"""
+    match = REFERENCE_RE.search(tag)
+    if match is None:
+        return None
+    return html.unescape(next(g for g in match.groups()[1:] if g is not None))
+
+
+def inlinable_references(html_content):
+    """Refs of stylesheet links and of scripts that may run inline.
+
+    Deferred/async scripts don't qualify: an inline script runs as soon as
+    it is parsed, which would change when their code executes.
+    """
+    refs = {tag_reference(match.group(0)) for match in LINK_TAG_RE.finditer(html_content)
+            if 'stylesheet' in match.group(0).lower()}
+    refs.update(tag_reference(match.group(0))
+                for match in SCRIPT_TAG_RE.finditer(html_content)
+                if not DEFERRED_ATTR_RE.search(match.group(1)))
+    refs.discard(None)
+    return refs
+
+
+def inline_references(html_content, inline):
+    """Replace stylesheet links and script tags for refs in inline with their code.
+
+    Closing tags inside the code are escaped.
+    """
+    def replace_link(match):
+        tag = match.group(0)
+        code = inline.get(tag_reference(tag))
+        if code is None or 'stylesheet' not in tag.lower():
+            return tag
+        media = MEDIA_ATTR_RE.search(tag)
+        return f"<style{media.group(0) if media else ''}>" + \
+            re.sub(r'</(style)', r'<\\/\1', code, flags=re.IGNORECASE) + "</style>"
+
+    def replace_script(match):
+        attrs = match.group(1)
+        code = inline.get(tag_reference(match.group(0)))
+        if code is None or DEFERRED_ATTR_RE.search(attrs):
+            return match.group(0)
+        return f"<script{SRC_ATTR_RE.sub('', attrs)}>" + \
+            re.sub(r'</(script)', r'<\\/\1', code, flags=re.IGNORECASE) + "</script>"
+
+    html_content = LINK_TAG_RE.sub(replace_link, html_content)
+    return SCRIPT_TAG_RE.sub(replace_script, html_content)
+
+
+def minified_asset(source, cache_dir):
+    """(code, source map mappings) for a CSS/JS file, cached by content hash"""
+    data = source.read_bytes()
+    key = bytes_digest(f"{MINIFY_CACHE_VERSION}{source.suffix}".encode() + data)
+    cache_file = Path(cache_dir) / f"{key}.json"
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        return cached['code'], cached['mappings']
+    except (OSError, ValueError, KeyError):
+        pass
+    code, source_map = MINIFIERS[source.suffix.lower()](data.decode('utf-8', 'replace'))
+    write_atomic(cache_file, json.dumps({'code': code, 'mappings': source_map.mappings()}))
+    return code, source_map.mappings()
+
+
+def publish_asset(source, rel, task, inlinable):
+    """Write one referenced file under output_dir.
+
+    Returns (output paths, code to inline or None). With minify, CSS/JS is
+    minified and gets a source map, or is returned for inlining when
+    inlinable and within inline_limit; with fingerprint, the name carries a
+    content hash.
+    """
+    base_dir = Path(task['base_dir'])
+    out_parent = Path(task['output_dir']) / rel.parent
+    suffix = rel.suffix.lower()
+    if task['minify'] and suffix in MINIFIERS:
+        code, mappings = minified_asset(source, task['cache_dir'])
+        if inlinable and len(code.encode('utf-8')) <= task['inline_limit']:
+            return [], code
+        name = f"{rel.stem}.{bytes_digest(code.encode('utf-8'), 5)}{rel.suffix}" \
+            if task['fingerprint'] else rel.name
+        comment = f"/*# sourceMappingURL={name}.map */" if suffix == '.css' \
+            else f"//# sourceMappingURL={name}.map"
+        source_map = json.dumps({
+            'version': 3, 'file': name, 'sources': [rel.name],
+            'sourcesContent': [source.read_text(encoding='utf-8', errors='replace')],
+            'names': [], 'mappings': mappings}, separators=(',', ':'))
+        write_if_changed(base_dir / out_parent / name,
+                         f"{code}\n{comment}\n".encode('utf-8'))
+        write_if_changed(base_dir / out_parent / f"{name}.map",
+                         source_map.encode('utf-8'))
+        return [(out_parent / name).as_posix(),
+                (out_parent / f"{name}.map").as_posix()], None
+
+    if task['fingerprint']:
+        out_rel = out_parent / f"{rel.stem}.{file_digest(source, 5)}{rel.suffix}"
+        if not (base_dir / out_rel).exists():
+            write_if_changed(base_dir / out_rel, source.read_bytes())
+    else:
+        out_rel = out_parent / rel.name
+        write_if_changed(base_dir / out_rel, source.read_bytes())
+    return [out_rel.as_posix()], None
+
+
+def publish_project(task):
+    """Publish a pen's page and the local files it references under output_dir.
+
+    Module-level so it can run in a worker process; `task` comes from
+    ProjectIndexBuilder.publish_pens. Files keep their path relative to
+    base_dir under output_dir, so pens sharing a file share its published
+    copy. References in the page are rewritten to the published names.
+    """
+    base_dir = Path(task['base_dir'])
+    project_dir = base_dir / task['project']
+    output_dir = Path(task['output_dir'])
+    page_dir = base_dir / output_dir / task['project']
+    try:
+        with open(project_dir / "index.html", 'r', encoding='utf-8') as f:
+            html_content = f.read()
+        meta = ProjectMetadataParser(stop_after_head=False).extract(html_content)
+        inlinable = inlinable_references(html_content) if task['minify'] else set()
+
+        urls = {}
+        inline = {}
+        sources = {}
+        outputs = []
+        for ref in dict.fromkeys(meta.references):
+            source = resolve_local_path(ref, project_dir, base_dir)
+            if source is None:
+                continue
+            try:
+                rel = source.relative_to(base_dir)
+            except ValueError:
+                continue
+            if rel.parts[0] == output_dir.parts[0]:
+                continue
+            sources[rel.as_posix()] = stat_signature(source)
+            published, code = publish_asset(source, rel, task, ref in inlinable)
+            outputs.extend(published)
+            if code is not None:
+                inline[ref] = code
+            else:
+                suffix = ref[len(ref.split('#')[0].split('?')[0]):]
+                urls[ref] = Path(os.path.relpath(base_dir / published[0], page_dir)
+                                 ).as_posix() + suffix
+
+        content = rewrite_references(inline_references(html_content, inline), urls)
+        if task['minify']:
+            content = minify_html(content)
+        write_if_changed(page_dir / "index.html", content.encode('utf-8'))
+    except Exception as e:
+        print(f"Error publishing {task['project']}: {e}")
+        return None
+
+    return {'project_hash': task['project_hash'], 'options': task['options'],
+            'assets': urls, 'inlined': sorted(inline), 'sources': sources,
+            'outputs': [*dict.fromkeys(outputs), (output_dir / task['project'] /
+                                                 "index.html").as_posix()]}
+
+
+def publish_is_fresh(entry, project_hash, options, base_dir):
+    """Whether a pen's page and every file it references are unchanged"""
+    if not entry or entry.get('project_hash') != project_hash or \
+            entry.get('options') != options:
+        return False
+    if not all((base_dir / output).exists() for output in entry.get('outputs', [])):
+        return False
+    try:
+        return all(stat_signature(base_dir / source) == signature
+                   for source, signature in entry.get('sources', {}).items())
+    except OSError:
+        return False
+
+
+def load_config(base_dir):
+    """Read .index-config.json, or {} if it is missing or invalid"""
+    try:
+        with open(Path(base_dir) / ".index-config.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def to_datetime(value):
+    """Coerce a cached 'modified' value (datetime or its str()) to a datetime"""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
 
 
 class ProjectIndexBuilder:
-    def __init__(self, base_dir="."):
+    def __init__(self, base_dir=".", jobs=1, parser='stream',
+                 cache_backend='sqlite', stats_file=None, stats_format='json',
+                 optimize_images=False, transcode_audio=False,
+                 fingerprint=False, minify=False, inline_limit=4096,
+                 sync=False, sync_mode='link', thumbnails=False, compress=False,
+                 search_index=False, initial_cards=60, shard=False,
+                 since=None, metrics_file=None, print_metrics=False,
+                 metrics_top=10):
         self.base_dir = Path(base_dir)
-        self.cache_file = self.base_dir / ".project_cache.json"
+        self.metrics = BuildMetrics(top=metrics_top)
+        self.metrics_file = metrics_file
+        self.print_metrics = print_metrics
+        self.since = since
+        self.git_state = None
+        self.shard = shard
+        self.shard_cache = {}
+        self.search_index = search_index
+        self.initial_cards = initial_cards
+        self.compress = compress
+        self.thumbnails = thumbnails
+        self.optimize_images = optimize_images
+        self.transcode_audio = transcode_audio
+        self.fingerprint = fingerprint
+        self.minify = minify
+        self.inline_limit = inline_limit
+        self.sync = sync
+        self.sync_mode = sync_mode
+        self.stats_file = stats_file
+        self.stats_format = stats_format
+        self.jobs = jobs
+        self.parser = parser
+        self.config = load_config(self.base_dir)
+        discovery = self.config.get('discovery', {})
+        self.discovery_roots = [
+            self.base_dir / root
+            for root in discovery.get('roots', DEFAULT_DISCOVERY_ROOTS)]
+        self.discovery_ignore = discovery.get('ignore', DEFAULT_DISCOVERY_IGNORE)
+        self.technologies = load_technologies(self.base_dir)
+        # Everything besides the sources that shapes a parsed record; it
+        # leads every cache signature and seeds the content hash
+        self.extract_key = f"{self.parser}:{technologies_key(self.technologies)}"
+        self.cache_backend = cache_backend
         self.output_file = self.base_dir / "public" / "index.html"
         self.projects = []
-        self.cache = self.load_cache()
+        self.candidates = {}
+        self.card_cache = {}
+        self.category_cache = {}
+        self.written = {}
+        with self.metrics.phase('cache_load'):
+            self.cache = self.load_cache()
         self.css_styles = """
         :root {
             --primary: #3b82f6;
@@ -198,6 +680,80 @@ class ProjectIndexBuilder:
             box-shadow: 0 20px 40px rgba(0, 0, 0, 0.3);
         }
         
+        .project-thumbnail {
+            display: block;
+            width: 100%;
+            height: auto;
+            aspect-ratio: 16 / 9;
+            object-fit: cover;
+            border-radius: calc(var(--squircle-factor) * 60px);
+            margin-bottom: 1rem;
+        }
+        
+        .search {
+            margin-top: 1.5rem;
+        }
+        
+        .search-input {
+            width: 100%;
+            max-width: 480px;
+            padding: 0.75rem 1.25rem;
+            border-radius: calc(var(--squircle-factor) * 60px);
+            border: 1px solid var(--glass-border);
+            background: var(--surface);
+            color: var(--text);
+            font-size: 1rem;
+        }
+        
+        .search-results {
+            margin-bottom: 2rem;
+        }
+        
+        .search-count {
+            color: var(--text-light);
+            margin-bottom: 1rem;
+        }
+        
+        .show-more {
+            margin-top: 1.5rem;
+            background: var(--surface);
+            color: var(--text);
+            border: 1px solid var(--glass-border);
+            border-radius: calc(var(--squircle-factor) * 60px);
+            padding: 0.75rem 1.5rem;
+            font-weight: 600;
+            cursor: pointer;
+        }
+        
+        .category-links {
+            display: grid;
+            grid-template-columns: repeat(auto-fill, minmax(240px, 1fr));
+            gap: 1rem;
+        }
+        
+        .category-link {
+            display: flex;
+            align-items: center;
+            gap: 0.5rem;
+            background: var(--surface);
+            border: 1px solid var(--glass-border);
+            border-radius: calc(var(--squircle-factor) * 80px);
+            padding: 1rem 1.25rem;
+            color: var(--text);
+            text-decoration: none;
+            font-weight: 600;
+            transition: background-color 0.3s ease;
+        }
+        
+        .category-link:hover {
+            background: var(--surface-hover);
+        }
+        
+        .back-link {
+            color: var(--text-light);
+            text-decoration: none;
+        }
+        
         .project-title {
             font-size: 1.25rem;
             font-weight: 600;
@@ -260,148 +816,264 @@ class ProjectIndexBuilder:
             .stats { flex-direction: column; align-items: center; }
         }
         """
+        if self.minify:
+            self.css_styles = minify_css(self.css_styles)[0]
 
     def load_cache(self):
         """Load cached project data to avoid unnecessary re-processing"""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                pass
-        return {}
+        return open_cache(self.base_dir, self.cache_backend)
 
     def save_cache(self):
-        """Save project cache for future runs"""
-        with open(self.cache_file, 'w', encoding='utf-8') as f:
-            json.dump(self.cache, f, indent=2, default=str)
+        """Save changed project cache entries for future runs"""
+        with self.metrics.phase('cache_save'):
+            self.cache.save()
 
     def get_file_hash(self, file_path):
         """Get hash of file content for change detection"""
         try:
-            with open(file_path, 'rb') as f:
-                return hashlib.md5(f.read()).hexdigest()
-        except:
+            with self.metrics.phase('hashing'):
+                digest = file_digest(file_path)
+                self.metrics.bytes_read['hashing'] += os.path.getsize(file_path)
+                return digest
+        except OSError:
             return None
 
-    def extract_project_info(self, project_path):
-        """Extract metadata from a project's index.html"""
+    def get_file_signature(self, stat_result):
+        """Cheap change signature from stat data: (size, mtime_ns, inode)"""
+        return [stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino]
+
+    def get_sources_hash(self, project_path, names):
+        """Hash a project's source files together with the parser and detector config"""
+        digest = hashlib.blake2b(self.extract_key.encode(), digest_size=16)
+        for name in names:
+            file_hash = self.get_file_hash(project_path / name)
+            if file_hash is not None:
+                digest.update(f"{name}:{file_hash};".encode())
+        return digest.hexdigest()
+
+    def lookup_project(self, project_path):
+        """Resolve a project from the cache, or describe the parse it needs.
+
+        Returns (cached_info, parse_task); at most one of them is set and both
+        are None when the directory has no index.html.
+        """
+        cache_key = str(project_path.relative_to(self.base_dir))
+        cached = self.cache.get(cache_key)
+
+        # With --since, git vouches for unchanged files without a stat or read
+        blobs = self.get_blob_signature(cache_key)
+        if blobs and cached:
+            if cached.get('blobs') == blobs:
+                self.metrics.cache['git_hits'] += 1
+                return self.cache_hit(cache_key, cached), None
+            # The restored cache was built at the base revision, so entries
+            # for projects untouched since then are still valid
+            if (not self.git_state.is_changed(cache_key, SOURCE_FILES)
+                    and cached.get('stat', [None])[0] == self.extract_key):
+                cached = self.cache[cache_key] = {**cached, 'blobs': blobs}
+                self.metrics.cache['git_hits'] += 1
+                return self.cache_hit(cache_key, cached), None
+
         index_file = project_path / "index.html"
-        if not index_file.exists():
+        try:
+            index_stat = index_file.stat()
+        except OSError:
+            return None, None
+
+        # Technologies are detected across index.html and its sibling
+        # script/style files, so all of them take part in validation
+        names = ["index.html"]
+        signature = [self.extract_key, ["index.html", *self.get_file_signature(index_stat)]]
+        for name in SOURCE_FILES[1:]:
+            try:
+                file_stat = (project_path / name).stat()
+            except OSError:
+                continue
+            names.append(name)
+            signature.append([name, *self.get_file_signature(file_stat)])
+
+        # Check cache first: an unchanged stat signature means no read at all,
+        # otherwise fall back to comparing content hashes
+        if cached and cached.get('stat') == signature:
+            if blobs and cached.get('blobs') != blobs:
+                cached = self.cache[cache_key] = {**cached, 'blobs': blobs}
+            self.metrics.cache['stat_hits'] += 1
+            return self.cache_hit(cache_key, cached), None
+
+        file_hash = self.get_sources_hash(project_path, names)
+
+        if cached and cached.get('hash') == file_hash:
+            cached = self.cache[cache_key] = {
+                **cached, 'stat': signature, 'blobs': blobs or cached.get('blobs')}
+            self.metrics.cache['hash_hits'] += 1
+            return self.cache_hit(cache_key, cached), None
+
+        self.metrics.cache['misses'] += 1
+        return None, {
+            'project_path': project_path,
+            'cache_key': cache_key,
+            'hash': file_hash,
+            'stat': signature,
+            'mtime': index_stat.st_mtime,
+            'parser': self.parser,
+            'sources': names,
+            'technologies': self.technologies,
+            'blobs': blobs
+        }
+
+    def cache_hit(self, cache_key, cached):
+        """Copy of a cached project record for this build"""
+        cached_data = cached.copy()
+        cached_data['path'] = cache_key
+        return cached_data
+
+    def get_blob_signature(self, cache_key):
+        """Git blob ids of a project's sources plus the parser and detector config.
+
+        None unless --since is in use and git can vouch for every source
+        file, i.e. index.html is tracked and nothing is dirty.
+        """
+        if self.git_state is None:
+            return None
+        blobs = self.git_state.blob_signature(cache_key, SOURCE_FILES)
+        if not blobs or blobs[0][0] != 'index.html':
             return None
+        return [self.extract_key, *blobs]
 
-        # Check cache first
-        cache_key = str(project_path.relative_to(self.base_dir))
-        file_hash = self.get_file_hash(index_file)
+    def read_git_state(self):
+        """Snapshot git blob ids and changes since --since, if requested"""
+        if not self.since:
+            return None
+        roots = [str(root.relative_to(self.base_dir)) for root in self.discovery_roots]
+        try:
+            state = read_git_state(self.base_dir, self.since, roots)
+        except GitError as e:
+            print(f"⚠️  Can't use git for change detection ({e}), "
+                  f"falling back to file hashes")
+            return None
+        print(f"🔀 Changed files since {self.since}: {len(state.changed)}")
+        return state
 
-        if cache_key in self.cache and self.cache[cache_key].get('hash') == file_hash:
-            cached_data = self.cache[cache_key].copy()
-            cached_data['path'] = cache_key
+    def extract_project_info(self, project_path):
+        """Extract metadata from a project's index.html"""
+        cached_data, task = self.lookup_project(project_path)
+        if task is None:
             return cached_data
 
-        # Parse HTML to extract info
-        try:
-            with open(index_file, 'r', encoding='utf-8') as f:
-                soup = BeautifulSoup(f.read(), 'html.parser')
-
-            # Extract title
-            title_tag = soup.find('title')
-            title = title_tag.get_text().strip(
-            ) if title_tag else project_path.name.replace('-', ' ').title()
-
-            # Extract description from meta tags
-            description = ""
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            if meta_desc:
-                description = meta_desc.get('content', '')
-
-            # Check if it has specific technologies
-            technologies = []
-            html_content = str(soup).lower()
-
-            if 'jquery' in html_content or '$(' in html_content:
-                technologies.append('jQuery')
-            if 'react' in html_content:
-                technologies.append('React')
-            if 'vue' in html_content:
-                technologies.append('Vue')
-            if 'canvas' in html_content:
-                technologies.append('Canvas')
-            if 'three.js' in html_content or 'threejs' in html_content:
-                technologies.append('Three.js')
-            if 'gsap' in html_content:
-                technologies.append('GSAP')
-            if 'squircle' in html_content:
-                technologies.append('Squircle UI')
-
-            # Determine category based on path
-            path_parts = project_path.parts
-            if 'challenges' in path_parts:
-                category = path_parts[path_parts.index(
-                    'challenges') + 1] if len(path_parts) > path_parts.index('challenges') + 1 else 'misc'
-            elif 'other' in path_parts:
-                category = 'experiments'
+        with self.metrics.phase('parsing'):
+            project_info, timing = parse_project(task)
+        self.metrics.record_project(timing)
+        if project_info:
+            # Cache the result
+            self.cache[task['cache_key']] = project_info.copy()
+        return project_info
+
+    def extract_projects(self, candidates):
+        """Extract every (project_dir, section, category) candidate in order.
+
+        Cache hits are resolved inline; misses are parsed serially or, with
+        jobs > 1, in a process pool. Results are merged back in discovery
+        order so the output matches a serial build exactly.
+        """
+        resolved = []
+        tasks = []
+        with self.metrics.phase('cache_lookup'):
+            for project_dir, section, category in candidates:
+                cached_data, task = self.lookup_project(project_dir)
+                if task is not None:
+                    tasks.append(task)
+                resolved.append((cached_data, task, section, category))
+
+        with self.metrics.phase('parsing'):
+            if self.jobs > 1 and len(tasks) > 1:
+                with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                    chunksize = max(1, len(tasks) // (self.jobs * 4))
+                    parsed = list(pool.map(parse_project, tasks,
+                                           chunksize=chunksize))
             else:
-                category = 'projects'
-
-            project_info = {
-                'title': title,
-                'description': description or f"Interactive {category} project",
-                'path': cache_key,
-                'category': category.replace('-', ' ').title(),
-                'technologies': technologies,
-                'modified': datetime.fromtimestamp(index_file.stat().st_mtime),
-                'hash': file_hash
-            }
+                parsed = [parse_project(task) for task in tasks]
+        parsed = iter(parsed)
 
-            # Cache the result
-            self.cache[cache_key] = project_info.copy()
+        for cached_data, task, section, category in resolved:
+            if task is None:
+                project_info = cached_data
+            else:
+                project_info, timing = next(parsed)
+                self.metrics.record_project(timing)
+                if project_info:
+                    self.cache[task['cache_key']] = project_info.copy()
+            if project_info:
+                project_info['section'] = section
+                if category:
+                    project_info['category'] = category
+                self.projects.append(project_info)
 
-            return project_info
+    def discover_projects(self):
+        """Find every project directory under the configured roots.
 
-        except Exception as e:
-            print(f"Error processing {project_path}: {e}")
-            return None
+        A project is any directory (at any depth below a root) containing an
+        index.html; projects may contain other projects. Directories matching
+        the ignore globs are pruned, and os.scandir's cached d_type is used
+        so discovery costs one directory read per directory and only stats
+        symlinks. Symlinked directories are followed, except to one of
+        their own parents or to a target another link already reached, so
+        link loops end. Returns (project_dir, section,
+        category) tuples in a stable order.
+        """
+        max_depth = self.config.get('discovery', {}).get('max_depth',
+                                                         DEFAULT_DISCOVERY_DEPTH)
+        candidates = []
+        linked = set()
+
+        for root in self.discovery_roots:
+            section = 'challenges' if root.name == 'challenges' else 'other'
+            stack = [(root, ())]
+            while stack:
+                directory, rel_parts = stack.pop()
+                try:
+                    with os.scandir(directory) as it:
+                        entries = sorted(it, key=lambda entry: entry.name)
+                except OSError:
+                    continue
+
+                subdirs = []
+                for entry in entries:
+                    if entry.is_dir():
+                        rel = '/'.join(rel_parts + (entry.name,))
+                        if is_ignored(entry.name, rel, self.discovery_ignore):
+                            continue
+                        if entry.is_symlink():
+                            target = os.path.realpath(entry.path)
+                            here = os.path.realpath(directory)
+                            if target in linked or \
+                                    (here + os.sep).startswith(target + os.sep):
+                                continue
+                            linked.add(target)
+                        subdirs.append(entry)
+                    elif rel_parts and entry.name == 'index.html':
+                        # Nested projects take their category from the first
+                        # directory below the root
+                        category = rel_parts[0].replace('-', ' ').title() \
+                            if len(rel_parts) > 1 else None
+                        candidates.append((Path(directory), section, category))
+
+                if len(rel_parts) < max_depth:
+                    for entry in reversed(subdirs):
+                        stack.append((Path(entry.path), rel_parts + (entry.name,)))
+
+        return candidates
 
     def scan_projects(self):
-        """Scan for all projects in challenges/ and other/ directories"""
+        """Scan for all projects under the discovery roots"""
         self.projects = []
+        with self.metrics.phase('git'):
+            self.git_state = self.read_git_state()
+        with self.metrics.phase('discovery'):
+            candidates = self.discover_projects()
 
-        # Scan challenges directory
-        challenges_dir = self.base_dir / "challenges"
-        if challenges_dir.exists():
-            for category_dir in challenges_dir.iterdir():
-                if category_dir.is_dir():
-                    for project_dir in category_dir.iterdir():
-                        if project_dir.is_dir():
-                            project_info = self.extract_project_info(
-                                project_dir)
-                            if project_info:
-                                project_info['section'] = 'challenges'
-                                self.projects.append(project_info)
-
-        # Scan other directory (including nested categories)
-        other_dir = self.base_dir / "other"
-        if other_dir.exists():
-            for category_dir in other_dir.iterdir():
-                if category_dir.is_dir():
-                    # Check if it's a project directory (has index.html)
-                    if (category_dir / "index.html").exists():
-                        project_info = self.extract_project_info(category_dir)
-                        if project_info:
-                            project_info['section'] = 'other'
-                            self.projects.append(project_info)
-                    # If not, it might be a category directory
-                    else:
-                        for project_dir in category_dir.iterdir():
-                            if project_dir.is_dir():
-                                project_info = self.extract_project_info(
-                                    project_dir)
-                                if project_info:
-                                    project_info['section'] = 'other'
-                                    project_info['category'] = category_dir.name.replace(
-                                        '-', ' ').title()
-                                    self.projects.append(project_info)
+        self.candidates = {project_dir: (section, category)
+                           for project_dir, section, category in candidates}
+        self.extract_projects(candidates)
 
         # Sort projects by section, category, then title
         self.projects.sort(key=lambda x: (
@@ -409,6 +1081,72 @@ class ProjectIndexBuilder:
 
         print(f"Found {len(self.projects)} projects")
 
+    def find_project_dir(self, path):
+        """Return the known project directory containing path, if any"""
+        path = Path(path)
+        for candidate in (path, *path.parents):
+            if candidate in self.candidates:
+                return candidate
+            if candidate == self.base_dir:
+                break
+        return None
+
+    def rebuild(self, changed_paths):
+        """Re-extract only the projects that contain changed_paths.
+
+        Anything that can't be mapped to a known project (new or deleted
+        projects, category renames), or changed_paths=None when the watcher
+        lost events, falls back to a full, cache-backed scan.
+        """
+        # The git snapshot predates these edits, so trust only the files now
+        self.git_state = None
+        self.metrics.reset()
+        affected = None if changed_paths is None else set()
+        for path in changed_paths or ():
+            project_dir = self.find_project_dir(path)
+            if project_dir is None:
+                affected = None
+                break
+            affected.add(project_dir)
+
+        if affected is None:
+            print("🔍 Rescanning projects...")
+            self.scan_projects()
+        else:
+            by_path = {project['path']: i for i, project in enumerate(self.projects)}
+            for project_dir in sorted(affected):
+                section, category = self.candidates[project_dir]
+                project_info = self.extract_project_info(project_dir)
+                index = by_path.get(str(project_dir.relative_to(self.base_dir)))
+                if project_info is None or index is None:
+                    print("🔍 Rescanning projects...")
+                    self.scan_projects()
+                    break
+                print(f"♻️  Updated {project_info['path']}")
+                project_info['section'] = section
+                if category:
+                    project_info['category'] = category
+                self.projects[index] = project_info
+            else:
+                self.projects.sort(key=lambda x: (
+                    x['section'], x['category'], x['title']))
+
+        if self.thumbnails:
+            self.build_thumbnails()
+        with self.metrics.phase('rendering'):
+            self.generate_html()
+        if self.stats_file:
+            self.write_stats(self.stats_file, self.stats_format)
+        if self.fingerprint or self.minify:
+            with self.metrics.phase('publish'):
+                self.publish_pens()
+        if self.sync:
+            self.sync_projects()
+        if self.compress:
+            self.precompress()
+        self.save_cache()
+        self.report_metrics()
+
     def generate_html(self):
         """Generate the home page HTML"""
         # Group projects by main section (Challenges/Other) and then by category
@@ -444,8 +1182,37 @@ class ProjectIndexBuilder:
             });
         """
 
+        # Page order: sections, then sorted categories, then cards by title
+        layout = [(section_key, category, sorted(projects, key=lambda x: x['title']))
+                  for section_key, section_data in sections.items()
+                  for category, projects in sorted(section_data['categories'].items())]
+
+        # With a search index only the first slice of cards goes into the
+        # page; the rest are rendered client-side from the index on demand
+        search_html = results_html = ''
+        shown = {}
+        if self.search_index:
+            remaining = self.initial_cards
+            for section_key, category, projects in layout:
+                shown[(section_key, category)] = min(len(projects), remaining)
+                remaining -= shown[(section_key, category)]
+            index_name = self.write_search_index(layout)
+            dropdown_script += f"""
+            const SEARCH_INDEX_URL = {json.dumps(index_name)};
+""" + SEARCH_SCRIPT
+            search_html = """
+            <div class="search">
+                <input type="search" class="search-input" placeholder="Search projects, categories, technologies..." aria-label="Search projects">
+            </div>"""
+            results_html = """
+        <div class="search-results" hidden>
+            <p class="search-count"></p>
+            <div class="projects-grid"></div>
+        </div>
+        """
+
         # Start building the HTML
-        html = f"""<!DOCTYPE html>
+        parts = [f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -473,16 +1240,16 @@ class ProjectIndexBuilder:
                     <div class="stat-value">{len(set(t for p in self.projects for t in p['technologies']))}</div>
                     <div class="stat-label">Technologies</div>
                 </div>
-            </div>
+            </div>{search_html}
         </div>
-        
+        {results_html}
         <div class="content">
-"""
+"""]
 
         # Add each section (Challenges/Other)
         for section_key, section_data in sections.items():
             if section_data['categories']:
-                html += f"""
+                parts.append(f"""
             <div class="section" data-section="{section_key}">
                 <div class="section-header">
                     <h2 class="section-title">
@@ -493,23 +1260,77 @@ class ProjectIndexBuilder:
                 </div>
                 <div class="section-content">
                     <div class="categories-wrapper">
-"""
+""")
 
-                # Add categories within each section
-                for category, projects in sorted(section_data['categories'].items()):
-                    html += f"""
-                        <div class="category">
-                            <h2 class="category-title">
-                                <span>{'🚀' if section_key == 'challenges' else '🔬'}</span>
-                                <span>{category}</span>
-                                <span>({len(projects)})</span>
-                            </h2>
-                            <div class="projects-grid">
-"""
+                # Add categories within each section; sharded builds link to
+                # one page per category instead of inlining every card
+                if self.shard:
+                    parts.append("""
+                        <div class="category-links">""")
+                for key, category, projects in layout:
+                    if key != section_key:
+                        continue
+                    if self.shard:
+                        parts.append(self.render_category_link(
+                            section_key, category, projects))
+                    else:
+                        parts.append(self.render_category(
+                            section_key, category, projects,
+                            shown.get((section_key, category))))
+                if self.shard:
+                    parts.append("""
+                        </div>""")
+
+                parts.append("""
+                    </div>
+                </div>
+            </div>
+""")
+
+        # Close the HTML
+        parts.append(f"""
+        </div>
+        
+        <div class="last-updated">
+            Last updated: {self.last_modified().strftime('%B %d, %Y at %I:%M %p')}
+        </div>
+    </div>
+    <script>
+        {dropdown_script}
+    </script>
+</body>
+</html>
+""")
+        html = ''.join(parts)
+
+        if self.shard:
+            self.generate_shards(layout)
+        else:
+            self.remove_stale_shards(set())
+
+        # Only write when the page actually changed, so static servers and
+        # CDNs don't see a new file on every build
+        if self.write_if_changed(self.output_file, html):
+            print("✅ Home page built successfully:", self.output_file)
+        else:
+            print("✅ Home page unchanged:", self.output_file)
+        print("🌐 View at: http://localhost:3000")
 
-                    for project in sorted(projects, key=lambda x: x['title']):
-                        html += f"""
-                                <div class="project-card">
+    def render_card(self, project, page_dir=None):
+        """Render one project card, reusing the fragment while its hash is unchanged"""
+        thumbnail = project.get('thumbnail')
+        key = (project.get('hash'), project['category'], project['title'],
+               thumbnail and thumbnail['src'])
+        cached = self.card_cache.get((project['path'], page_dir))
+        if cached and cached[0] == key:
+            return cached[1]
+
+        thumbnail_html = ''
+        if thumbnail:
+            thumbnail_html = f"""
+                                    <img class="project-thumbnail" src="{self.output_url(thumbnail['src'], page_dir)}" width="{thumbnail['width']}" height="{thumbnail['height']}" alt="" loading="lazy" decoding="async">"""
+        card = f"""
+                                <div class="project-card">{thumbnail_html}
                                     <h3 class="project-title">{project['title']}</h3>
                                     <p class="project-description">{project['description']}</p>
                                     <div class="project-technologies">
@@ -521,104 +1342,515 @@ class ProjectIndexBuilder:
                                     </a>
                                 </div>
 """
+        self.card_cache[(project['path'], page_dir)] = (key, card)
+        return card
 
-                    html += """
-                            </div>
-                        </div>
+    def render_category(self, section_key, category, projects, shown=None,
+                        page_dir=None):
+        """Render a category block, reusing it while none of its cards changed.
+
+        With `shown`, only the first `shown` cards are rendered, followed by a
+        button that loads the rest from the search index. `page_dir` is the
+        directory of the page the block goes into, for relative URLs.
+        """
+        projects = sorted(projects, key=lambda x: x['title'])
+        key = (tuple((p['path'], p.get('hash'),
+                      p.get('thumbnail') and p['thumbnail']['src']) for p in projects),
+               shown)
+        cached = self.category_cache.get((section_key, category, page_dir))
+        if cached and cached[0] == key:
+            return cached[1]
+
+        visible = projects if shown is None else projects[:shown]
+        more = ''
+        if len(visible) < len(projects):
+            more = f"""                            <button type="button" class="show-more" data-section="{section_key}" data-category="{category}" data-shown="{len(visible)}">Show {len(projects) - len(visible)} more</button>
 """
+        fragment = ''.join([f"""
+                        <div class="category">
+                            <h2 class="category-title">
+                                <span>{'🚀' if section_key == 'challenges' else '🔬'}</span>
+                                <span>{category}</span>
+                                <span>({len(projects)})</span>
+                            </h2>
+                            <div class="projects-grid">
+""", *(self.render_card(project, page_dir) for project in visible), """
+                            </div>
+""", more, """                        </div>
+"""])
+        self.category_cache[(section_key, category, page_dir)] = (key, fragment)
+        return fragment
 
-                html += """
-                    </div>
-                </div>
-            </div>
+    def shard_name(self, section_key, category):
+        slug = re.sub(r'[^a-z0-9]+', '-', category.lower()).strip('-') or 'misc'
+        return f"{section_key}-{slug}.html"
+
+    def render_category_link(self, section_key, category, projects):
+        """Landing-page link to a category's shard page"""
+        href = f"{SHARD_DIR}/{self.shard_name(section_key, category)}"
+        return f"""
+                        <a class="category-link" href="{href}">
+                            <span>{'🚀' if section_key == 'challenges' else '🔬'}</span>
+                            <span>{category}</span>
+                            <span>({len(projects)})</span>
+                        </a>
 """
 
-        # Close the HTML
-        html += f"""
+    def generate_shards(self, layout):
+        """Write one page per section/category next to the landing page.
+
+        A shard is only re-rendered when one of its projects' hashes (or
+        thumbnails) changed, and only rewritten when its content differs.
+        """
+        shard_dir = self.output_file.parent / SHARD_DIR
+        written = set()
+        for section_key, category, projects in layout:
+            name = self.shard_name(section_key, category)
+            written.add(name)
+            path = shard_dir / name
+            key = tuple((p['path'], p.get('hash'),
+                         p.get('thumbnail') and p['thumbnail']['src']) for p in projects)
+            if self.shard_cache.get(name) == key and path.exists():
+                continue
+            html = self.render_shard(section_key, category, projects, shard_dir)
+            if self.write_if_changed(path, html):
+                print(f"✅ Shard updated: {path}")
+            self.shard_cache[name] = key
+
+        self.remove_stale_shards(written)
+
+    def remove_stale_shards(self, written):
+        """Delete shard pages not in `written`, and their directory once empty"""
+        shard_dir = self.output_file.parent / SHARD_DIR
+        if not shard_dir.exists():
+            return
+        for stale in shard_dir.glob("*.html"):
+            if stale.name not in written:
+                stale.unlink()
+                self.shard_cache.pop(stale.name, None)
+                print(f"🗑️  Removed stale shard: {stale}")
+        try:
+            shard_dir.rmdir()
+        except OSError:
+            pass
+
+    def render_shard(self, section_key, category, projects, shard_dir):
+        """Render a standalone page for one category"""
+        back = self.output_url(self.output_file.relative_to(self.base_dir), shard_dir)
+        return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{category} - 🌟 Project Portfolio</title>
+    <style>
+        {self.css_styles}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1 class="title">{category}</h1>
+            <p class="subtitle"><a class="back-link" href="{back}">← All projects</a></p>
+        </div>
+        
+        <div class="content">
+{self.render_category(section_key, category, projects, page_dir=shard_dir)}
         </div>
         
         <div class="last-updated">
-            Last updated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}
+            Last updated: {self.last_modified(projects).strftime('%B %d, %Y at %I:%M %p')}
         </div>
     </div>
-    <script>
-        {dropdown_script}
-    </script>
 </body>
 </html>
 """
 
-        # Write the generated HTML to file
-        with open(self.output_file, 'w', encoding='utf-8') as f:
-            f.write(html)
+    def write_search_index(self, layout):
+        """Write the versioned search index for the page; returns its URL"""
+        records = [{
+            'title': project['title'],
+            'description': project['description'],
+            'category': category,
+            'section': section_key,
+            'url': f"/{project['path']}",
+            'technologies': project['technologies'],
+            'thumbnail': [self.output_url(project['thumbnail']['src']),
+                          project['thumbnail']['width'],
+                          project['thumbnail']['height']]
+            if project.get('thumbnail') else None,
+        } for section_key, category, projects in layout for project in projects]
+        return write_search_index(self.output_file.parent, build_search_index(records))
 
-        print("✅ Home page built successfully:", self.output_file)
-        print("🌐 View at: http://localhost:3000")
+    def output_url(self, path, page_dir=None):
+        """URL of a base-relative output path, relative to the page's directory"""
+        return Path(os.path.relpath(self.base_dir / path,
+                                    page_dir or self.output_file.parent)).as_posix()
+
+    def last_modified(self, projects=None):
+        """Newest project modification time, so the page is stable between builds"""
+        times = [to_datetime(p.get('modified'))
+                 for p in (self.projects if projects is None else projects)]
+        times = [t for t in times if t is not None]
+        return max(times) if times else datetime.fromtimestamp(0)
+
+    def write_if_changed(self, path, content):
+        """Write content to path unless it already holds exactly that text.
+
+        What this builder last wrote is remembered with the file's stat
+        signature, which saves re-reading the file only while it is still
+        the one written; deleted or edited outputs are written again.
+        """
+        try:
+            signature = stat_signature(path)
+        except OSError:
+            signature = None
+        if signature is not None and self.written.get(path) == (content, signature):
+            return False
+        with self.metrics.phase('writing'):
+            changed = write_if_changed(path, content)
+            self.written[path] = (content, stat_signature(path))
+            return changed
 
     def build(self):
         """Main build process"""
         print("🔍 Scanning for projects...")
         self.scan_projects()
 
+        if self.thumbnails:
+            print("🖼️  Building thumbnails...")
+            self.build_thumbnails()
+
         print("🏗️  Building home page...")
-        self.generate_html()
+        with self.metrics.phase('rendering'):
+            self.generate_html()
+
+        if self.stats_file:
+            self.write_stats(self.stats_file, self.stats_format)
+
+        if self.optimize_images:
+            print("🖼️  Optimizing images...")
+            self.build_images()
+
+        if self.transcode_audio:
+            print("🔊 Transcoding audio...")
+            self.build_audio()
+
+        if self.fingerprint or self.minify:
+            print("🔏 Publishing pens...")
+            with self.metrics.phase('publish'):
+                self.publish_pens()
+
+        if self.sync:
+            print("🔗 Syncing project files...")
+            self.sync_projects()
+
+        if self.compress:
+            print("🗜️  Pre-compressing output...")
+            self.precompress()
 
         # Save cache
         self.save_cache()
+        self.report_metrics()
+
+    def report_metrics(self):
+        """Print and/or save the metrics collected during this build"""
+        if self.print_metrics:
+            print(self.metrics.render())
+        if self.metrics_file:
+            self.metrics.write(self.metrics_file)
+
+    def build_thumbnails(self):
+        """Attach cached WebP preview thumbnails to the scanned projects"""
+        try:
+            with self.metrics.phase('thumbnails'):
+                return build_thumbnails(self.base_dir, self.projects,
+                                        self.find_preview_image,
+                                        configured=self.config.get('thumbnails', {}),
+                                        jobs=self.jobs)
+        except ImportError:
+            print("⚠️  Pillow is not installed, skipping thumbnails")
+            return None
+
+    def find_preview_image(self, project):
+        """Pick a local preview image for a project.
+
+        In order: a path configured under "thumbnails" in .index-config.json,
+        a thumbnail.* / preview.* file in the project, then the first local
+        image (<img> or og:image) referenced by its index.html.
+        """
+        project_dir = self.base_dir / project['path']
+        configured = self.config.get('thumbnails', {}).get(project['path'])
+        if configured:
+            return self.resolve_local_url(configured, project_dir)
+
+        for name in sorted(os.listdir(project_dir)):
+            if name.split('.')[0].lower() in ('thumbnail', 'preview'):
+                return project_dir / name
+
+        try:
+            with open(project_dir / "index.html", 'r', encoding='utf-8') as f:
+                meta = ProjectMetadataParser(stop_after_head=False).extract(f.read())
+        except OSError:
+            return None
+        for src in meta.images:
+            image = self.resolve_local_url(src, project_dir)
+            if image is not None:
+                return image
+        return None
+
+    def resolve_local_url(self, src, project_dir):
+        """Map an image URL from a page to a file in this repo, if it is one"""
+        if src.startswith(REPO_RAW_URL):
+            # https://raw.githubusercontent.com/<repo>/<branch>/<path>
+            src = '/' + src[len(REPO_RAW_URL):].partition('/')[2]
+        return resolve_local_path(src, project_dir, self.base_dir)
+
+    def publish_pens(self):
+        """Publish each pen's page and the local files it references to public/.
+
+        Pages go to public/<project>/index.html. With fingerprint, script,
+        style, image and media references are rewritten to content-hashed
+        copies that can be served with Cache-Control: immutable. With
+        minify, HTML/CSS/JS are minified (CSS/JS with source maps) and
+        stylesheets and scripts up to inline_limit bytes are inlined. Pens
+        whose cache hash, options and referenced files are unchanged are
+        skipped via public/pens.json; published files no pen references any
+        more are removed.
+        """
+        output_dir = self.output_file.parent.relative_to(self.base_dir)
+        manifest_path = self.output_file.parent / "pens.json"
+        manifest = load_manifest(manifest_path, 'pens')
+        options = {'fingerprint': self.fingerprint, 'minify': self.minify,
+                   'inline_limit': self.inline_limit if self.minify else 0}
+        entries = {}
+        tasks = []
+        for project in self.projects:
+            path = project['path']
+            entry = manifest.get(path)
+            if publish_is_fresh(entry, project.get('hash'), options, self.base_dir):
+                entries[path] = entry
+            else:
+                tasks.append({'base_dir': str(self.base_dir), 'project': path,
+                              'output_dir': output_dir.as_posix(),
+                              'cache_dir': str(self.base_dir / ".minify_cache"),
+                              'project_hash': project.get('hash'),
+                              'options': options, **options})
+
+        failed = 0
+        for task, result in zip(tasks, run_tasks(publish_project, tasks, self.jobs)):
+            if result is None:
+                failed += 1
+            else:
+                entries[task['project']] = result
+
+        # Files can be shared between pens, so only drop copies that no
+        # current entry still points at
+        kept = {output for entry in entries.values() for output in entry['outputs']}
+        for path, entry in manifest.items():
+            remove_outputs(self.base_dir, {'outputs': [
+                output for output in entry.get('outputs', []) if output not in kept]})
+
+        save_manifest(manifest_path, 'pens', entries)
+        print(f"✅ pens: {len(tasks) - failed} published, "
+              f"{len(self.projects) - len(tasks)} unchanged, {failed} failed")
+        return entries
+
+    def sync_projects(self):
+        """Mirror the project roots into public/ as hardlinks, reflinks or copies.
+
+        Roots, ignore patterns and mode come from "sync" in .index-config.json
+        (roots default to the discovery roots). Pages and files the publish
+        stage wrote are left alone while publishing is on; with it off, they
+        are dropped so the plain sources take their place.
+        """
+        sync = self.config.get('sync', {})
+        roots = sync.get('roots') or [root.relative_to(self.base_dir).as_posix()
+                                      for root in self.discovery_roots]
+        output_dir = self.output_file.parent.relative_to(self.base_dir)
+        pens_path = self.output_file.parent / "pens.json"
+        published = load_manifest(pens_path, 'pens')
+        exclude = set()
+        if self.fingerprint or self.minify:
+            exclude = {output for entry in published.values()
+                       for output in entry['outputs']}
+        elif published:
+            for entry in published.values():
+                remove_outputs(self.base_dir, entry)
+            pens_path.unlink(missing_ok=True)
+            print(f"🧹 Removed {len(published)} published pens (publishing is off)")
+
+        with self.metrics.phase('sync'):
+            return sync_trees(self.base_dir, roots, output_dir,
+                              ignore=sync.get('ignore', DEFAULT_SYNC_IGNORE),
+                              exclude=exclude,
+                              mode=sync.get('mode', self.sync_mode), jobs=self.jobs)
+
+    def precompress(self):
+        """Write .gz/.br siblings for the text artifacts under public/"""
+        with self.metrics.phase('compression'):
+            return precompress(self.base_dir,
+                               self.output_file.parent.relative_to(self.base_dir),
+                               jobs=self.jobs)
+
+    def build_images(self):
+        """Generate responsive WebP/AVIF variants of assets/ images"""
+        images = self.config.get('images', {})
+        try:
+            with self.metrics.phase('images'):
+                return optimize_images(
+                    self.base_dir,
+                    max_bytes=images.get('max_bytes', DEFAULT_MAX_IMAGE_BYTES),
+                    jobs=self.jobs)
+        except ImportError:
+            print("⚠️  Pillow is not installed, skipping image optimization")
+            return None
+
+    def build_audio(self):
+        """Transcode assets/audio loops to Opus and AAC (needs ffmpeg)"""
+        audio = self.config.get('audio', {})
+        with self.metrics.phase('audio'):
+            return transcode_audios(
+                self.base_dir, formats=audio.get('formats', ('opus', 'aac')),
+                bitrates=audio.get('bitrates'),
+                trim_silence=audio.get('trim_silence', '-60dB'), jobs=self.jobs)
+
+    def get_stats(self):
+        """Statistics for the scanned projects"""
+        return collect_stats(self.projects, self.last_modified())
+
+    def write_stats(self, output_file, fmt='json'):
+        """Write statistics for the scanned projects as JSON or markdown"""
+        with self.metrics.phase('stats'):
+            write_stats(self.get_stats(), output_file, fmt)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Build project index page")
     parser.add_argument('--watch', action='store_true',
                         help="Watch for changes and rebuild")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Keep caches warm and serve build-client.py "
+                             "requests over a Unix socket")
+    parser.add_argument('--socket', metavar='PATH',
+                        help="Socket for --daemon (default: <dir>/.build-index.sock)")
     parser.add_argument('--dir', default='.', help="Base directory to scan")
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help="Parse changed projects in N worker processes")
+    parser.add_argument('--parser', choices=sorted(METADATA_EXTRACTORS),
+                        default='stream',
+                        help="HTML metadata extractor; 'soup' uses BeautifulSoup "
+                             "for malformed pages")
+    parser.add_argument('--cache-backend', choices=CACHE_BACKENDS,
+                        default='sqlite',
+                        help="Project cache storage (default: sqlite)")
+    parser.add_argument('--stats', metavar='FILE',
+                        help="Also write project statistics to FILE")
+    parser.add_argument('--stats-format', choices=STATS_FORMATS, default='json',
+                        help="Statistics format (default: json)")
+    parser.add_argument('--optimize-images', action='store_true',
+                        help="Build WebP/AVIF variants of assets/ images "
+                             "(needs Pillow)")
+    parser.add_argument('--transcode-audio', action='store_true',
+                        help="Build Opus/AAC variants of assets/audio files "
+                             "(needs ffmpeg)")
+    parser.add_argument('--fingerprint', action='store_true',
+                        help="Publish pens to public/ with content-hashed "
+                             "local assets")
+    parser.add_argument('--minify', action='store_true',
+                        help="Publish pens to public/ minified, with source "
+                             "maps and small CSS/JS inlined")
+    parser.add_argument('--inline-limit', type=int, default=4096,
+                        metavar='BYTES',
+                        help="Inline minified CSS/JS up to BYTES with --minify "
+                             "(default: 4096, 0 disables)")
+    parser.add_argument('--sync', action='store_true',
+                        help="Mirror challenges/ and other/ into public/ "
+                             "incrementally, hardlinking where possible")
+    parser.add_argument('--sync-mode', choices=SYNC_MODES, default='link',
+                        help="Preferred way to place synced files; falls back "
+                             "to the next one when unsupported (default: link)")
+    parser.add_argument('--thumbnails', action='store_true',
+                        help="Add lazy-loaded WebP preview thumbnails to cards "
+                             "(needs Pillow)")
+    parser.add_argument('--compress', action='store_true',
+                        help="Write .gz/.br siblings of text files in public/")
+    parser.add_argument('--search-index', action='store_true',
+                        help="Emit a JSON search index and render only the "
+                             "first --initial-cards cards into the page")
+    parser.add_argument('--initial-cards', type=int, default=60,
+                        help="Cards rendered up front with --search-index")
+    parser.add_argument('--shard', action='store_true',
+                        help="Write one page per section/category plus a "
+                             "landing page with counts")
+    parser.add_argument('--since', metavar='REV',
+                        help="Use git blob ids to reuse a project cache "
+                             "restored from a build of REV (for CI)")
+    parser.add_argument('--metrics', action='store_true',
+                        help="Print per-phase timings, cache hits and the "
+                             "slowest projects after each build")
+    parser.add_argument('--metrics-json', metavar='FILE',
+                        help="Write the build metrics to FILE as JSON")
+    parser.add_argument('--metrics-top', type=int, default=10,
+                        help="How many of the slowest projects to report")
+    parser.add_argument('--profile', nargs='?', const='build-profile',
+                        metavar='PREFIX',
+                        help="Run under cProfile and tracemalloc and write "
+                             "PREFIX.pstats (default: build-profile)")
 
     args = parser.parse_args()
+    if args.parser == 'soup':
+        try:
+            import bs4  # noqa: F401
+        except ImportError:
+            parser.error("--parser soup needs BeautifulSoup4 "
+                         "(pip install -r requirements.txt)")
 
-    builder = ProjectIndexBuilder(args.dir)
+    builder = ProjectIndexBuilder(args.dir, jobs=args.jobs, parser=args.parser,
+                                 cache_backend=args.cache_backend,
+                                 stats_file=args.stats,
+                                 stats_format=args.stats_format,
+                                 optimize_images=args.optimize_images,
+                                 transcode_audio=args.transcode_audio,
+                                 fingerprint=args.fingerprint,
+                                 minify=args.minify,
+                                 inline_limit=args.inline_limit,
+                                 sync=args.sync,
+                                 sync_mode=args.sync_mode,
+                                 thumbnails=args.thumbnails,
+                                 compress=args.compress,
+                                 search_index=args.search_index,
+                                 initial_cards=args.initial_cards,
+                                 shard=args.shard,
+                                 since=args.since,
+                                 metrics_file=args.metrics_json,
+                                 print_metrics=args.metrics,
+                                 metrics_top=args.metrics_top)
 
-    if args.watch:
-        import time
-        print("👀 Watching for changes...")
-        last_build = 0
+    # --profile covers the whole session, so watch/daemon rebuilds too
+    with profiled(args.profile) if args.profile else nullcontext():
+        if args.daemon:
+            from build_daemon import serve
 
-        while True:
-            try:
-                # Check if any project files have changed
-                should_rebuild = False
-                current_time = time.time()
-
-                if current_time - last_build > 5:  # Check every 5 seconds
-                    for root, dirs, files in os.walk(builder.base_dir):
-                        for file in files:
-                            if file == 'index.html':
-                                file_path = Path(root) / file
-                                if file_path.stat().st_mtime > last_build:
-                                    should_rebuild = True
-                                    break
-                        if should_rebuild:
-                            break
-
-                if should_rebuild:
-                    builder.build()
-                    last_build = current_time
-
-                time.sleep(1)
-
-            except KeyboardInterrupt:
-                print("\n👋 Stopped watching")
-                break
-    else:
-        builder.build()
+            return 0 if serve(builder, args.socket) else 1
+        elif args.watch:
+            from watcher import create_watcher
 
+            builder.build()
+            watcher = create_watcher(builder.discovery_roots, builder.discovery_ignore)
+            print(f"👀 Watching for changes ({watcher.kind})...")
 
-if __name__ == "__main__":
-    # Install dependencies
-    try:
-        from bs4 import BeautifulSoup
-    except ImportError:
-        print("Installing BeautifulSoup4...")
-        os.system("pip install beautifulsoup4")
-        from bs4 import BeautifulSoup
+            while True:
+                try:
+                    changed = watcher.wait()
+                    builder.rebuild(changed)
 
-    main()
+                except KeyboardInterrupt:
+                    print("\n👋 Stopped watching")
+                    watcher.close()
+                    break
+        else:
+            builder.build()
+
+if __name__ == "__main__":
+    sys.exit(main())
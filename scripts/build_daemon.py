@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Long-running build server for build-index.py --daemon.
+
+One ProjectIndexBuilder stays alive between requests, so its project cache
+entries, parsed project records and rendered card/category fragments stay
+in memory and each build only pays for discovery and what changed.
+
+The protocol is one JSON object per connection over a Unix socket: the
+client sends {"command": ..., ...} plus a newline, and the server answers
+with {"ok": ..., "result": ..., "output": ...}, where output is everything
+the builder printed. build-client.py is the thin client; send_request is
+all it needs from this module.
+"""
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import time
+from pathlib import Path
+
+DEFAULT_SOCKET = ".build-index.sock"
+QUERY_FIELDS = ('path', 'title', 'description', 'category', 'section',
+                'technologies')
+
+
+def send_request(socket_path, request, timeout=None):
+    """Send one request to the daemon and return its decoded response"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(socket_path))
+        sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        with sock.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("daemon closed the connection without replying")
+    return json.loads(line)
+
+
+def socket_in_use(socket_path):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(socket_path))
+        return True
+    except OSError:
+        return False
+
+
+class BuildRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            # A liveness probe (socket_in_use) connects and hangs up
+            return
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            response = {'ok': False, 'error': f"Invalid request: {e}"}
+        else:
+            response = self.server.dispatch(request)
+        try:
+            self.wfile.write(json.dumps(response, default=str).encode('utf-8') + b'\n')
+        except OSError:
+            # The client went away; the build itself still happened
+            pass
+
+
+class BuildServer(socketserver.UnixStreamServer):
+    """Serves requests one at a time, so builds never overlap"""
+
+    def __init__(self, socket_path, builder):
+        self.builder = builder
+        self.started = time.time()
+        self.requests = 0
+        self.stopping = False
+        super().__init__(str(socket_path), BuildRequestHandler)
+
+    def dispatch(self, request):
+        command = request.get('command')
+        handler = getattr(self, f"do_{command}", None) if isinstance(command, str) else None
+        if handler is None:
+            return {'ok': False, 'error': f"Unknown command: {command!r}"}
+
+        self.requests += 1
+        start = time.perf_counter()
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output):
+                result = handler(request)
+        except Exception as e:
+            response = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        else:
+            response = {'ok': True, 'result': result}
+        response['output'] = output.getvalue()
+        response['seconds'] = time.perf_counter() - start
+        print(f"📨 {command} ({response['seconds']:.3f}s)"
+              f"{'' if response['ok'] else ' failed: ' + response['error']}")
+        return response
+
+    def resolve_paths(self, paths):
+        """Map client paths (absolute) to the builder's base_dir-relative form"""
+        base_dir = self.builder.base_dir
+        root = base_dir.resolve()
+        resolved = []
+        for path in paths:
+            try:
+                resolved.append(base_dir / Path(path).resolve().relative_to(root))
+            except ValueError:
+                continue
+        return resolved
+
+    def do_build(self, request):
+        """Full build, or an incremental rebuild of the projects holding `paths`"""
+        self.builder.metrics.reset()
+        paths = self.resolve_paths(request.get('paths') or [])
+        if paths and self.builder.projects:
+            self.builder.rebuild(paths)
+        else:
+            self.builder.build()
+        return {'projects': len(self.builder.projects)}
+
+    def do_stats(self, request):
+        from project_stats import render_markdown
+
+        stats = self.builder.get_stats()
+        if request.get('format') == 'markdown':
+            return render_markdown(stats)
+        return stats
+
+    def do_query(self, request):
+        """Projects matching all of the given text/technology/category/section"""
+        text = (request.get('text') or '').lower().split()
+        technology = (request.get('technology') or '').lower()
+        category = (request.get('category') or '').lower()
+        section = (request.get('section') or '').lower()
+        matches = []
+        for project in self.builder.projects:
+            haystack = ' '.join([project['title'], project['description'],
+                                 project['path']]).lower()
+            if not all(term in haystack for term in text):
+                continue
+            if technology and technology not in \
+                    [tech.lower() for tech in project['technologies']]:
+                continue
+            if category and project['category'].lower() != category:
+                continue
+            if section and project.get('section', '').lower() != section:
+                continue
+            matches.append({field: project.get(field) for field in QUERY_FIELDS})
+        limit = request.get('limit')
+        return matches[:limit] if limit else matches
+
+    def do_ping(self, _request):
+        return {'pid': os.getpid(), 'uptime': time.time() - self.started,
+                'requests': self.requests, 'projects': len(self.builder.projects)}
+
+    def do_shutdown(self, _request):
+        self.stopping = True
+        return {'stopped': True}
+
+
+def serve(builder, socket_path=None):
+    """Build once, then answer requests on socket_path until shut down"""
+    socket_path = Path(socket_path or builder.base_dir / DEFAULT_SOCKET)
+    if socket_path.exists():
+        if socket_in_use(socket_path):
+            print(f"❌ A build daemon is already listening on {socket_path}")
+            return False
+        socket_path.unlink()
+
+    builder.build()
+    server = BuildServer(socket_path, builder)
+    os.chmod(socket_path, 0o600)
+    print(f"🛰️  Build daemon listening on {socket_path}")
+    try:
+        while not server.stopping:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        socket_path.unlink(missing_ok=True)
+        builder.save_cache()
+        print("👋 Build daemon stopped")
+    return True
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Per-phase timing and counters for ProjectIndexBuilder.
+
+Phases are timed exclusively: when phases nest (e.g. hashing inside the
+cache lookup, writing inside rendering), the inner time is only counted
+for the inner phase, so the phase times add up to the build's wall time.
+Parse workers report their own read/extract/detect times per project,
+which are summed under `project_seconds` and used for the slowest list.
+"""
+import json
+import time
+from contextlib import contextmanager
+
+from file_utils import write_atomic
+
+CACHE_RESULTS = ('git_hits', 'stat_hits', 'hash_hits', 'misses')
+
+
+class BuildMetrics:
+    def __init__(self, top=10):
+        self.top = top
+        self.reset()
+
+    def reset(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.stack = []
+        self.cache = dict.fromkeys(CACHE_RESULTS, 0)
+        self.bytes_read = {'hashing': 0, 'parsing': 0}
+        self.project_seconds = {'read': 0.0, 'extract': 0.0, 'detect': 0.0}
+        self.projects = []
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block as `name`, excluding nested phases"""
+        start = time.perf_counter()
+        self.stack.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self.stack.pop()
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed - nested
+            if self.stack:
+                self.stack[-1] += elapsed
+
+    def record_project(self, timing):
+        """Add one parsed project's timing from parse_project"""
+        self.bytes_read['parsing'] += timing['bytes']
+        for key in self.project_seconds:
+            self.project_seconds[key] += timing[key]
+        self.projects.append(timing)
+
+    def slowest(self):
+        return sorted(self.projects, key=lambda t: t['seconds'], reverse=True)[:self.top]
+
+    def to_dict(self):
+        return {
+            'total_seconds': time.perf_counter() - self.started,
+            'phases': dict(sorted(self.phases.items(), key=lambda x: -x[1])),
+            'cache': self.cache,
+            'bytes_read': self.bytes_read,
+            'parsed_projects': len(self.projects),
+            'project_seconds': self.project_seconds,
+            'slowest_projects': self.slowest(),
+        }
+
+    def render(self):
+        """Human-readable summary"""
+        data = self.to_dict()
+        lines = [f"📊 Build metrics ({data['total_seconds']:.3f}s)"]
+        for name, seconds in data['phases'].items():
+            lines.append(f"   {name:<16} {seconds:8.3f}s")
+        lines.append("   cache: " + ", ".join(
+            f"{count} {name.replace('_', ' ')}" for name, count in self.cache.items()))
+        lines.append(f"   bytes read: {self.bytes_read['hashing']:,} hashing, "
+                     f"{self.bytes_read['parsing']:,} parsing")
+        if self.projects:
+            lines.append(f"   parsed {len(self.projects)} projects: " + ", ".join(
+                f"{name} {seconds:.3f}s" for name, seconds in self.project_seconds.items()))
+            lines.append(f"   slowest {len(data['slowest_projects'])}:")
+            for timing in data['slowest_projects']:
+                lines.append(f"     {timing['seconds']:8.4f}s  {timing['path']} "
+                             f"({timing['bytes']:,} bytes, extract {timing['extract']:.4f}s, "
+                             f"detect {timing['detect']:.4f}s)")
+        return '\n'.join(lines)
+
+    def write(self, output_file):
+        write_atomic(output_file, json.dumps(self.to_dict(), indent=2))
+        print(f"✅ Build metrics saved to {output_file}")
+
+
+@contextmanager
+def profiled(output_prefix, limit=25):
+    """Run a block under cProfile and tracemalloc and dump both.
+
+    Writes <output_prefix>.pstats (for pstats/snakeviz) and prints the top
+    functions by cumulative time and the top allocation sites. Only this
+    process is profiled, not --jobs parse workers.
+    """
+    import cProfile
+    import pstats
+    import tracemalloc
+
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        stats_file = f"{output_prefix}.pstats"
+        profiler.dump_stats(stats_file)
+        print(f"🔬 Profile saved to {stats_file}")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(limit)
+
+        print(f"🧠 Peak traced memory: {peak / (1024 * 1024):.1f} MB")
+        for stat in snapshot.statistics('lineno')[:10]:
+            print(f"   {stat}")
@@ -1,66 +1,114 @@
 import os
-import subprocess
 import sys
-from bs4 import BeautifulSoup
-import cloudscraper
+import hashlib
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
 import html
 import argparse
+
+try:
+    from bs4 import BeautifulSoup
+    import cloudscraper
+except ImportError as e:
+    sys.exit(f"❌ {e.name} is not installed (pip install -r requirements.txt)")
+
+from file_utils import write_atomic
 # source .venv/bin/activate
 # Usage : python scripts/download-pen.py "https://codepen.io/Philip-Walsh/pen/wBKvarX" "challenges/LetItSlide"
+# Batch : python scripts/download-pen.py --manifest pens.txt --workers 8
+#         (one "URL FOLDER" pair per line, "-" reads the manifest from stdin)
+# Pages are cached in .pen_cache/ and revalidated with ETag/Last-Modified;
+# --offline imports from that cache without touching the network.
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_CACHE_DIR = ".pen_cache"
+
+
+def main(url, folder, prettified_output=None, cache=None, offline=False):
+    import_pen(url, folder, cache=cache, offline=offline,
+               prettified_output=prettified_output)
 
 
-def main(url, folder):
-    install_and_check('bs4')
-    install_and_check('cloudscraper')
-    install_and_check('argparse')
+def import_pen(url, folder, session=None, limiter=None, retries=0, backoff=1.0,
+               cache=None, offline=False, prettified_output=None):
+    """Fetch (or revalidate) a pen and write it unless it is unchanged.
 
-    output_file = "downloaded_page.html"
+    An unchanged page is only skipped if its pen was last written to this
+    folder and is still there. A new page's validators are cached only
+    once the pen is written, so an interrupted import is retried in full.
+    """
+    page, response = fetch_page(url, session=session, limiter=limiter,
+                                retries=retries, backoff=backoff,
+                                cache=cache, offline=offline)
+    output = cache.output(url) if cache else None
+    if response is None and is_current_output(output, folder):
+        print(f"⏭️  {url} unchanged, keeping {output}")
+        return output
 
-    html_content = download_html(url)
+    output = save_pen(page, folder, prettified_output)
+    if response is not None and cache:
+        cache.store(url, response, output)
+    elif cache:
+        cache.set_output(url, output)
+    return output
 
-    formatted_html = prettify_html(html_content)
 
-    with open(output_file, 'w+', encoding='utf-8') as file:
-        file.write(formatted_html)
+def is_current_output(output, folder):
+    """Whether a cached output is a pen still on disk directly in folder"""
+    if not output:
+        return False
+    same_folder = (os.path.normpath(os.path.dirname(output))
+                   == os.path.normpath(folder))
+    return same_folder and all(os.path.isfile(os.path.join(output, name))
+                               for name in PEN_FILES)
 
-    print(f"Formatted HTML content saved to {output_file}")
 
-    with open(output_file, 'r') as file:
-        soup = BeautifulSoup(file, 'html.parser')
+def save_pen(html_content, folder, prettified_output=None):
+    # Parse once, in memory; the prettified page is only an optional extra
+    soup = BeautifulSoup(html_content, 'html.parser')
+    if prettified_output:
+        with open(prettified_output, 'w', encoding='utf-8') as file:
+            file.write(soup.prettify())
+        print(f"Formatted HTML content saved to {prettified_output}")
 
-    meta_tag = soup.find('meta', attrs={'name': 'twitter:title'})
-    human_readable_title = meta_tag['content'] if meta_tag else 'No title'
+    human_readable_title, panes = extract_pen(soup)
     title = human_readable_title.lower().replace(' ', '-')
     print(f"Title: {human_readable_title}")
 
-    os.remove(output_file)
-    os.makedirs(f"{folder}/{title}", exist_ok=True)
-    with open(os.path.join(folder, title, 'index.html'),
-              'w', encoding='utf-8') as file:
-        file.write(format_html(human_readable_title,
-                               extract_code(soup, 'html')))
+    output = os.path.join(folder, title)
+    write_atomic(os.path.join(output, 'index.html'),
+                 format_html(human_readable_title, panes['html']))
+    write_atomic(os.path.join(output, 'styles.css'), panes['css'])
+    write_atomic(os.path.join(output, 'script.js'), panes['js'])
+    return output
 
-    with open(os.path.join(folder,  title, 'styles.css'),
-              'w', encoding='utf-8') as file:
-        file.write(extract_code(soup, 'css'))
 
-    with open(os.path.join(folder, title, 'script.js'),
-              'w', encoding='utf-8') as file:
-        file.write(extract_code(soup, 'js'))
+PANES = ('html', 'css', 'js')
+PEN_FILES = ('index.html', 'styles.css', 'script.js')
 
 
-def install_and_check(package):
-    try:
-        __import__(package)
-    except ImportError:
-        print(f"{package} not found. Installing...")
-        subprocess.check_call(
-            [sys.executable, "-m", "pip", "install", package])
+def extract_pen(soup: BeautifulSoup):
+    """Find the twitter:title and the html/css/js panes in one traversal"""
+    human_readable_title = None
+    targets = {}
+    for tag in soup.find_all(True):
+        if tag.name == 'meta' and tag.get('name') == 'twitter:title':
+            if human_readable_title is None:
+                human_readable_title = tag.get('content')
+        elif tag.get('id') in PANES and tag['id'] not in targets:
+            targets[tag['id']] = tag
 
+    panes = {target_id: extract_code(targets.get(target_id), target_id)
+             for target_id in PANES}
+    return human_readable_title or 'No title', panes
 
-def extract_code(soup: BeautifulSoup, target_id: str):
 
-    target = soup.find(id=target_id)
+def extract_code(target, target_id: str):
+
     if not target:
         raise ValueError(f"No element with id: {target_id}")
 
@@ -90,31 +138,244 @@ def format_html(title, code):
 """
 
 
-def download_html(url):
+def create_session(pool_size=10):
+    """One cloudscraper session with a connection pool sized for the workers"""
+    from requests.adapters import HTTPAdapter
+
     scraper = cloudscraper.create_scraper()
-    response = scraper.get(url)
-    if response.status_code == 200:
-        print("Downloaded content using cloudscraper.")
-        return response.text
-    else:
-        print(
-            "Failed to download content using cloudscraper. Status code: "
-            f"{response.status_code}")
-        raise Exception(
-            'Failed to download content using cloudscraper. Status code: ' +
-            response.status_code)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    scraper.mount('https://', adapter)
+    scraper.mount('http://', adapter)
+    return scraper
+
+
+class HostRateLimiter:
+    """Spaces out requests to each host to at most `rate` per second"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.next_allowed = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_allowed.get(host, now))
+            self.next_allowed[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ResponseCache:
+    """On-disk page cache keyed by URL, storing validators for conditional GETs.
+
+    Each URL gets <sha256>.html (the body) and <sha256>.json (ETag,
+    Last-Modified and the folder the pen was last written to).
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.html'
+
+    def meta(self, url):
+        meta_path, _ = self.paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def body(self, url):
+        _, body_path = self.paths(url)
+        try:
+            with open(body_path, 'r', encoding='utf-8') as file:
+                return file.read()
+        except OSError:
+            return None
 
+    def validators(self, url):
+        """Conditional request headers for a cached URL"""
+        meta = self.meta(url) or {}
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
 
-def prettify_html(html_content):
-    return BeautifulSoup(html_content, 'html.parser').prettify()
+    def store(self, url, response, output):
+        """Cache a downloaded page, once its pen has been written to output"""
+        meta_path, body_path = self.paths(url)
+        meta = self.meta(url) or {'url': url}
+        meta['etag'] = response.headers.get('ETag')
+        meta['last_modified'] = response.headers.get('Last-Modified')
+        meta['output'] = output
+        write_atomic(body_path, response.text)
+        write_atomic(meta_path, json.dumps(meta, indent=2))
+
+    def output(self, url):
+        return (self.meta(url) or {}).get('output')
+
+    def set_output(self, url, output):
+        meta_path, _ = self.paths(url)
+        meta = self.meta(url) or {'url': url}
+        meta['output'] = output
+        write_atomic(meta_path, json.dumps(meta, indent=2))
+
+
+def fetch_page(url, session=None, limiter=None, retries=0, backoff=1.0,
+               cache=None, offline=False):
+    """Return (page_html, response), revalidating against the cache if given.
+
+    response is the new 200 response for the caller to cache, or None when
+    the page came from the cache unchanged.
+    """
+    if offline:
+        page = cache.body(url) if cache else None
+        if page is None:
+            raise Exception(f"{url} is not in the cache (offline mode)")
+        print(f"Loaded {url} from cache.")
+        return page, None
+
+    headers = cache.validators(url) if cache else {}
+    if headers and cache.body(url) is None:
+        headers = {}
+    response = request_page(url, session=session, limiter=limiter,
+                            retries=retries, backoff=backoff, headers=headers)
+    if response.status_code == 304:
+        print(f"Not modified: {url}")
+        return cache.body(url), None
+    return response.text, response
+
+
+def request_page(url, session=None, limiter=None, retries=0, backoff=1.0,
+                 headers=None):
+    """GET url with retries; returns a 200 response, or 304 for conditional GETs"""
+    scraper = session or cloudscraper.create_scraper()
+    for attempt in range(retries + 1):
+        if limiter:
+            limiter.wait(url)
+        retry_after = None
+        try:
+            response = scraper.get(url, timeout=30, headers=headers)
+        except Exception as e:  # connection errors, timeouts, challenge failures
+            error = e
+        else:
+            if response.status_code == 200:
+                print(f"Downloaded {url} using cloudscraper.")
+                return response
+            if response.status_code == 304 and headers:
+                return response
+            error = Exception(
+                'Failed to download content using cloudscraper. Status code: '
+                f'{response.status_code}')
+            if response.status_code not in RETRY_STATUSES:
+                break
+            retry_after = response.headers.get('Retry-After')
+
+        if attempt < retries:
+            delay = backoff * 2 ** attempt * (1 + random.random() / 2)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, int(retry_after))
+            print(f"Retrying {url} in {delay:.1f}s ({error})")
+            time.sleep(delay)
+
+    print(f"Failed to download {url}: {error}")
+    raise error
+
+
+def read_manifest(source):
+    """Parse "URL FOLDER" lines from a file path or "-" for stdin"""
+    stream = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    entries = []
+    with stream:
+        for line_number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split(None, 1)
+            if len(parts) != 2:
+                raise ValueError(
+                    f"{source}:{line_number}: expected 'URL FOLDER', got {line!r}")
+            entries.append((parts[0], parts[1].strip()))
+    return entries
+
+
+def batch_import(entries, workers=4, rate=2.0, retries=3, backoff=1.0,
+                 cache=None, offline=False):
+    """Import many pens over one pooled session with bounded concurrency.
+
+    Each pen is written as soon as its page arrives. Returns the list of
+    (url, error) pairs that failed.
+    """
+    session = create_session(pool_size=workers)
+    limiter = HostRateLimiter(rate)
+    failures = []
+
+    def import_one(url, folder):
+        return import_pen(url, folder, session=session, limiter=limiter,
+                          retries=retries, backoff=backoff,
+                          cache=cache, offline=offline)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(import_one, url, folder): url
+                   for url, folder in entries}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                print(f"✅ {url} -> {future.result()}")
+            except Exception as e:
+                failures.append((url, e))
+                print(f"❌ {url}: {e}")
+
+    print(f"Imported {len(entries) - len(failures)}/{len(entries)} pens")
+    return failures
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Extract and save HTML, CSS, and JS content from a URL.")
-    parser.add_argument('url', help="URL of the page to extract content from.")
-    parser.add_argument('folder', help="Folder to save the extracted content.")
+    parser.add_argument('url', nargs='?',
+                        help="URL of the page to extract content from.")
+    parser.add_argument('folder', nargs='?',
+                        help="Folder to save the extracted content.")
+    parser.add_argument('--manifest', '-m',
+                        help="File of 'URL FOLDER' lines to import ('-' for stdin).")
+    parser.add_argument('--workers', '-w', type=int, default=4,
+                        help="Concurrent downloads in batch mode.")
+    parser.add_argument('--rate', type=float, default=2.0,
+                        help="Max requests per second per host (0 = unlimited).")
+    parser.add_argument('--retries', type=int, default=3,
+                        help="Retries per pen on errors, 429 and 5xx responses.")
+    parser.add_argument('--prettify', metavar='FILE',
+                        help="Also save the prettified downloaded page to FILE.")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help="Directory for the conditional-fetch page cache.")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Always download and rewrite, ignoring the cache.")
+    parser.add_argument('--offline', action='store_true',
+                        help="Import only from the page cache, without network.")
 
     args = parser.parse_args()
+    if args.offline and args.no_cache:
+        parser.error("--offline needs the cache")
+    cache = None if args.no_cache else ResponseCache(args.cache_dir)
 
-    main(args.url, args.folder)
+    if args.manifest:
+        failures = batch_import(read_manifest(args.manifest), workers=args.workers,
+                                rate=args.rate, retries=args.retries,
+                                cache=cache, offline=args.offline)
+        sys.exit(1 if failures else 0)
+    elif args.url and args.folder:
+        main(args.url, args.folder, args.prettify, cache=cache,
+             offline=args.offline)
+    else:
+        parser.error("either url and folder, or --manifest, are required")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""File hashing, atomic writes and ignore globs shared by the build scripts.
+
+Every stage that fingerprints a file or replaces an output goes through
+these helpers, so the digest, chunk size and temp-file handling are the
+same everywhere, and discovery and --watch agree on which paths count.
+"""
+import hashlib
+import os
+import threading
+from fnmatch import fnmatch
+from pathlib import Path
+
+# Read files in 1 MiB chunks when hashing so large pages never sit in memory
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(path, digest_size=16):
+    """Chunked BLAKE2b digest of a file's content"""
+    digest = hashlib.blake2b(digest_size=digest_size)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def bytes_digest(data, digest_size=16):
+    return hashlib.blake2b(data, digest_size=digest_size).hexdigest()
+
+
+def stat_signature(path):
+    """(size, mtime_ns, inode) of a file, for read-free change detection"""
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+
+def write_atomic(path, data):
+    """Replace path with data (str as UTF-8, or bytes) through a temp file.
+
+    Readers never see a partial file, and an output hardlinked to a source
+    gets a new inode instead of being written through. The temp name holds
+    the pid and thread id, so concurrent writers never share it.
+    """
+    path = Path(path)
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_if_changed(path, data):
+    """write_atomic unless path already holds exactly data; True if written"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    try:
+        if os.path.getsize(path) == len(data) and Path(path).read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    write_atomic(path, data)
+    return True
+
+
+def is_ignored(name, rel, patterns):
+    """Whether an entry matches an ignore glob by name or by path below its root"""
+    return any(fnmatch(name, pattern) or fnmatch(rel, pattern) for pattern in patterns)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Git-backed change detection for build-index.py --since.
+
+A fresh CI checkout gives every file a new mtime and inode, so stat
+signatures never match a restored project cache and every source file would
+be read and hashed again. Git already knows the answer:
+
+- `git ls-files -s` lists the blob id of every tracked file in one call,
+  straight from the index, without reading the working tree.
+- `git diff --name-only --no-renames <rev>` lists the files that changed
+  since the revision the restored cache was built from. A moved file counts
+  as changed at both its old and new path.
+
+Files that are modified in the working tree or untracked are "dirty": their
+index blob id doesn't describe what is on disk, so they are never trusted.
+"""
+import subprocess
+
+
+class GitError(Exception):
+    pass
+
+
+def run_git(base_dir, *args):
+    """Run a git command in base_dir and return its NUL-separated output"""
+    try:
+        result = subprocess.run(['git', '-C', str(base_dir), *args],
+                                capture_output=True, check=False)
+    except OSError as e:
+        raise GitError(str(e)) from e
+    if result.returncode != 0:
+        raise GitError(result.stderr.decode('utf-8', 'replace').strip())
+    return [path.decode('utf-8', 'surrogateescape')
+            for path in result.stdout.split(b'\0') if path]
+
+
+class GitState:
+    def __init__(self, since, blobs, changed, dirty):
+        self.since = since
+        self.blobs = blobs
+        self.changed = changed
+        self.dirty = dirty
+
+    def blob_signature(self, prefix, names):
+        """[[name, blob id], ...] for the tracked files among names.
+
+        Returns None if any of them is dirty, since the index can't vouch
+        for its content then.
+        """
+        signature = []
+        for name in names:
+            path = f"{prefix}/{name}"
+            if path in self.dirty:
+                return None
+            blob = self.blobs.get(path)
+            if blob is not None:
+                signature.append([name, blob])
+        return signature
+
+    def is_changed(self, prefix, names):
+        """Whether any of prefix/<name> changed since the base revision"""
+        return any(f"{prefix}/{name}" in self.changed for name in names)
+
+
+def read_git_state(base_dir, since, paths=()):
+    """Snapshot blob ids and changes since `since` for paths under base_dir.
+
+    All paths are relative to base_dir, which may be a subdirectory of the
+    repository. Raises GitError if base_dir isn't a git checkout or the
+    revision is unknown.
+    """
+    blobs = {}
+    for entry in run_git(base_dir, 'ls-files', '-s', '-z', '--', *paths):
+        meta, path = entry.split('\t', 1)
+        _mode, blob, stage = meta.split()
+        # Conflicted files have several stages and show up as dirty below
+        if stage == '0':
+            blobs[path] = blob
+
+    # --no-renames lists a moved file under both its old and new path, so the
+    # project it left is invalidated as well as the one it moved to
+    dirty = set(run_git(base_dir, 'diff', '--name-only', '--no-renames',
+                        '--relative', '-z', '--', *paths))
+    dirty.update(run_git(base_dir, 'ls-files', '--others', '--exclude-standard',
+                         '-z', '--', *paths))
+    changed = set(run_git(base_dir, 'diff', '--name-only', '--no-renames',
+                          '--relative', '-z', since, '--', *paths))
+    changed.update(dirty)
+    return GitState(since, blobs, changed, dirty)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Importable handle on build-index.py for the other scripts.
+
+build-index.py isn't a valid module name, so tools that reuse
+ProjectIndexBuilder (codepen-stats.py, benchmark-build.py) load it from its
+path through here, once per process.
+"""
+import importlib.util
+import sys
+from pathlib import Path
+
+MODULE_NAME = 'build_index'
+
+
+def load_build_index():
+    """Import build-index.py as the `build_index` module.
+
+    The module is registered in sys.modules before it runs, so the
+    functions it hands to --jobs worker processes (parse_project,
+    publish_project, ...) can be pickled by reference.
+    """
+    module = sys.modules.get(MODULE_NAME)
+    if module is not None:
+        return module
+    spec = importlib.util.spec_from_file_location(
+        MODULE_NAME, Path(__file__).with_name('build-index.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[MODULE_NAME] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[MODULE_NAME]
+        raise
+    return module
+
+
+def load_builder_class():
+    """ProjectIndexBuilder from build-index.py"""
+    return load_build_index().ProjectIndexBuilder
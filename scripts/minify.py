@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""Dependency-free, conservative minifiers for pen HTML, CSS and JS.
+
+Each minifier only removes what can't change behaviour: comments and
+redundant whitespace. JavaScript keeps its line breaks, so automatic
+semicolon insertion works exactly as before. CSS and JS minification
+return a SourceMap (v3) pointing back at the original text.
+"""
+import bisect
+import json
+import re
+
+BASE64_DIGITS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+
+
+def vlq(value):
+    """Base64 VLQ encoding used by source map mappings"""
+    value = ((-value) << 1) | 1 if value < 0 else value << 1
+    encoded = ''
+    while True:
+        digit = value & 31
+        value >>= 5
+        if value:
+            digit |= 32
+        encoded += BASE64_DIGITS[digit]
+        if not value:
+            return encoded
+
+
+class SourceMap:
+    """Single-source v3 source map built from (generated, original) positions"""
+
+    def __init__(self, source_text):
+        self.line_starts = [0] + [m.end() for m in re.finditer('\n', source_text)]
+        self.source_text = source_text
+        self.segments = []
+
+    def add(self, gen_line, gen_col, src_offset):
+        src_line = bisect.bisect_right(self.line_starts, src_offset) - 1
+        self.segments.append((gen_line, gen_col, src_line,
+                              src_offset - self.line_starts[src_line]))
+
+    def mappings(self):
+        lines = []
+        prev_line = prev_col = 0
+        for gen_line, gen_col, src_line, src_col in self.segments:
+            while len(lines) <= gen_line:
+                lines.append([])
+                prev_gen_col = 0
+            segment = vlq(gen_col - prev_gen_col) + vlq(0) + \
+                vlq(src_line - prev_line) + vlq(src_col - prev_col)
+            lines[gen_line].append(segment)
+            prev_gen_col, prev_line, prev_col = gen_col, src_line, src_col
+        return ';'.join(','.join(segments) for segments in lines)
+
+    def to_json(self, file, source):
+        return json.dumps({'version': 3, 'file': file, 'sources': [source],
+                           'sourcesContent': [self.source_text], 'names': [],
+                           'mappings': self.mappings()}, separators=(',', ':'))
+
+
+class Output:
+    """Accumulates minified text while tracking the generated position"""
+
+    def __init__(self, source_text):
+        self.parts = []
+        self.line = 0
+        self.col = 0
+        self.last = ''
+        self.map = SourceMap(source_text)
+
+    def mark(self, src_offset):
+        self.map.add(self.line, self.col, src_offset)
+
+    def write(self, text):
+        if not text:
+            return
+        self.parts.append(text)
+        newlines = text.count('\n')
+        if newlines:
+            self.line += newlines
+            self.col = len(text) - text.rfind('\n') - 1
+        else:
+            self.col += len(text)
+        self.last = text[-1]
+
+    def drop_last(self):
+        """Remove the last written character (never a newline)"""
+        self.parts[-1] = self.parts[-1][:-1]
+        self.col -= 1
+        self.last = next((part[-1] for part in reversed(self.parts) if part), '')
+
+    def text(self):
+        return ''.join(self.parts)
+
+
+def skip_string(text, i):
+    """Index just past the quoted string starting at text[i]"""
+    quote = text[i]
+    i += 1
+    while i < len(text) and text[i] != quote and text[i] != '\n':
+        i += 2 if text[i] == '\\' else 1
+    return i + 1
+
+
+CSS_TIGHT = set('{};,')
+
+
+def minify_css(text):
+    """Strip comments and collapse whitespace; returns (css, SourceMap)"""
+    out = Output(text)
+    i = 0
+    pending_space = False
+    at_statement = True
+    while i < len(text):
+        c = text[i]
+        if text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            i = len(text) if end < 0 else end + 2
+            pending_space = True
+            continue
+        if c.isspace():
+            pending_space = True
+            i += 1
+            continue
+
+        if pending_space and out.last and out.last not in CSS_TIGHT and c not in CSS_TIGHT:
+            out.write(' ')
+        pending_space = False
+        if c == '}' and out.last == ';':
+            out.drop_last()
+        if at_statement:
+            out.mark(i)
+        if c in '"\'':
+            end = skip_string(text, i)
+            out.write(text[i:end])
+            i = end
+        else:
+            out.write(c)
+            i += 1
+        at_statement = c in '{};'
+    return out.text(), out.map
+
+
+# Characters that can't start a division, so a following '/' starts a regex
+JS_REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^')
+JS_REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'case', 'in', 'of', 'new',
+                     'delete', 'void', 'throw', 'else', 'do', 'yield', 'await'}
+# Spaces next to these are never needed between JS tokens
+JS_TIGHT = set('{}()[];,:=?&|')
+JS_WORD = re.compile(r'[\w$]+$')
+
+
+def regex_allowed(out):
+    """Whether a '/' at this point of the output begins a regex literal"""
+    tail = ''.join(out.parts[-3:]).rstrip(' ')
+    if not tail or tail[-1] in JS_REGEX_AFTER or tail[-1] == '\n':
+        return True
+    word = JS_WORD.search(tail)
+    return bool(word) and word.group(0) in JS_REGEX_KEYWORDS
+
+
+def skip_regex(text, i):
+    """Index just past the regex literal (with flags) starting at text[i]"""
+    i += 1
+    in_class = False
+    while i < len(text) and text[i] != '\n':
+        c = text[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            i += 1
+            break
+        i += 1
+    while i < len(text) and (text[i].isalnum() or text[i] in '_$'):
+        i += 1
+    return i
+
+
+def minify_js(text):
+    """Strip comments, indentation and blank lines; returns (js, SourceMap).
+
+    Line breaks are kept, so statements that relied on automatic semicolon
+    insertion still parse the same way.
+    """
+    out = Output(text)
+    i = 0
+    pending = ''  # '', ' ' or '\n'
+    line_start = True
+    # Each entry is the brace depth of an open template literal ${...}
+    template_depths = []
+    depth = 0
+
+    def flush(next_char, offset):
+        nonlocal pending, line_start
+        if pending == '\n':
+            if out.last:
+                out.write('\n')
+            line_start = True
+        elif pending == ' ' and out.last and out.last != '\n' and \
+                out.last not in JS_TIGHT and next_char not in JS_TIGHT:
+            out.write(' ')
+        pending = ''
+        if line_start:
+            out.mark(offset)
+            line_start = False
+
+    def copy_template(i):
+        """Index past template text from text[i] up to its end or next ${"""
+        while i < len(text):
+            c = text[i]
+            if c == '\\':
+                i += 2
+                continue
+            if c == '`':
+                return i + 1, False
+            if text.startswith('${', i):
+                return i + 2, True
+            i += 1
+        return len(text), False
+
+    while i < len(text):
+        c = text[i]
+        if text.startswith('//', i):
+            end = text.find('\n', i)
+            i = len(text) if end < 0 else end
+            continue
+        if text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            end = len(text) if end < 0 else end + 2
+            if '\n' in text[i:end]:
+                pending = '\n'
+            elif not pending:
+                pending = ' '
+            i = end
+            continue
+        if c == '\n':
+            pending = '\n'
+            i += 1
+            continue
+        if c.isspace():
+            if not pending:
+                pending = ' '
+            i += 1
+            continue
+
+        flush(c, i)
+        if c in '"\'':
+            end = skip_string(text, i)
+            out.write(text[i:end])
+            i = end
+        elif c == '`':
+            end, opened = copy_template(i + 1)
+            out.write(text[i:end])
+            i = end
+            if opened:
+                template_depths.append(depth)
+                depth += 1
+        elif c == '/' and regex_allowed(out):
+            end = skip_regex(text, i)
+            out.write(text[i:end])
+            i = end
+        elif c == '{':
+            depth += 1
+            out.write(c)
+            i += 1
+        elif c == '}':
+            depth -= 1
+            if template_depths and depth == template_depths[-1]:
+                # End of a ${...} expression: continue the template literal
+                template_depths.pop()
+                end, opened = copy_template(i + 1)
+                out.write(text[i:end])
+                i = end
+                if opened:
+                    template_depths.append(depth)
+                    depth += 1
+            else:
+                out.write(c)
+                i += 1
+        else:
+            end = i + 1
+            while end < len(text) and (text[end].isalnum() or text[end] in '_$.'):
+                end += 1
+            out.write(text[i:end])
+            i = end
+    return out.text(), out.map
+
+
+HTML_RAW_RE = re.compile(r'(<(pre|textarea|script|style)\b[^>]*>)(.*?)(</\2\s*>)',
+                         re.IGNORECASE | re.DOTALL)
+HTML_COMMENT_RE = re.compile(r'<!--(?!\[if|\s*\[endif)(?:.*?)-->', re.DOTALL)
+HTML_SPACE_RE = re.compile(r'\s+')
+SCRIPT_TYPE_RE = re.compile(r'\stype\s*=\s*["\']?([^"\'\s>]+)', re.IGNORECASE)
+JS_TYPES = {'text/javascript', 'application/javascript', 'module'}
+
+
+def collapse_space(text):
+    return HTML_SPACE_RE.sub(lambda m: '\n' if '\n' in m.group(0) else ' ', text)
+
+
+def minify_html(text):
+    """Drop comments and collapse whitespace outside <pre>/<textarea>.
+
+    Inline <style> and JavaScript <script> blocks are minified too; other
+    script types (JSON, templates) are left untouched.
+    """
+    parts = []
+    pos = 0
+    for match in HTML_RAW_RE.finditer(text):
+        parts.append(collapse_space(HTML_COMMENT_RE.sub('', text[pos:match.start()])))
+        open_tag, tag, body, close_tag = match.groups()
+        tag = tag.lower()
+        if tag == 'style':
+            body = minify_css(body)[0]
+        elif tag == 'script':
+            script_type = SCRIPT_TYPE_RE.search(open_tag)
+            if not script_type or script_type.group(1).lower() in JS_TYPES:
+                body = minify_js(body)[0]
+        parts.append(open_tag + body + close_tag)
+        pos = match.end()
+    parts.append(collapse_space(HTML_COMMENT_RE.sub('', text[pos:])))
+    return ''.join(parts).strip() + '\n'
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Persistent project caches for build-index.py.
+
+Both backends behave like a dict of cache key -> project record and track
+which keys changed, so save() only writes dirty entries:
+
+- SQLiteProjectCache (default) keeps one row per project in a WAL-mode
+  database. Rows are loaded on first access and saved with per-project
+  upserts in a single transaction, so an interrupted build never leaves a
+  half-written cache behind.
+- JsonProjectCache keeps the original .project_cache.json format, written
+  atomically through a temp file and only when something changed.
+"""
+import json
+import sqlite3
+from collections.abc import MutableMapping
+from pathlib import Path
+
+from file_utils import write_atomic
+
+# 2: signatures carry a digest of the technology map instead of the map
+SCHEMA_VERSION = 2
+
+
+class ProjectCache(MutableMapping):
+    """In-memory view of the cache with dirty tracking"""
+
+    def __init__(self):
+        self.entries = {}
+        self.dirty = set()
+        self.deleted = set()
+
+    def __getitem__(self, key):
+        return self.entries[key]
+
+    def __setitem__(self, key, value):
+        self.entries[key] = value
+        self.dirty.add(key)
+        self.deleted.discard(key)
+
+    def __delitem__(self, key):
+        del self.entries[key]
+        self.dirty.discard(key)
+        self.deleted.add(key)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def save(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonProjectCache(ProjectCache):
+    """Whole-file JSON cache, kept for compatibility with older checkouts"""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = Path(path)
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Ignoring unreadable cache {self.path}: {e}")
+
+    def save(self):
+        if not self.dirty and not self.deleted:
+            return
+        write_atomic(self.path, json.dumps(self.entries, indent=2, default=str))
+        self.dirty.clear()
+        self.deleted.clear()
+
+
+class SQLiteProjectCache(ProjectCache):
+    """One row per project in a WAL-mode SQLite database"""
+
+    def __init__(self, path, legacy_json=None):
+        super().__init__()
+        self.path = Path(path)
+        self.loaded_all = False
+        self.missing = set()
+        try:
+            self.conn = self.connect()
+        except sqlite3.DatabaseError as e:
+            print(f"⚠️  Replacing unreadable cache {self.path}: {e}")
+            self.path.replace(self.path.with_name(self.path.name + '.corrupt'))
+            self.conn = self.connect()
+
+        # Seed a fresh database from the old JSON cache so upgrading doesn't
+        # cost a cold build
+        if legacy_json and self.is_empty() and Path(legacy_json).exists():
+            legacy = JsonProjectCache(legacy_json)
+            for key, value in legacy.items():
+                self[key] = value
+            self.save()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            with conn:
+                conn.execute("DROP TABLE IF EXISTS projects")
+                conn.execute(
+                    "CREATE TABLE projects (key TEXT PRIMARY KEY, data TEXT NOT NULL)")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            if version:
+                # Give the old rows' pages back to the filesystem
+                conn.execute("VACUUM")
+        return conn
+
+    def is_empty(self):
+        return self.conn.execute("SELECT 1 FROM projects LIMIT 1").fetchone() is None
+
+    def load(self, key):
+        if key in self.entries or key in self.missing or key in self.deleted:
+            return
+        row = self.conn.execute(
+            "SELECT data FROM projects WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.missing.add(key)
+        else:
+            self.entries[key] = json.loads(row[0])
+
+    def load_all(self):
+        if self.loaded_all:
+            return
+        for key, data in self.conn.execute("SELECT key, data FROM projects"):
+            if key not in self.entries and key not in self.deleted:
+                self.entries[key] = json.loads(data)
+        self.missing.clear()
+        self.loaded_all = True
+
+    def __getitem__(self, key):
+        self.load(key)
+        return self.entries[key]
+
+    def __contains__(self, key):
+        self.load(key)
+        return key in self.entries
+
+    def __delitem__(self, key):
+        self.load(key)
+        super().__delitem__(key)
+
+    def __iter__(self):
+        self.load_all()
+        return iter(self.entries)
+
+    def __len__(self):
+        self.load_all()
+        return len(self.entries)
+
+    def save(self):
+        """Upsert dirty entries and drop deleted ones in one transaction"""
+        if not self.dirty and not self.deleted:
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO projects (key, data) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET data = excluded.data",
+                [(key, json.dumps(self.entries[key], default=str))
+                 for key in sorted(self.dirty)])
+            self.conn.executemany(
+                "DELETE FROM projects WHERE key = ?",
+                [(key,) for key in sorted(self.deleted)])
+        self.dirty.clear()
+        self.deleted.clear()
+
+    def close(self):
+        self.conn.close()
+
+
+CACHE_BACKENDS = ('sqlite', 'json')
+
+
+def open_cache(base_dir, backend='sqlite'):
+    """Open the project cache for base_dir with the given backend"""
+    base_dir = Path(base_dir)
+    json_path = base_dir / ".project_cache.json"
+    if backend == 'json':
+        return JsonProjectCache(json_path)
+    return SQLiteProjectCache(base_dir / ".project_cache.db",
+                              legacy_json=json_path)
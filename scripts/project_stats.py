@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Portfolio statistics computed from ProjectIndexBuilder project records.
+
+Used by build-index.py --stats and codepen-stats.py, so both report the
+same numbers from a single scan and the same project cache.
+"""
+import json
+from datetime import datetime
+
+from file_utils import write_atomic
+
+STATS_FORMATS = ('json', 'markdown')
+
+
+def collect_stats(projects, last_updated=None):
+    """Count projects per section, category and technology"""
+    stats = {
+        'total_projects': len(projects),
+        'sections': {},
+        'categories': {},
+        'technologies': {},
+        'last_updated': (last_updated or datetime.now()).isoformat()
+    }
+    for project in projects:
+        section = project.get('section', 'other')
+        stats['sections'][section] = stats['sections'].get(section, 0) + 1
+        category = project['category']
+        stats['categories'][category] = stats['categories'].get(category, 0) + 1
+        for tech in project['technologies']:
+            stats['technologies'][tech] = stats['technologies'].get(tech, 0) + 1
+    return stats
+
+
+def render_markdown(stats):
+    """Render stats as the markdown report"""
+    last_updated = datetime.fromisoformat(stats['last_updated'])
+    md = f"""# CodePen Project Statistics
+
+Last updated: {last_updated.strftime('%B %d, %Y')}
+
+## Overview
+- Total Projects: {stats['total_projects']}
+- Categories: {len(stats['categories'])}
+- Technologies: {len(stats['technologies'])}
+
+## Categories
+"""
+    for category, count in sorted(stats['categories'].items()):
+        md += f"- {category}: {count} projects\n"
+
+    md += "\n## Technologies\n"
+    for tech, count in sorted(stats['technologies'].items()):
+        md += f"- {tech}: {count} projects\n"
+    return md
+
+
+def write_stats(stats, output_file, fmt='json'):
+    """Write stats to output_file as JSON or markdown"""
+    if fmt == 'json':
+        write_atomic(output_file, json.dumps(stats, indent=2))
+    else:
+        write_atomic(output_file, render_markdown(stats))
+    print(f"✅ Statistics saved to {output_file}")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Static search index for the generated project page.
+
+build_search_index turns ProjectIndexBuilder records into a compact,
+versioned JSON document: one array per project (see FIELDS) plus an
+inverted index of lowercase tokens -> project ids. write_search_index
+stores it as search-index.<hash>.json so it can be cached forever, and
+SEARCH_SCRIPT is the client code that lazily fetches it to filter projects
+and to fill in cards that weren't rendered into the page.
+"""
+import json
+import re
+from pathlib import Path
+
+from file_utils import bytes_digest, write_atomic
+
+SEARCH_INDEX_VERSION = 1
+FIELDS = ['title', 'description', 'category', 'section', 'url', 'technologies',
+          'thumbnail']
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(*texts):
+    tokens = set()
+    for text in texts:
+        tokens.update(t for t in TOKEN_RE.findall(str(text).lower()) if len(t) > 1)
+    return tokens
+
+
+def build_search_index(records):
+    """records: dicts with the FIELDS keys, in page order"""
+    projects = []
+    postings = {}
+    for project_id, record in enumerate(records):
+        projects.append([record.get(field) for field in FIELDS])
+        for token in tokenize(record['title'], record['description'],
+                              record['category'], *record['technologies']):
+            postings.setdefault(token, []).append(project_id)
+    return {
+        'version': SEARCH_INDEX_VERSION,
+        'fields': FIELDS,
+        'projects': projects,
+        'tokens': dict(sorted(postings.items())),
+    }
+
+
+def write_search_index(output_dir, index):
+    """Write the index under a content-hashed name, removing older copies.
+
+    Returns the file name (relative to output_dir).
+    """
+    output_dir = Path(output_dir)
+    data = json.dumps(index, ensure_ascii=False, separators=(',', ':'))
+    name = f"search-index.{bytes_digest(data.encode('utf-8'), 5)}.json"
+    path = output_dir / name
+    if not path.exists():
+        write_atomic(path, data)
+    for old in output_dir.glob("search-index.*.json"):
+        if old.name != name:
+            old.unlink()
+    return name
+
+
+SEARCH_SCRIPT = """
+            let searchIndexPromise = null;
+            function loadSearchIndex() {
+                if (!searchIndexPromise) {
+                    searchIndexPromise = fetch(SEARCH_INDEX_URL)
+                        .then(response => response.json())
+                        .then(index => {
+                            index.records = index.projects.map(values =>
+                                Object.fromEntries(index.fields.map((field, i) => [field, values[i]])));
+                            return index;
+                        });
+                }
+                return searchIndexPromise;
+            }
+
+            function escapeHtml(text) {
+                const div = document.createElement('div');
+                div.textContent = text == null ? '' : text;
+                return div.innerHTML;
+            }
+
+            function renderCard(project) {
+                const thumbnail = project.thumbnail
+                    ? `<img class="project-thumbnail" src="${escapeHtml(project.thumbnail[0])}" width="${project.thumbnail[1]}" height="${project.thumbnail[2]}" alt="" loading="lazy" decoding="async">`
+                    : '';
+                const technologies = project.technologies
+                    .map(tech => `<span class="tech-tag">${escapeHtml(tech)}</span>`).join('');
+                return `<div class="project-card">${thumbnail}
+                    <h3 class="project-title">${escapeHtml(project.title)}</h3>
+                    <p class="project-description">${escapeHtml(project.description)}</p>
+                    <div class="project-technologies">${technologies}</div>
+                    <a href="${escapeHtml(project.url)}" class="project-link"><span>View Project</span><span>→</span></a>
+                </div>`;
+            }
+
+            function searchProjects(index, query) {
+                let matches = null;
+                for (const term of query.toLowerCase().match(/[a-z0-9]+/g) || []) {
+                    const ids = new Set();
+                    for (const token in index.tokens) {
+                        if (token.startsWith(term)) {
+                            index.tokens[token].forEach(id => ids.add(id));
+                        }
+                    }
+                    matches = matches ? new Set([...matches].filter(id => ids.has(id))) : ids;
+                }
+                return matches ? [...matches].sort((a, b) => a - b) : [];
+            }
+
+            document.addEventListener('DOMContentLoaded', function() {
+                const input = document.querySelector('.search-input');
+                const results = document.querySelector('.search-results');
+                const content = document.querySelector('.content');
+                input.addEventListener('focus', loadSearchIndex, { once: true });
+                input.addEventListener('input', () => {
+                    const query = input.value.trim();
+                    if (!query) {
+                        results.hidden = true;
+                        content.hidden = false;
+                        return;
+                    }
+                    loadSearchIndex().then(index => {
+                        if (input.value.trim() !== query) return;
+                        const ids = searchProjects(index, query);
+                        results.querySelector('.projects-grid').innerHTML =
+                            ids.slice(0, 200).map(id => renderCard(index.records[id])).join('');
+                        results.querySelector('.search-count').textContent =
+                            `${ids.length} matching project${ids.length === 1 ? '' : 's'}`;
+                        results.hidden = false;
+                        content.hidden = true;
+                    });
+                });
+
+                document.querySelectorAll('.show-more').forEach(button => {
+                    button.addEventListener('click', () => {
+                        loadSearchIndex().then(index => {
+                            const rest = index.records.filter(project =>
+                                project.section === button.dataset.section &&
+                                project.category === button.dataset.category
+                            ).slice(Number(button.dataset.shown));
+                            button.previousElementSibling.insertAdjacentHTML(
+                                'beforeend', rest.map(renderCard).join(''));
+                            button.remove();
+                        });
+                    });
+                });
+            });
+"""
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Technology detection shared by build-index.py and codepen-stats.py.
+
+Markers come from the "technologies" map in .index-config.json (marker ->
+label). All markers are compiled into one case-insensitive trie-shaped
+regex, so each document is scanned once no matter how many markers are
+configured.
+Markers that start or end with a word character only match on a word
+boundary there, which keeps short markers like "d3" from matching colours
+such as "#d3d3d3".
+"""
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from file_utils import bytes_digest
+
+CONFIG_FILE = ".index-config.json"
+
+# Used when the config file is missing or has no technologies map
+DEFAULT_TECHNOLOGIES = {
+    "jquery": "jQuery",
+    "$(": "jQuery",
+    "react": "React",
+    "vue": "Vue",
+    "canvas": "Canvas",
+    "three.js": "Three.js",
+    "threejs": "Three.js",
+    "gsap": "GSAP",
+    "squircle": "Squircle UI",
+}
+
+# Files next to index.html that are scanned for markers too
+SOURCE_FILES = ("index.html", "script.js", "styles.css")
+
+
+def load_technologies(base_dir="."):
+    """Read the marker -> label map from .index-config.json"""
+    try:
+        with open(Path(base_dir) / CONFIG_FILE, 'r', encoding='utf-8') as f:
+            technologies = json.load(f).get('technologies')
+    except (OSError, ValueError):
+        technologies = None
+    return technologies or dict(DEFAULT_TECHNOLOGIES)
+
+
+def technologies_key(technologies):
+    """Short digest of a marker map, stored with every cached project"""
+    return bytes_digest(json.dumps(technologies, sort_keys=True).encode('utf-8'), 8)
+
+
+def marker_pattern(marker):
+    pattern = re.escape(marker.lower())
+    if re.match(r'\w', marker):
+        pattern = r'(?<!\w)' + pattern
+    if re.search(r'\w$', marker):
+        pattern += r'(?!\w)'
+    return pattern
+
+
+def markers_pattern(markers):
+    """One regex for all markers, factored into a trie of shared prefixes.
+
+    A flat alternation makes the engine try every marker at every position;
+    with the trie it follows one branch per character, so the scan cost
+    barely grows with the number of markers. The longest marker that
+    matches wins, as with a longest-first alternation.
+    """
+    trie = {}
+    for marker in markers:
+        node = trie
+        for char in marker.lower():
+            node = node.setdefault(char, {})
+        node[''] = True
+    # Markers starting with a word character share a single lookbehind
+    words = {char: child for char, child in trie.items() if re.match(r'\w', char)}
+    others = {char: child for char, child in trie.items() if char not in words}
+    alternatives = []
+    if words:
+        alternatives.append(r'(?<!\w)' + _trie_pattern(words, ''))
+    if others:
+        alternatives.append(_trie_pattern(others, ''))
+    return '|'.join(alternatives)
+
+
+def _trie_pattern(node, last):
+    # Longer markers are tried before the one ending here, which needs a
+    # word boundary after it if its last character is a word character
+    branches = [re.escape(char) + _trie_pattern(child, char)
+                for char, child in sorted(node.items()) if char]
+    if '' in node:
+        branches.append(r'(?!\w)' if re.match(r'\w', last) else '')
+    if len(branches) == 1:
+        return branches[0]
+    return '(?:%s)' % '|'.join(branches)
+
+
+class TechDetector:
+    def __init__(self, technologies):
+        self.labels = {marker.lower(): label
+                       for marker, label in technologies.items()}
+        # Report labels in config order, whatever order they are found in
+        self.order = list(dict.fromkeys(self.labels.values()))
+        self.pattern = re.compile(markers_pattern(self.labels), re.IGNORECASE)
+
+    def detect(self, *texts):
+        """Return the labels whose markers appear in any of the texts"""
+        found = set()
+        for text in texts:
+            for match in self.pattern.finditer(text):
+                found.add(self.labels[match.group(0).lower()])
+                if len(found) == len(self.order):
+                    return list(self.order)
+        return [label for label in self.order if label in found]
+
+    def detect_files(self, project_path, names=SOURCE_FILES):
+        """Detect technologies across a project's source files"""
+        texts = []
+        for name in names:
+            try:
+                with open(Path(project_path) / name, 'r', encoding='utf-8',
+                          errors='replace') as f:
+                    texts.append(f.read())
+            except OSError:
+                continue
+        return self.detect(*texts)
+
+
+@lru_cache(maxsize=8)
+def _cached_detector(items):
+    return TechDetector(dict(items))
+
+
+def get_detector(technologies):
+    """Return a compiled detector, reusing it across calls in this process"""
+    return _cached_detector(tuple(technologies.items()))
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""File watchers used by build-index.py --watch.
+
+On Linux the inotify API is used directly through ctypes, so an idle watch
+costs no CPU. Elsewhere (or if inotify is unavailable) a polling watcher
+snapshots mtimes with os.scandir. Both only look at the given roots, skip
+paths matching the ignore globs (the builder passes its discovery "ignore"
+list, so watch mode and the build agree on which paths count) and debounce
+bursts of events into a single set of changed paths.
+"""
+import os
+import select
+import struct
+import time
+from pathlib import Path
+
+from file_utils import is_ignored
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+              IN_DELETE | IN_DELETE_SELF)
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def iter_dirs(root, ignored):
+    """Yield root and every directory below it, pruning those ignored(path) rejects"""
+    stack = [Path(root)]
+    while stack:
+        current = stack.pop()
+        yield current
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        path = Path(entry.path)
+                        if not ignored(path):
+                            stack.append(path)
+        except OSError:
+            continue
+
+
+class Watcher:
+    """Roots and ignore globs shared by both watchers"""
+
+    def __init__(self, roots, ignore=()):
+        self.roots = [Path(root) for root in roots]
+        self.ignore = list(ignore)
+
+    def ignored(self, path):
+        """Whether path matches an ignore glob by name or by path below its root"""
+        for root in self.roots:
+            try:
+                rel = path.relative_to(root).as_posix()
+            except ValueError:
+                continue
+            return rel != '.' and is_ignored(path.name, rel, self.ignore)
+        return False
+
+
+class InotifyWatcher(Watcher):
+    """Event-driven watcher backed by Linux inotify.
+
+    wait() returns None instead of a path set when the kernel's event queue
+    overflowed, since the changes made meanwhile are unknown.
+    """
+    kind = 'inotify'
+
+    def __init__(self, roots, debounce=0.1, ignore=()):
+        import ctypes
+        import ctypes.util
+
+        super().__init__(roots, ignore)
+        self.debounce = debounce
+        self.overflowed = False
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6',
+                                use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        for root in self.roots:
+            if root.exists():
+                self.add_tree(root)
+
+    def add_tree(self, root):
+        for directory in iter_dirs(root, self.ignored):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory),
+                                             WATCH_MASK)
+            if wd >= 0:
+                self.watches[wd] = Path(directory)
+
+    def read_events(self):
+        """Drain pending events and return the paths they refer to"""
+        changed = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    self.overflowed = True
+                    continue
+                directory = self.watches.get(wd)
+                if mask & IN_IGNORED:
+                    self.watches.pop(wd, None)
+                if directory is None:
+                    continue
+                path = directory / os.fsdecode(name) if name else directory
+                if self.ignored(path):
+                    continue
+                changed.add(path)
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    self.add_tree(path)
+
+    def wait(self):
+        """Block until something changes, then return the debounced path set.
+
+        Returns None if events were lost to a queue overflow.
+        """
+        select.select([self.fd], [], [])
+        changed = self.read_events()
+        while select.select([self.fd], [], [], self.debounce)[0]:
+            changed |= self.read_events()
+        if self.overflowed:
+            self.overflowed = False
+            print("⚠️  inotify event queue overflowed, some changes were missed")
+            # Directories created meanwhile may not be watched yet
+            for root in self.roots:
+                if root.exists():
+                    self.add_tree(root)
+            return None
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher(Watcher):
+    """Portable fallback that compares mtime snapshots of the roots"""
+    kind = 'polling'
+
+    def __init__(self, roots, debounce=0.1, interval=1.0, ignore=()):
+        super().__init__(roots, ignore)
+        self.debounce = debounce
+        self.interval = interval
+        self.snapshot = self.take_snapshot()
+
+    def take_snapshot(self):
+        snapshot = {}
+        for root in self.roots:
+            if not root.exists():
+                continue
+            for directory in iter_dirs(root, self.ignored):
+                try:
+                    with os.scandir(directory) as entries:
+                        for entry in entries:
+                            if self.ignored(Path(entry.path)):
+                                continue
+                            stat = entry.stat(follow_symlinks=False)
+                            snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+        return snapshot
+
+    def diff(self):
+        current = self.take_snapshot()
+        changed = {Path(path) for path in current.keys() ^ self.snapshot.keys()}
+        changed |= {Path(path) for path, sig in current.items()
+                    if path in self.snapshot and self.snapshot[path] != sig}
+        self.snapshot = current
+        return changed
+
+    def wait(self):
+        """Block until something changes, then return the debounced path set"""
+        while True:
+            time.sleep(self.interval)
+            changed = self.diff()
+            if changed:
+                break
+        while True:
+            time.sleep(self.debounce)
+            more = self.diff()
+            if not more:
+                return changed
+            changed |= more
+
+    def close(self):
+        pass
+
+
+def create_watcher(roots, ignore=(), debounce=0.1, poll_interval=1.0):
+    """Return an inotify watcher when possible, else a polling watcher"""
+    try:
+        return InotifyWatcher(roots, debounce=debounce, ignore=ignore)
+    except (OSError, AttributeError):
+        return PollingWatcher(roots, debounce=debounce, interval=poll_interval,
+                              ignore=ignore)
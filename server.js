@@ -3,8 +3,20 @@ const path = require('path');
 const app = express();
 const port = 3000;
 
+// Fingerprinted assets (name.<hash>.ext, see build-index.py --fingerprint)
+// never change, so browsers can keep them without revalidating
+const FINGERPRINTED = /\.[0-9a-f]{10}\.[a-z0-9]+$/;
+
 // Serve static files
-app.use(express.static(path.join(__dirname)));
+app.use(
+  express.static(path.join(__dirname), {
+    setHeaders: (res, filePath) => {
+      if (FINGERPRINTED.test(filePath)) {
+        res.setHeader('Cache-Control', 'public, max-age=31536000, immutable');
+      }
+    },
+  })
+);
 
 // Redirect root to the slide show
 app.get('/', (req, res) => {
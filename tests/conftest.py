@@ -0,0 +1,46 @@
+"""Shared fixtures for the scripts/ test suite.
+
+The build scripts import their sibling modules directly (scripts/ is
+sys.path[0] when they run), so the tests put scripts/ on the path too.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent / "scripts"
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+def write_project(base_dir, rel, title, script='', styles=''):
+    """Create a pen at base_dir/rel with index.html, script.js and styles.css"""
+    project_dir = Path(base_dir) / rel
+    project_dir.mkdir(parents=True, exist_ok=True)
+    (project_dir / "index.html").write_text(
+        f'<!DOCTYPE html><html><head><title>{title}</title>'
+        f'<meta name="description" content="{title} demo">'
+        f'<link rel="stylesheet" href="styles.css"></head>'
+        f'<body><script src="script.js"></script></body></html>', encoding='utf-8')
+    (project_dir / "script.js").write_text(script, encoding='utf-8')
+    (project_dir / "styles.css").write_text(styles, encoding='utf-8')
+    return project_dir
+
+
+@pytest.fixture
+def build_index():
+    """The build-index.py module, imported the way the other scripts do"""
+    from index_builder import load_build_index
+
+    return load_build_index()
+
+
+@pytest.fixture
+def portfolio(tmp_path):
+    """A small tree with pens under challenges/ and other/"""
+    write_project(tmp_path, "challenges/cards/flip", "Flip Card",
+                  script="$('.card').on('click', flip)")
+    write_project(tmp_path, "challenges/cards/tilt", "Tilt Card",
+                  styles=".tilt { transform: rotate(3deg); }")
+    write_project(tmp_path, "other/games/snake", "Snake",
+                  script="const ctx = canvas.getContext('2d')")
+    return tmp_path
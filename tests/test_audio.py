@@ -0,0 +1,60 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+import asset_pipeline
+
+AAC_PROBE = {'streams': [{'sample_rate': '44100', 'start_time': '0.000000',
+                          'initial_padding': 1024}],
+             'format': {'duration': '2.000000'}}
+OPUS_PROBE = {'streams': [{'sample_rate': '48000', 'start_time': '-0.006500',
+                           'initial_padding': 0}],
+              'format': {'duration': '2.006500'}}
+
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch):
+    """Stand-ins for ffmpeg/ffprobe; ffprobe answers with probes[extension]"""
+    probes = {}
+
+    def run(args, **kwargs):
+        if args[0] == 'ffmpeg':
+            with open(args[-1], 'wb') as f:
+                f.write(b'encoded ' + args[-1].encode())
+            return subprocess.CompletedProcess(args, 0, '', '')
+        extension = args[-1].rsplit('.', 1)[1]
+        return subprocess.CompletedProcess(args, 0, json.dumps(probes[extension]), '')
+
+    monkeypatch.setattr(shutil, 'which', lambda name: f"/usr/bin/{name}")
+    monkeypatch.setattr(subprocess, 'run', run)
+    return probes
+
+
+@pytest.mark.parametrize('probe, expected', [
+    (AAC_PROBE, (0.02322, 2.02322)),
+    (OPUS_PROBE, (0.0065, 2.0065)),
+])
+def test_loop_points_skip_priming(fake_ffmpeg, tmp_path, probe, expected):
+    fake_ffmpeg['m4a'] = probe
+    assert asset_pipeline.probe_loop_points(tmp_path / "loop.m4a") == \
+        pytest.approx(expected, abs=1e-5)
+
+
+def test_loop_points_unknown_without_probe(fake_ffmpeg, tmp_path):
+    fake_ffmpeg['m4a'] = {'streams': [], 'format': {}}
+    assert asset_pipeline.probe_loop_points(tmp_path / "loop.m4a") == (None, None)
+
+
+def test_manifest_lists_loop_points(fake_ffmpeg, tmp_path):
+    fake_ffmpeg.update(m4a=AAC_PROBE, ogg=OPUS_PROBE)
+    (tmp_path / "assets/audio").mkdir(parents=True)
+    (tmp_path / "assets/audio/loop.wav").write_bytes(b'RIFF')
+
+    entries = asset_pipeline.transcode_audios(tmp_path, jobs=1)
+
+    loops = {variant['format']: (variant['loop_start'], variant['loop_end'])
+             for variant in entries['assets/audio/loop.wav']['variants']}
+    assert loops['aac'] == pytest.approx((0.02322, 2.02322), abs=1e-5)
+    assert loops['opus'] == pytest.approx((0.0065, 2.0065), abs=1e-5)
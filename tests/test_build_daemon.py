@@ -0,0 +1,57 @@
+import threading
+import time
+
+import pytest
+
+from build_daemon import DEFAULT_SOCKET, send_request, serve
+
+
+@pytest.fixture
+def daemon(build_index, portfolio):
+    """A build daemon serving the portfolio from a background thread"""
+    builder = build_index.ProjectIndexBuilder(portfolio, cache_backend='json')
+    socket_path = portfolio / DEFAULT_SOCKET
+    thread = threading.Thread(target=serve, args=(builder, socket_path), daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            send_request(socket_path, {'command': 'ping'}, timeout=5)
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+    yield socket_path
+    if thread.is_alive():
+        send_request(socket_path, {'command': 'shutdown'}, timeout=5)
+        thread.join(10)
+
+
+def test_round_trip(daemon, portfolio):
+    ping = send_request(daemon, {'command': 'ping'}, timeout=5)
+    assert ping['ok'] and ping['result']['projects'] == 3
+
+    script = portfolio / "challenges/cards/tilt/script.js"
+    script.write_text("gsap.to('.tilt', {rotate: 3})", encoding='utf-8')
+    build = send_request(daemon, {'command': 'build', 'paths': [str(script)]},
+                         timeout=30)
+    assert build['ok'] and build['result'] == {'projects': 3}
+
+    query = send_request(daemon, {'command': 'query', 'technology': 'gsap'},
+                         timeout=5)
+    assert [project['path'] for project in query['result']] == \
+        ['challenges/cards/tilt']
+
+    shutdown = send_request(daemon, {'command': 'shutdown'}, timeout=5)
+    assert shutdown['result'] == {'stopped': True}
+    deadline = time.monotonic() + 10
+    while daemon.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not daemon.exists()
+
+
+def test_bad_requests_get_errors(daemon):
+    assert send_request(daemon, {'command': 'nope'}, timeout=5) == \
+        {'ok': False, 'error': "Unknown command: 'nope'"}
+    assert not send_request(daemon, {'command': None}, timeout=5)['ok']
@@ -0,0 +1,65 @@
+import json
+import os
+
+from project_cache import open_cache
+from tech_detector import technologies_key
+
+
+def scan(builder_class, base_dir, **kwargs):
+    builder = builder_class(base_dir, cache_backend='json', **kwargs)
+    builder.scan_projects()
+    builder.save_cache()
+    return builder
+
+
+def test_signatures_store_a_short_technologies_digest(build_index, portfolio):
+    builder = scan(build_index.ProjectIndexBuilder, portfolio)
+    record = open_cache(portfolio, 'json')['challenges/cards/flip']
+    assert record['stat'][0] == f"stream:{technologies_key(builder.technologies)}"
+    assert len(technologies_key(builder.technologies)) == 16
+    assert 'jQuery' not in json.dumps(record['stat'])
+
+
+def test_changed_technologies_config_invalidates_entries(build_index, portfolio):
+    scan(build_index.ProjectIndexBuilder, portfolio)
+    with open(portfolio / ".index-config.json", 'w', encoding='utf-8') as f:
+        json.dump({'technologies': {'getcontext': 'Canvas 2D'}}, f)
+
+    builder = scan(build_index.ProjectIndexBuilder, portfolio)
+    assert builder.metrics.cache['misses'] == 3
+    snake = next(p for p in builder.projects if p['path'] == 'other/games/snake')
+    assert snake['technologies'] == ['Canvas 2D']
+
+
+def test_unchanged_tree_is_all_stat_hits(build_index, portfolio):
+    scan(build_index.ProjectIndexBuilder, portfolio)
+    builder = scan(build_index.ProjectIndexBuilder, portfolio)
+    assert builder.metrics.cache['stat_hits'] == 3
+    assert builder.metrics.cache['misses'] == 0
+
+
+def test_touched_but_identical_files_are_hash_hits(build_index, portfolio):
+    scan(build_index.ProjectIndexBuilder, portfolio)
+    os.utime(portfolio / "challenges/cards/flip/script.js")
+    builder = scan(build_index.ProjectIndexBuilder, portfolio)
+    assert builder.metrics.cache['hash_hits'] == 1
+    assert builder.metrics.cache['misses'] == 0
+
+
+def test_switching_parser_reparses_cached_projects(build_index, portfolio):
+    scan(build_index.ProjectIndexBuilder, portfolio)
+    builder = scan(build_index.ProjectIndexBuilder, portfolio, parser='soup')
+    assert builder.metrics.cache['misses'] == 3
+
+    # ...and the soup records are then reused
+    builder = scan(build_index.ProjectIndexBuilder, portfolio, parser='soup')
+    assert builder.metrics.cache['stat_hits'] == 3
+
+
+def test_parser_is_part_of_the_content_hash(build_index, portfolio):
+    stream = build_index.ProjectIndexBuilder(portfolio, cache_backend='json')
+    soup = build_index.ProjectIndexBuilder(portfolio, cache_backend='json', parser='soup')
+    project_dir = portfolio / "challenges/cards/flip"
+    names = ["index.html", "script.js", "styles.css"]
+    assert stream.get_sources_hash(project_dir, names) != \
+        soup.get_sources_hash(project_dir, names)
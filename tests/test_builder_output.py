@@ -0,0 +1,75 @@
+import re
+import shutil
+import subprocess
+
+import pytest
+
+from conftest import SCRIPTS_DIR
+
+
+def build(builder):
+    builder.build()
+    return builder
+
+
+def test_deleted_outputs_are_rewritten_by_a_warm_builder(build_index, portfolio, capsys):
+    builder = build(build_index.ProjectIndexBuilder(portfolio, cache_backend='json',
+                                                    shard=True))
+    page = portfolio / "public" / "index.html"
+    shard = portfolio / "public" / "categories" / "challenges-cards.html"
+    assert page.exists() and shard.exists()
+
+    # Same builder, as in --watch or --daemon
+    page.unlink()
+    shard.unlink()
+    capsys.readouterr()
+    build(builder)
+    assert page.exists() and shard.exists()
+    assert "Home page built successfully" in capsys.readouterr().out
+
+
+def test_edited_output_is_restored(build_index, portfolio):
+    builder = build(build_index.ProjectIndexBuilder(portfolio, cache_backend='json'))
+    page = portfolio / "public" / "index.html"
+    expected = page.read_text(encoding='utf-8')
+    page.write_text("hand edit", encoding='utf-8')
+    build(builder)
+    assert page.read_text(encoding='utf-8') == expected
+
+
+def test_unchanged_output_is_not_rewritten(build_index, portfolio, capsys):
+    builder = build(build_index.ProjectIndexBuilder(portfolio, cache_backend='json'))
+    page = portfolio / "public" / "index.html"
+    inode = page.stat().st_ino
+    capsys.readouterr()
+    build(builder)
+    assert "Home page unchanged" in capsys.readouterr().out
+    assert page.stat().st_ino == inode
+
+
+def test_card_links_resolve_to_published_pens(build_index, portfolio):
+    # public/ is the deploy root, so /<project> is the published page
+    build(build_index.ProjectIndexBuilder(portfolio, cache_backend='json',
+                                          fingerprint=True))
+    page = (portfolio / "public" / "index.html").read_text(encoding='utf-8')
+    links = re.findall(r'<a href="/([^"]+)" class="project-link">', page)
+    assert sorted(links) == ['challenges/cards/flip', 'challenges/cards/tilt',
+                             'other/games/snake']
+    for link in links:
+        published = (portfolio / "public" / link / "index.html").read_text(encoding='utf-8')
+        assert re.search(r'styles\.[0-9a-f]{10}\.css', published)
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="needs node")
+def test_build_js_keeps_published_pens(build_index, portfolio):
+    build(build_index.ProjectIndexBuilder(portfolio, cache_backend='json',
+                                          fingerprint=True, minify=True))
+    published = portfolio / "public" / "challenges/cards/flip/index.html"
+    expected = published.read_text(encoding='utf-8')
+
+    shutil.copy(SCRIPTS_DIR.parent / "build.js", portfolio)
+    subprocess.run(['node', 'build.js'], cwd=portfolio, check=True, capture_output=True)
+
+    assert published.read_text(encoding='utf-8') == expected
+    assert (portfolio / "public" / "challenges/cards/flip/script.js").exists()
+    assert (portfolio / "public" / "other/games/snake/index.html").exists()
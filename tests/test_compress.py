@@ -0,0 +1,52 @@
+import gzip
+import re
+
+from asset_pipeline import precompress
+
+
+def build(build_index, base_dir):
+    builder = build_index.ProjectIndexBuilder(base_dir, cache_backend='json',
+                                              sync=True, compress=True)
+    builder.build()
+    return builder
+
+
+def test_compresses_served_files_but_not_build_state(build_index, portfolio):
+    (portfolio / "challenges/cards/flip/data.json").write_text(
+        '{"cards": [' + ', '.join(['{"face": "up"}'] * 50) + ']}', encoding='utf-8')
+    build(build_index, portfolio)
+    public = portfolio / "public"
+
+    page = public / "index.html"
+    assert gzip.decompress((public / "index.html.gz").read_bytes()) == page.read_bytes()
+    assert (public / "challenges/cards/flip/data.json.gz").exists()
+    assert (public / "synced.json").exists()
+    assert not list(public.glob("*.json.*"))
+
+
+def test_unchanged_files_are_skipped(build_index, portfolio, capsys):
+    builder = build(build_index, portfolio)
+    gz = portfolio / "public/index.html.gz"
+    inode = gz.stat().st_ino
+    capsys.readouterr()
+
+    builder.build()
+    out = capsys.readouterr().out
+    assert re.search(r"compressed: 0 processed, \d+ unchanged, 0 failed", out)
+    assert gz.stat().st_ino == inode
+
+
+def test_previously_compressed_state_files_are_cleaned_up(portfolio):
+    public = portfolio / "public"
+    public.mkdir()
+    (public / "index.html").write_text("<p>" + "hello " * 100, encoding='utf-8')
+    (public / "pens.json").write_text('{"pens": {}}' + ' ' * 200, encoding='utf-8')
+    (public / "pens.json.gz").write_bytes(b'old')
+    (public / "compressed.json").write_text(
+        '{"version": 1, "compressed": {"public/pens.json": '
+        '{"outputs": ["public/pens.json.gz"]}}}', encoding='utf-8')
+
+    entries = precompress(portfolio, "public", jobs=1)
+
+    assert list(entries) == ["public/index.html"]
+    assert not (public / "pens.json.gz").exists()
@@ -0,0 +1,57 @@
+import json
+import os
+
+from conftest import write_project
+
+
+def discover(build_index, base_dir, **discovery):
+    if discovery:
+        (base_dir / ".index-config.json").write_text(
+            json.dumps({'discovery': discovery}), encoding='utf-8')
+    builder = build_index.ProjectIndexBuilder(base_dir)
+    return [(project_dir.relative_to(base_dir).as_posix(), section, category)
+            for project_dir, section, category in builder.discover_projects()]
+
+
+def test_nested_projects_take_category_from_first_directory(build_index, portfolio):
+    write_project(portfolio, "challenges/cards/flip/variants/mini", "Mini Flip")
+    write_project(portfolio, "other/solo", "Solo")
+
+    assert discover(build_index, portfolio) == [
+        ("challenges/cards/flip", 'challenges', 'Cards'),
+        ("challenges/cards/flip/variants/mini", 'challenges', 'Cards'),
+        ("challenges/cards/tilt", 'challenges', 'Cards'),
+        ("other/games/snake", 'other', 'Games'),
+        ("other/solo", 'other', None),
+    ]
+
+
+def test_max_depth_limits_descent(build_index, portfolio):
+    write_project(portfolio, "challenges/a/b/c/deep", "Deep")
+
+    found = [path for path, _, _ in discover(build_index, portfolio, max_depth=3)]
+    assert "challenges/a/b/c/deep" not in found
+    assert "challenges/cards/flip" in found
+
+
+def test_ignore_globs_match_names_and_paths(build_index, portfolio):
+    write_project(portfolio, "challenges/cards/node_modules/pkg", "Package")
+    write_project(portfolio, "challenges/cards/.draft", "Draft")
+    write_project(portfolio, "other/games/old/pong", "Pong")
+
+    found = [path for path, _, _ in discover(
+        build_index, portfolio, ignore=["node_modules", ".*", "games/old"])]
+    assert found == ["challenges/cards/flip", "challenges/cards/tilt",
+                     "other/games/snake"]
+
+
+def test_symlinked_projects_are_followed_without_looping(build_index, portfolio, tmp_path):
+    shared = write_project(tmp_path / "elsewhere", "shared/glow", "Glow").parent
+    os.symlink(shared, portfolio / "other/shared")
+    # Links back up the tree must not recurse
+    os.symlink(portfolio / "challenges", portfolio / "challenges/cards/loop")
+    os.symlink(portfolio / "other/shared", portfolio / "other/games/again")
+
+    found = [path for path, _, _ in discover(build_index, portfolio)]
+    assert found == ["challenges/cards/flip", "challenges/cards/tilt",
+                     "other/games/snake", "other/shared/glow"]
@@ -0,0 +1,209 @@
+import importlib.util
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from conftest import SCRIPTS_DIR
+
+PEN_PAGE = """<!DOCTYPE html><html><head>
+<meta name="twitter:title" content="My Pen"></head><body>
+<pre id="html"><code>&lt;div class="box"&gt;&lt;/div&gt;</code></pre>
+<pre id="css"><code>.box { color: red; }</code></pre>
+<pre id="js"><code>console.log('hi')</code></pre>
+</body></html>"""
+ETAG = '"v1"'
+
+
+@pytest.fixture(scope='module')
+def download_pen():
+    spec = importlib.util.spec_from_file_location(
+        'download_pen', SCRIPTS_DIR / 'download-pen.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def server():
+    """A local CodePen stand-in that answers If-None-Match with a 304.
+
+    Statuses queued in `server.statuses` are answered first, and paths
+    containing "missing" get a 404.
+    """
+    requests_seen = []
+    statuses = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(self.headers.get('If-None-Match'))
+            if statuses or 'missing' in self.path:
+                self.send_response(statuses.pop(0) if statuses else 404)
+                self.send_header('Retry-After', '0')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if self.headers.get('If-None-Match') == ETAG:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = PEN_PAGE.encode('utf-8')
+            self.send_response(200)
+            self.send_header('ETag', ETAG)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={'poll_interval': 0.05},
+                              daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_port}/pen/abc"
+    httpd.requests_seen = requests_seen
+    httpd.statuses = statuses
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def import_pen(download_pen, server, folder, cache, **kwargs):
+    with requests.Session() as session:
+        return download_pen.import_pen(server.url, str(folder), session=session,
+                                       cache=cache, **kwargs)
+
+
+def test_import_writes_pen_and_caches_validators(download_pen, server, tmp_path):
+    cache = download_pen.ResponseCache(str(tmp_path / "cache"))
+    output = import_pen(download_pen, server, tmp_path / "out", cache)
+
+    assert output == str(tmp_path / "out" / "my-pen")
+    assert (tmp_path / "out/my-pen/styles.css").read_text() == ".box { color: red; }"
+    assert '<div class="box"></div>' in (tmp_path / "out/my-pen/index.html").read_text()
+    assert cache.meta(server.url)['etag'] == ETAG
+    assert cache.output(server.url) == output
+
+
+def test_not_modified_keeps_pen_in_same_folder(download_pen, server, tmp_path):
+    cache = download_pen.ResponseCache(str(tmp_path / "cache"))
+    import_pen(download_pen, server, tmp_path / "out", cache)
+    script = tmp_path / "out/my-pen/script.js"
+    script.write_text("local edit")
+
+    import_pen(download_pen, server, tmp_path / "out", cache)
+    assert server.requests_seen == [None, ETAG]
+    assert script.read_text() == "local edit"
+
+
+def test_not_modified_writes_pen_to_new_folder(download_pen, server, tmp_path):
+    cache = download_pen.ResponseCache(str(tmp_path / "cache"))
+    import_pen(download_pen, server, tmp_path / "out", cache)
+
+    output = import_pen(download_pen, server, tmp_path / "out5", cache)
+    assert server.requests_seen == [None, ETAG]
+    assert output == str(tmp_path / "out5" / "my-pen")
+    assert (tmp_path / "out5/my-pen/script.js").read_text() == "console.log('hi')"
+    assert cache.output(server.url) == output
+
+
+def test_offline_writes_pen_to_new_folder(download_pen, server, tmp_path):
+    cache = download_pen.ResponseCache(str(tmp_path / "cache"))
+    import_pen(download_pen, server, tmp_path / "out", cache)
+
+    output = import_pen(download_pen, server, tmp_path / "out5", cache, offline=True)
+    assert server.requests_seen == [None]
+    assert (tmp_path / "out5/my-pen/index.html").is_file()
+    assert output == str(tmp_path / "out5" / "my-pen")
+
+
+def test_failed_write_does_not_cache_validators(download_pen, server, tmp_path,
+                                                monkeypatch):
+    cache = download_pen.ResponseCache(str(tmp_path / "cache"))
+
+    def crash(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(download_pen, 'save_pen', crash)
+    with pytest.raises(OSError):
+        import_pen(download_pen, server, tmp_path / "out", cache)
+    assert cache.meta(server.url) is None
+    monkeypatch.undo()
+
+    # The retry downloads the page again instead of trusting a 304
+    import_pen(download_pen, server, tmp_path / "out", cache)
+    assert server.requests_seen == [None, None]
+    assert (tmp_path / "out/my-pen/index.html").is_file()
+
+
+def test_rate_limiter_spaces_requests_per_host(download_pen, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(download_pen.time, 'sleep', sleeps.append)
+    limiter = download_pen.HostRateLimiter(rate=10)
+
+    for url in ("https://a.test/1", "https://a.test/2", "https://b.test/1",
+                "https://a.test/3"):
+        limiter.wait(url)
+
+    # a.test waits one and two intervals; b.test has its own schedule
+    assert sleeps == [pytest.approx(0.1, abs=0.01), pytest.approx(0.2, abs=0.01)]
+
+
+def test_unlimited_rate_never_waits(download_pen, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(download_pen.time, 'sleep', sleeps.append)
+    limiter = download_pen.HostRateLimiter(rate=0)
+    limiter.wait("https://a.test/1")
+    limiter.wait("https://a.test/2")
+    assert sleeps == []
+
+
+def test_retries_after_429_with_backoff(download_pen, server, tmp_path, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(download_pen.time, 'sleep', sleeps.append)
+    server.statuses.extend([429, 503])
+
+    output = import_pen(download_pen, server, tmp_path / "out", None,
+                        retries=2, backoff=1.0)
+
+    assert output == str(tmp_path / "out" / "my-pen")
+    assert len(server.requests_seen) == 3
+    # Exponential backoff with up to 50% jitter
+    assert 1.0 <= sleeps[0] <= 1.5 and 2.0 <= sleeps[1] <= 3.0
+
+
+def test_gives_up_after_retries(download_pen, server, tmp_path, monkeypatch):
+    monkeypatch.setattr(download_pen.time, 'sleep', lambda seconds: None)
+    server.statuses.extend([429, 429])
+
+    with pytest.raises(Exception, match="Status code: 429"):
+        import_pen(download_pen, server, tmp_path / "out", None, retries=1)
+    assert len(server.requests_seen) == 2
+    assert not (tmp_path / "out").exists()
+
+
+def test_client_errors_are_not_retried(download_pen, server, tmp_path):
+    with pytest.raises(Exception, match="Status code: 404"):
+        with requests.Session() as session:
+            download_pen.import_pen(server.url + "/missing", str(tmp_path / "out"),
+                                    session=session, retries=3)
+    assert len(server.requests_seen) == 1
+
+
+def test_batch_import_writes_pens_and_reports_failures(download_pen, server, tmp_path):
+    cache = download_pen.ResponseCache(str(tmp_path / "cache"))
+    entries = [(server.url, str(tmp_path / "a")),
+               (server.url + "/missing", str(tmp_path / "b")),
+               (server.url + "?v=2", str(tmp_path / "c"))]
+
+    failures = download_pen.batch_import(entries, workers=3, rate=0, retries=0,
+                                         cache=cache)
+
+    assert [url for url, _ in failures] == [server.url + "/missing"]
+    assert (tmp_path / "a/my-pen/index.html").is_file()
+    assert (tmp_path / "c/my-pen/index.html").is_file()
+    assert not (tmp_path / "b").exists()
+    assert cache.output(server.url) == str(tmp_path / "a" / "my-pen")
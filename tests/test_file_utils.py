@@ -0,0 +1,47 @@
+import os
+import threading
+
+from file_utils import bytes_digest, file_digest, write_atomic, write_if_changed
+
+
+def test_file_digest_matches_bytes_digest(tmp_path):
+    path = tmp_path / "data.bin"
+    data = os.urandom(3 << 20)  # spans several hash chunks
+    path.write_bytes(data)
+    assert file_digest(path) == bytes_digest(data)
+    assert len(file_digest(path, 5)) == 10
+
+
+def test_write_atomic_replaces_instead_of_writing_through(tmp_path):
+    source = tmp_path / "source.txt"
+    source.write_text("original", encoding='utf-8')
+    output = tmp_path / "out" / "linked.txt"
+    output.parent.mkdir()
+    os.link(source, output)
+
+    write_atomic(output, "published")
+    assert output.read_text(encoding='utf-8') == "published"
+    assert source.read_text(encoding='utf-8') == "original"
+    assert os.listdir(output.parent) == ["linked.txt"]
+
+
+def test_write_if_changed_skips_identical_content(tmp_path):
+    path = tmp_path / "nested" / "page.html"
+    assert write_if_changed(path, "<p>hi</p>")
+    inode = path.stat().st_ino
+    assert not write_if_changed(path, b"<p>hi</p>")
+    assert path.stat().st_ino == inode
+    assert write_if_changed(path, "<p>bye</p>")
+    assert path.read_bytes() == b"<p>bye</p>"
+
+
+def test_concurrent_writers_never_leave_temp_files(tmp_path):
+    path = tmp_path / "shared.json"
+    threads = [threading.Thread(target=write_atomic, args=(path, str(i) * 1000))
+               for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert os.listdir(tmp_path) == ["shared.json"]
+    assert len(set(path.read_text(encoding='utf-8'))) == 1
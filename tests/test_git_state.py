@@ -0,0 +1,62 @@
+import subprocess
+
+import pytest
+
+from git_state import GitError, read_git_state
+
+
+def git(base_dir, *args):
+    subprocess.run(['git', '-C', str(base_dir), *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(portfolio):
+    """The portfolio as a git repo, with the jQuery script only in flip/"""
+    (portfolio / "challenges/cards/tilt/script.js").unlink()
+    git(portfolio, 'init', '-q')
+    git(portfolio, 'config', 'user.email', 'test@example.com')
+    git(portfolio, 'config', 'user.name', 'test')
+    git(portfolio, 'add', 'challenges', 'other')
+    git(portfolio, 'commit', '-q', '-m', 'initial')
+    return portfolio
+
+
+def test_moved_file_changes_both_projects(repo):
+    git(repo, 'mv', 'challenges/cards/flip/script.js', 'challenges/cards/tilt/script.js')
+    git(repo, 'commit', '-q', '-m', 'move')
+
+    state = read_git_state(repo, 'HEAD~1', ['challenges', 'other'])
+    assert state.is_changed('challenges/cards/flip', ['script.js'])
+    assert state.is_changed('challenges/cards/tilt', ['script.js'])
+    assert not state.is_changed('other/games/snake', ['script.js'])
+    assert not state.dirty
+
+
+def test_uncommitted_move_is_dirty_on_both_sides(repo):
+    (repo / "challenges/cards/flip/script.js").rename(repo / "challenges/cards/tilt/script.js")
+    git(repo, 'add', '-A')
+
+    state = read_git_state(repo, 'HEAD', ['challenges'])
+    assert state.blob_signature('challenges/cards/tilt', ['script.js']) is not None
+    assert state.is_changed('challenges/cards/flip', ['script.js'])
+    assert state.is_changed('challenges/cards/tilt', ['script.js'])
+
+
+def test_since_rebuild_reparses_the_project_a_file_left(build_index, repo):
+    builder = build_index.ProjectIndexBuilder(repo, cache_backend='json')
+    builder.scan_projects()
+    builder.save_cache()
+
+    git(repo, 'mv', 'challenges/cards/flip/script.js', 'challenges/cards/tilt/script.js')
+    git(repo, 'commit', '-q', '-m', 'move')
+    builder = build_index.ProjectIndexBuilder(repo, cache_backend='json', since='HEAD~1')
+    builder.scan_projects()
+
+    technologies = {p['path']: p['technologies'] for p in builder.projects}
+    assert 'jQuery' not in technologies['challenges/cards/flip']
+    assert 'jQuery' in technologies['challenges/cards/tilt']
+
+
+def test_unknown_revision_raises(repo):
+    with pytest.raises(GitError):
+        read_git_state(repo, 'no-such-rev', ['challenges'])
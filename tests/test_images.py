@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from asset_pipeline import DEFAULT_MAX_IMAGE_BYTES, optimize_images
+
+Image = pytest.importorskip('PIL.Image')
+
+
+@pytest.fixture
+def noisy_image(tmp_path):
+    (tmp_path / "assets").mkdir()
+    Image.effect_noise((640, 480), 60).convert('RGB').save(tmp_path / "assets/noise.png")
+    return tmp_path
+
+
+def variant_bytes(base_dir, max_bytes):
+    entries = optimize_images(base_dir, widths=(480,), formats=('webp',),
+                              max_bytes=max_bytes, jobs=1)
+    return [variant['bytes'] for variant in entries['assets/noise.png']['variants']]
+
+
+def test_variants_are_capped_at_max_bytes(noisy_image):
+    assert variant_bytes(noisy_image, None)[0] > 70_000
+    assert variant_bytes(noisy_image, 70_000)[0] <= 70_000
+
+
+def test_builder_passes_configured_cap(build_index, portfolio, monkeypatch):
+    calls = []
+    monkeypatch.setattr(build_index, 'optimize_images',
+                        lambda base_dir, **kwargs: calls.append(kwargs))
+
+    build_index.ProjectIndexBuilder(portfolio).build_images()
+    with open(portfolio / ".index-config.json", 'w', encoding='utf-8') as f:
+        json.dump({'images': {'max_bytes': None}}, f)
+    build_index.ProjectIndexBuilder(portfolio).build_images()
+
+    assert [call['max_bytes'] for call in calls] == [DEFAULT_MAX_IMAGE_BYTES, None]
+
+
+def test_animated_variants_keep_frame_durations(tmp_path):
+    (tmp_path / "assets").mkdir()
+    frames = [Image.new('RGB', (320, 240), color) for color in ('red', 'green', 'blue')]
+    frames[0].save(tmp_path / "assets/blink.gif", save_all=True,
+                   append_images=frames[1:], duration=[50, 200, 400], loop=0)
+
+    entries = optimize_images(tmp_path, widths=(160,), formats=('webp',), jobs=1)
+
+    variant = entries['assets/blink.gif']['variants'][0]
+    with Image.open(tmp_path / variant['path']) as img:
+        assert img.n_frames == 3
+        durations = []
+        for index in range(img.n_frames):
+            img.seek(index)
+            img.load()
+            durations.append(img.info['duration'])
+    assert durations == [50, 200, 400]
@@ -0,0 +1,25 @@
+import pickle
+import sys
+
+from index_builder import load_build_index, load_builder_class
+
+
+def test_loaded_module_is_registered_and_picklable():
+    module = load_build_index()
+    assert sys.modules['build_index'] is module
+    assert load_build_index() is module
+    assert pickle.loads(pickle.dumps(module.parse_project)) is module.parse_project
+
+
+def test_parallel_scan_matches_serial(portfolio):
+    builder_class = load_builder_class()
+    serial = builder_class(portfolio, jobs=1, cache_backend='json')
+    serial.scan_projects()
+    (portfolio / ".project_cache.json").unlink(missing_ok=True)
+
+    parallel = builder_class(portfolio, jobs=2, cache_backend='json')
+    parallel.scan_projects()
+    assert [p['path'] for p in parallel.projects] == [p['path'] for p in serial.projects]
+    assert [p['technologies'] for p in parallel.projects] == \
+        [p['technologies'] for p in serial.projects]
+    assert len(parallel.projects) == 3
@@ -0,0 +1,62 @@
+import json
+import os
+import sys
+
+import build_daemon
+from conftest import write_project
+
+
+def source_bytes(project_dir):
+    return sum((project_dir / name).stat().st_size
+               for name in ("index.html", "script.js", "styles.css"))
+
+
+def test_metrics_json_counts_bytes_not_characters(build_index, tmp_path):
+    flip = write_project(tmp_path, "challenges/cards/flip", "Flip ✨ Card",
+                         script="// café ☕\nflip()")
+    snake = write_project(tmp_path, "other/games/snake", "Snake",
+                          styles=".board::before { content: '🐍'; }")
+    metrics_file = tmp_path / "metrics.json"
+
+    builder = build_index.ProjectIndexBuilder(tmp_path, cache_backend='json',
+                                              metrics_file=str(metrics_file))
+    builder.build()
+
+    metrics = json.loads(metrics_file.read_text(encoding='utf-8'))
+    assert metrics['parsed_projects'] == 2
+    assert metrics['bytes_read']['parsing'] == source_bytes(flip) + source_bytes(snake)
+    assert {t['path']: t['bytes'] for t in metrics['slowest_projects']} == {
+        "challenges/cards/flip": source_bytes(flip),
+        "other/games/snake": source_bytes(snake)}
+    assert metrics['cache']['misses'] == 2
+    assert 'parsing' in metrics['phases'] and 'rendering' in metrics['phases']
+
+
+def test_metrics_and_stats_are_replaced_not_written_through(build_index, portfolio):
+    metrics_file = portfolio / "metrics.json"
+    stats_file = portfolio / "stats.json"
+    for output in (metrics_file, stats_file):
+        output.write_text("{}", encoding='utf-8')
+        os.link(output, portfolio / f"{output.name}.link")
+
+    build_index.ProjectIndexBuilder(portfolio, cache_backend='json',
+                                    metrics_file=str(metrics_file),
+                                    stats_file=str(stats_file)).build()
+
+    assert json.loads(stats_file.read_text(encoding='utf-8'))['total_projects'] == 3
+    assert json.loads(metrics_file.read_text(encoding='utf-8'))['parsed_projects'] == 3
+    for output in (metrics_file, stats_file):
+        assert (portfolio / f"{output.name}.link").read_text(encoding='utf-8') == "{}"
+
+
+def test_profile_covers_daemon_sessions(build_index, portfolio, monkeypatch):
+    served = []
+    monkeypatch.setattr(build_daemon, 'serve',
+                        lambda builder, socket: served.append(builder) or True)
+    prefix = portfolio / "daemon-profile"
+    monkeypatch.setattr(sys, 'argv', ['build-index.py', '--dir', str(portfolio),
+                                      '--daemon', '--profile', str(prefix)])
+
+    assert build_index.main() == 0
+    assert served
+    assert (portfolio / "daemon-profile.pstats").exists()
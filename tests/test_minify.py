@@ -0,0 +1,143 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from minify import BASE64_DIGITS, minify_css, minify_html, minify_js, vlq
+
+JS_SOURCE = """\
+// Toggle cards on click
+const cards = document.querySelectorAll('.card');   /* all of them */
+let total = 0
+const pattern = /\\/\\*not a comment*\\//g;
+const ratio = total / 2 / cards.length;
+const label = `Cards: ${cards.length > 1 ? `${cards.length} // items` : 'one'}`;
+
+cards.forEach(card => {
+    card.addEventListener('click', () => {
+        card.classList.toggle("flipped");   // flip it
+        total = total + +1
+    });
+});
+"""
+
+CSS_SOURCE = """\
+/* Card styles */
+.card {
+    color: red;
+    background: url("a  b.png");
+}
+
+.card:hover  >  span ,
+.card::after { content: "  /* kept */  "; }
+"""
+
+
+def decode_vlq(encoded):
+    values = []
+    value = shift = 0
+    for char in encoded:
+        digit = BASE64_DIGITS.index(char)
+        value += (digit & 31) << shift
+        if digit & 32:
+            shift += 5
+        else:
+            values.append(-(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+    return values
+
+
+def decode_mappings(mappings):
+    """[(gen_line, gen_col, src_line, src_col)] from a v3 mappings string"""
+    segments = []
+    src_line = src_col = 0
+    for gen_line, line in enumerate(mappings.split(';')):
+        gen_col = 0
+        for segment in filter(None, line.split(',')):
+            delta_col, _source, delta_line, delta_src_col = decode_vlq(segment)
+            gen_col += delta_col
+            src_line += delta_line
+            src_col += delta_src_col
+            segments.append((gen_line, gen_col, src_line, src_col))
+    return segments
+
+
+def assert_maps_back(minified, source_map, source):
+    generated = minified.split('\n')
+    original = source.split('\n')
+    segments = decode_mappings(source_map.mappings())
+    assert segments
+    for gen_line, gen_col, src_line, src_col in segments:
+        assert generated[gen_line][gen_col] == original[src_line][src_col]
+
+
+@pytest.mark.parametrize('value', [0, 1, -1, 15, 16, -16, 1000, -123456])
+def test_vlq_round_trip(value):
+    assert decode_vlq(vlq(value)) == [value]
+
+
+def test_css_drops_comments_and_whitespace_but_not_strings():
+    css, _ = minify_css(CSS_SOURCE)
+    # Spaces after ':' stay: they can be significant in selectors
+    assert css == ('.card{color: red;background: url("a  b.png")}'
+                   '.card:hover > span,.card::after{content: "  /* kept */  "}')
+
+
+def test_css_source_map_points_at_original_text():
+    css, source_map = minify_css(CSS_SOURCE)
+    assert_maps_back(css, source_map, CSS_SOURCE)
+
+
+def test_js_keeps_line_breaks_strings_templates_and_regexes():
+    js, _ = minify_js(JS_SOURCE)
+    lines = js.split('\n')
+    assert "let total=0" in lines
+    assert "total=total + +1" in lines
+    assert "const pattern=/\\/\\*not a comment*\\//g;" in lines
+    assert "const ratio=total / 2 / cards.length;" in lines
+    assert "const label=`Cards: ${cards.length > 1?`${cards.length} // items`:'one'}`;" in lines
+    assert 'card.classList.toggle("flipped");' in lines
+    assert 'Toggle' not in js and 'flip it' not in js and 'all of them' not in js
+
+
+def test_js_source_map_points_at_original_text():
+    js, source_map = minify_js(JS_SOURCE)
+    assert_maps_back(js, source_map, JS_SOURCE)
+    data = json.loads(source_map.to_json('script.js', 'script.src.js'))
+    assert data['version'] == 3
+    assert data['sourcesContent'] == [JS_SOURCE]
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason="needs node")
+def test_minified_js_still_parses(tmp_path):
+    path = tmp_path / "script.js"
+    path.write_text(minify_js(JS_SOURCE)[0], encoding='utf-8')
+    subprocess.run(['node', '--check', str(path)], check=True)
+
+
+def test_html_collapses_whitespace_outside_raw_blocks():
+    page = """<!DOCTYPE html>
+<html>
+  <head>
+    <!-- build note -->
+    <!--[if IE]><p>old</p><![endif]-->
+    <style>
+      body  { margin: 0; }
+    </style>
+    <script type="application/json">{ "keep":   "spacing" }</script>
+  </head>
+  <body>
+    <pre>  keep
+    this  </pre>
+    <p>some     text</p>
+  </body>
+</html>
+"""
+    html = minify_html(page)
+    assert '<!-- build note -->' not in html
+    assert '<!--[if IE]>' in html
+    assert '<style>body{margin: 0}</style>' in html
+    assert '{ "keep":   "spacing" }' in html
+    assert '<pre>  keep\n    this  </pre>' in html
+    assert '<p>some text</p>' in html
@@ -0,0 +1,99 @@
+import json
+import sqlite3
+
+import pytest
+
+from project_cache import JsonProjectCache, SQLiteProjectCache, open_cache
+
+RECORD = {'title': 'Flip Card', 'hash': 'abc', 'stat': ['t', ['index.html', 1, 2, 3]]}
+
+
+@pytest.fixture(params=['sqlite', 'json'])
+def backend(request):
+    return request.param
+
+
+def test_round_trip(tmp_path, backend):
+    cache = open_cache(tmp_path, backend)
+    cache['challenges/cards/flip'] = RECORD
+    cache.save()
+    cache.close()
+
+    reopened = open_cache(tmp_path, backend)
+    assert reopened['challenges/cards/flip'] == RECORD
+    assert 'challenges/cards/missing' not in reopened
+    assert list(reopened) == ['challenges/cards/flip']
+
+
+def test_delete_persists(tmp_path, backend):
+    cache = open_cache(tmp_path, backend)
+    cache['a'] = RECORD
+    cache['b'] = RECORD
+    cache.save()
+    del cache['a']
+    cache.save()
+    cache.close()
+
+    assert set(open_cache(tmp_path, backend)) == {'b'}
+
+
+def test_save_without_changes_writes_nothing(tmp_path):
+    cache = JsonProjectCache(tmp_path / "cache.json")
+    cache.save()
+    assert not (tmp_path / "cache.json").exists()
+
+    cache['a'] = RECORD
+    cache.save()
+    mtime = (tmp_path / "cache.json").stat().st_mtime_ns
+    cache.save()
+    assert (tmp_path / "cache.json").stat().st_mtime_ns == mtime
+
+
+def test_sqlite_only_upserts_dirty_rows(tmp_path):
+    cache = SQLiteProjectCache(tmp_path / "cache.db")
+    cache['a'] = RECORD
+    cache['b'] = RECORD
+    cache.save()
+    assert not cache.dirty
+
+    # A row changed behind the cache's back survives a save that
+    # doesn't touch it
+    conn = sqlite3.connect(tmp_path / "cache.db")
+    with conn:
+        conn.execute("UPDATE projects SET data = ? WHERE key = 'b'",
+                     (json.dumps({'title': 'outside'}),))
+    conn.close()
+    cache['a'] = {**RECORD, 'title': 'changed'}
+    cache.save()
+    cache.close()
+
+    reopened = SQLiteProjectCache(tmp_path / "cache.db")
+    assert reopened['a']['title'] == 'changed'
+    assert reopened['b'] == {'title': 'outside'}
+
+
+def test_sqlite_seeds_from_legacy_json(tmp_path):
+    with open(tmp_path / ".project_cache.json", 'w', encoding='utf-8') as f:
+        json.dump({'a': RECORD}, f)
+    cache = open_cache(tmp_path)
+    assert cache['a'] == RECORD
+
+
+def test_sqlite_replaces_corrupt_database(tmp_path, capsys):
+    (tmp_path / ".project_cache.db").write_bytes(b"not a database" * 100)
+    cache = open_cache(tmp_path)
+    assert len(cache) == 0
+    assert (tmp_path / ".project_cache.db.corrupt").exists()
+    assert "unreadable cache" in capsys.readouterr().out
+
+
+def test_sqlite_drops_rows_from_an_older_schema(tmp_path):
+    conn = sqlite3.connect(tmp_path / ".project_cache.db")
+    with conn:
+        conn.execute("CREATE TABLE projects (key TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        conn.execute("INSERT INTO projects VALUES ('a', '{}')")
+        conn.execute("PRAGMA user_version = 1")
+    conn.close()
+
+    cache = open_cache(tmp_path)
+    assert len(cache) == 0
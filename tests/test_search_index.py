@@ -0,0 +1,37 @@
+import json
+import re
+
+
+def build(builder):
+    builder.build()
+    public = builder.output_file.parent
+    page = (public / "index.html").read_text(encoding='utf-8')
+    name = re.search(r'const SEARCH_INDEX_URL = "([^"]+)"', page).group(1)
+    return public / name
+
+
+def test_index_lists_projects_and_is_referenced_by_the_page(build_index, portfolio):
+    path = build(build_index.ProjectIndexBuilder(portfolio, cache_backend='json',
+                                                 search_index=True))
+    index = json.loads(path.read_text(encoding='utf-8'))
+
+    records = [dict(zip(index['fields'], values)) for values in index['projects']]
+    assert [record['url'] for record in records] == [
+        "/challenges/cards/flip", "/challenges/cards/tilt", "/other/games/snake"]
+    assert index['tokens']['snake'] == [2]
+    assert index['tokens']['jquery'] == [0]
+
+
+def test_unchanged_index_is_not_rewritten(build_index, portfolio):
+    builder = build_index.ProjectIndexBuilder(portfolio, cache_backend='json',
+                                              search_index=True)
+    path = build(builder)
+    inode = path.stat().st_ino
+
+    assert build(builder) == path
+    assert path.stat().st_ino == inode
+
+    (portfolio / "other/games/snake/script.js").write_text("gsap.to(snake)",
+                                                            encoding='utf-8')
+    changed = build(builder)
+    assert changed != path and changed.exists() and not path.exists()
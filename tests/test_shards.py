@@ -0,0 +1,54 @@
+import re
+
+from conftest import write_project
+
+
+def build(build_index, base_dir, shard=True):
+    builder = build_index.ProjectIndexBuilder(base_dir, cache_backend='json',
+                                              shard=shard)
+    builder.build()
+    return builder
+
+
+def test_shards_hold_their_category_and_landing_page_links_them(build_index, portfolio):
+    build(build_index, portfolio)
+    shard_dir = portfolio / "public" / "categories"
+
+    assert sorted(path.name for path in shard_dir.iterdir()) == \
+        ["challenges-cards.html", "other-games.html"]
+    cards = (shard_dir / "challenges-cards.html").read_text(encoding='utf-8')
+    assert "Flip Card" in cards and "Tilt Card" in cards and "Snake" not in cards
+    landing = (portfolio / "public" / "index.html").read_text(encoding='utf-8')
+    assert re.findall(r'href="(categories/[^"]+)"', landing) == \
+        ["categories/challenges-cards.html", "categories/other-games.html"]
+    assert "Flip Card" not in landing
+
+
+def test_unchanged_shards_are_skipped(build_index, portfolio, capsys):
+    builder = build(build_index, portfolio)
+    shard_dir = portfolio / "public" / "categories"
+    inodes = {path.name: path.stat().st_ino for path in shard_dir.iterdir()}
+
+    (portfolio / "other/games/snake/script.js").write_text("ctx.fill()", encoding='utf-8')
+    capsys.readouterr()
+    builder.build()
+
+    updated = re.findall(r'Shard updated: .*/(\S+)', capsys.readouterr().out)
+    assert updated == ["other-games.html"]
+    assert (shard_dir / "challenges-cards.html").stat().st_ino == \
+        inodes["challenges-cards.html"]
+
+
+def test_removed_category_and_unsharded_build_drop_shards(build_index, portfolio):
+    write_project(portfolio, "challenges/forms/login", "Login")
+    build(build_index, portfolio)
+    shard_dir = portfolio / "public" / "categories"
+    assert (shard_dir / "challenges-forms.html").exists()
+
+    for name in ("index.html", "script.js", "styles.css"):
+        (portfolio / "challenges/forms/login" / name).unlink()
+    build(build_index, portfolio)
+    assert not (shard_dir / "challenges-forms.html").exists()
+
+    build(build_index, portfolio, shard=False)
+    assert not shard_dir.exists()
@@ -0,0 +1,62 @@
+import builtins
+import io
+import os
+
+import pytest
+
+
+def scan(build_index, base_dir):
+    builder = build_index.ProjectIndexBuilder(base_dir)
+    builder.scan_projects()
+    builder.save_cache()
+    return builder
+
+
+@pytest.fixture
+def opened_sources(portfolio, monkeypatch):
+    """Paths under the project roots that get opened, recorded from now on"""
+    opened = []
+    real_open = io.open
+    roots = [str(portfolio / "challenges"), str(portfolio / "other")]
+
+    def recording_open(file, *args, **kwargs):
+        if isinstance(file, (str, os.PathLike)) and \
+                os.fspath(file).startswith(tuple(roots)):
+            opened.append(os.path.relpath(file, portfolio))
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, 'open', recording_open)
+    monkeypatch.setattr(io, 'open', recording_open)
+    return opened
+
+
+def test_warm_rebuild_reads_no_source_bytes(build_index, portfolio, request):
+    scan(build_index, portfolio)
+    opened = request.getfixturevalue('opened_sources')
+
+    builder = scan(build_index, portfolio)
+    assert len(builder.projects) == 3
+    assert opened == []
+
+
+def test_touched_page_is_the_only_one_read(build_index, portfolio, request):
+    scan(build_index, portfolio)
+    index = portfolio / "challenges/cards/flip/index.html"
+    os.utime(index, ns=(index.stat().st_atime_ns, index.stat().st_mtime_ns + 10**9))
+    opened = request.getfixturevalue('opened_sources')
+
+    builder = scan(build_index, portfolio)
+    titles = {p['path']: p['title'] for p in builder.projects}
+    assert titles['challenges/cards/flip'] == 'Flip Card'
+    assert opened
+    assert {os.path.dirname(path) for path in opened} == {'challenges/cards/flip'}
+
+
+def test_edited_page_is_reparsed(build_index, portfolio):
+    scan(build_index, portfolio)
+    index = portfolio / "challenges/cards/flip/index.html"
+    index.write_text(index.read_text().replace('Flip Card', 'Flipped'), encoding='utf-8')
+
+    builder = scan(build_index, portfolio)
+    titles = {p['path']: p['title'] for p in builder.projects}
+    assert titles['challenges/cards/flip'] == 'Flipped'
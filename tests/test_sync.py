@@ -0,0 +1,129 @@
+import os
+
+import pytest
+
+import asset_pipeline
+from asset_pipeline import SYNC_MANIFEST, load_manifest, sync_trees
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for rel, text in {
+        'challenges/cards/flip/index.html': '<title>Flip</title>',
+        'challenges/cards/flip/script.js': 'flip()',
+        'challenges/cards/flip/styles.css': '.flip {}',
+        'challenges/cards/flip/.notes': 'ignored',
+        'other/ui/nav/index.html': '<title>Nav</title>',
+    }.items():
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding='utf-8')
+    return tmp_path
+
+
+def sync(base_dir, **kwargs):
+    return sync_trees(base_dir, ['challenges', 'other'], 'public', jobs=1, **kwargs)
+
+
+def test_first_sync_hardlinks_every_file(tree):
+    entries = sync(tree)
+    assert sorted(entries) == [
+        'public/challenges/cards/flip/index.html',
+        'public/challenges/cards/flip/script.js',
+        'public/challenges/cards/flip/styles.css',
+        'public/other/ui/nav/index.html',
+    ]
+    for dest_rel in entries:
+        source = tree / dest_rel.removeprefix('public/')
+        assert os.path.samefile(source, tree / dest_rel)
+    assert not (tree / 'public/challenges/cards/flip/.notes').exists()
+    assert load_manifest(tree / 'public' / SYNC_MANIFEST, 'synced') == entries
+
+
+def test_one_file_edit_syncs_one_file(tree, capsys):
+    sync(tree)
+    source = tree / 'challenges/cards/flip/script.js'
+    # Editors that save by rename give the source a new inode
+    tmp = source.with_name('script.js.new')
+    tmp.write_text('flip(); flop()', encoding='utf-8')
+    os.replace(tmp, source)
+    capsys.readouterr()
+
+    sync(tree)
+    assert "1 synced (1 link), 3 unchanged, 0 removed" in capsys.readouterr().out
+    assert (tree / 'public/challenges/cards/flip/script.js').read_text() == 'flip(); flop()'
+
+
+def test_unchanged_tree_syncs_nothing(tree, capsys):
+    sync(tree)
+    capsys.readouterr()
+    sync(tree)
+    assert "0 synced, 4 unchanged, 0 removed" in capsys.readouterr().out
+
+
+def test_copies_when_links_are_refused(tree, monkeypatch):
+    def refuse(*args):
+        raise OSError(18, "Invalid cross-device link")
+    monkeypatch.setattr(asset_pipeline.os, 'link', refuse)
+    monkeypatch.setattr(asset_pipeline, 'reflink', refuse)
+
+    entries = sync(tree)
+    assert {entry['method'] for entry in entries.values()} == {'copy'}
+    dest = tree / 'public/challenges/cards/flip/script.js'
+    source = tree / 'challenges/cards/flip/script.js'
+    assert not os.path.samefile(source, dest)
+    assert dest.read_text() == 'flip()'
+    # copy2 keeps the mtime, so the next sync needs no reads
+    assert dest.stat().st_mtime_ns == source.stat().st_mtime_ns
+
+
+def test_same_size_copy_is_compared_by_content(tree, capsys):
+    sync(tree, mode='copy')
+    source = tree / 'challenges/cards/flip/script.js'
+    os.utime(source, ns=(0, 10**18))
+    capsys.readouterr()
+
+    sync(tree, mode='copy')
+    assert "0 synced, 4 unchanged" in capsys.readouterr().out
+
+    source.write_text('flop()', encoding='utf-8')
+    sync(tree, mode='copy')
+    assert "1 synced (1 copy)" in capsys.readouterr().out
+    assert (tree / 'public/challenges/cards/flip/script.js').read_text() == 'flop()'
+
+
+def test_removes_stale_outputs_and_empty_dirs(tree):
+    sync(tree)
+    (tree / 'other/ui/nav/index.html').unlink()
+    entries = sync(tree)
+    assert 'public/other/ui/nav/index.html' not in entries
+    assert not (tree / 'public/other/ui').exists()
+    assert (tree / 'public').is_dir()
+
+
+def test_never_removes_files_it_did_not_create(tree):
+    legacy = tree / 'public/challenges/cat/cat-tv/index.html'
+    legacy.parent.mkdir(parents=True)
+    legacy.write_text('tracked by hand', encoding='utf-8')
+    sync(tree)
+    sync(tree)
+    assert legacy.read_text() == 'tracked by hand'
+
+
+def test_excluded_outputs_are_left_alone(tree):
+    sync(tree)
+    page = tree / 'public/challenges/cards/flip/index.html'
+    page.unlink()
+    page.write_text('published page', encoding='utf-8')
+
+    entries = sync(tree, exclude=['public/challenges/cards/flip/index.html'])
+    assert 'public/challenges/cards/flip/index.html' not in entries
+    assert page.read_text() == 'published page'
+    assert (tree / 'challenges/cards/flip/index.html').read_text() == '<title>Flip</title>'
+
+
+def test_parallel_sync_matches_serial(tree):
+    serial = sync_trees(tree, ['challenges', 'other'], 'public', jobs=1, mode='copy')
+    (tree / 'public' / SYNC_MANIFEST).unlink()
+    parallel = sync_trees(tree, ['challenges', 'other'], 'public', jobs=4, mode='copy')
+    assert parallel.keys() == serial.keys()
@@ -0,0 +1,47 @@
+import random
+import re
+
+import pytest
+
+from tech_detector import (DEFAULT_TECHNOLOGIES, TechDetector, marker_pattern,
+                           markers_pattern)
+
+SAMPLES = [
+    "<script src='https://cdn.jsdelivr.net/npm/jquery@3/dist/jquery.min.js'></script>",
+    "const $el = $('.card'); $el.hide();",
+    "import * as THREE from 'three.js'; new THREE.Scene()",
+    "color: #d3d3d3; background: #D3D3D3;",
+    "d3.select('svg'); reactive(); preact(); React.createElement('div')",
+    "<canvas id='stage'></canvas> gsap.to('.box', {x: 100})",
+    "vue-router, Vue.createApp, revue, threejs, squircle-card",
+]
+
+
+@pytest.mark.parametrize('text', SAMPLES)
+def test_grouped_pattern_matches_like_per_marker_pattern(text):
+    markers = sorted({m.lower() for m in [*DEFAULT_TECHNOLOGIES, 'd3', 'p5.js', '@vue']},
+                     key=len, reverse=True)
+    grouped = re.compile(markers_pattern(markers), re.IGNORECASE)
+    separate = re.compile('|'.join(marker_pattern(m) for m in markers), re.IGNORECASE)
+    assert [m.group(0) for m in grouped.finditer(text)] == \
+        [m.group(0) for m in separate.finditer(text)]
+
+
+def test_word_markers_need_word_boundaries():
+    detector = TechDetector({'d3': 'D3', 'react': 'React', '$(': 'jQuery'})
+    assert detector.detect("color: #d3d3d3; reactive()") == []
+    assert detector.detect("d3.select(svg)", "React.render(); $(el)") == \
+        ['D3', 'React', 'jQuery']
+
+
+def test_trie_pattern_matches_flat_alternation_for_many_markers():
+    rng = random.Random(1)
+    markers = {''.join(rng.choice('abcdet.-') for _ in range(rng.randint(2, 8)))
+               for _ in range(2000)}
+    markers = sorted(markers | {m.lower() for m in DEFAULT_TECHNOLOGIES},
+                     key=len, reverse=True)
+    text = ' '.join(SAMPLES) + ' ' + ' '.join(rng.sample(markers, 200))
+    trie = re.compile(markers_pattern(markers), re.IGNORECASE)
+    flat = re.compile('|'.join(marker_pattern(m) for m in markers), re.IGNORECASE)
+    assert [m.group(0) for m in trie.finditer(text)] == \
+        [m.group(0) for m in flat.finditer(text)]
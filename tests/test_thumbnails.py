@@ -0,0 +1,45 @@
+import pytest
+
+from conftest import write_project
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def build(build_index, base_dir):
+    builder = build_index.ProjectIndexBuilder(base_dir)
+    builder.scan_projects()
+    builder.build_thumbnails()
+    return {project['path']: project.get('thumbnail') for project in builder.projects}
+
+
+def test_new_preview_file_is_picked_up(build_index, portfolio):
+    assert build(build_index, portfolio)["challenges/cards/flip"] is None
+
+    Image.new('RGB', (800, 450), 'teal').save(
+        portfolio / "challenges/cards/flip/thumbnail.png")
+
+    thumbnail = build(build_index, portfolio)["challenges/cards/flip"]
+    assert thumbnail is not None
+    assert (portfolio / thumbnail['src']).exists()
+
+
+def test_configured_preview_change_is_picked_up(build_index, portfolio):
+    Image.new('RGB', (800, 450), 'teal').save(portfolio / "shot.png")
+    assert build(build_index, portfolio)["other/games/snake"] is None
+
+    (portfolio / ".index-config.json").write_text(
+        '{"thumbnails": {"other/games/snake": "/shot.png"}}', encoding='utf-8')
+
+    assert build(build_index, portfolio)["other/games/snake"] is not None
+
+
+def test_preview_outside_repo_is_skipped(build_index, tmp_path):
+    base_dir = tmp_path / "repo"
+    project_dir = write_project(base_dir, "other/escape", "Escape")
+    Image.new('RGB', (800, 450), 'teal').save(tmp_path / "outside.png")
+    html = (project_dir / "index.html").read_text(encoding='utf-8')
+    (project_dir / "index.html").write_text(
+        html.replace('<body>', '<body><img src="../../../outside.png">'),
+        encoding='utf-8')
+
+    assert build(build_index, base_dir) == {"other/escape": None}
@@ -0,0 +1,88 @@
+import sys
+
+import pytest
+
+import watcher as watcher_module
+from watcher import (EVENT_HEADER, IN_Q_OVERFLOW, InotifyWatcher, PollingWatcher,
+                     Watcher, iter_dirs)
+
+IGNORE = ["assets", "node_modules", ".*", "__pycache__", "cards/drafts"]
+
+inotify_only = pytest.mark.skipif(not sys.platform.startswith('linux'),
+                                  reason="needs inotify")
+
+
+def test_ignore_globs_match_names_and_paths_below_the_root(tmp_path):
+    watcher = Watcher([tmp_path / "challenges"], IGNORE)
+    root = tmp_path / "challenges"
+    assert watcher.ignored(root / "cards/flip/.index.html.swp")
+    assert watcher.ignored(root / "cards/flip/node_modules")
+    assert watcher.ignored(root / "cards/drafts")
+    assert not watcher.ignored(root / "cards/flip/script.js")
+    assert not watcher.ignored(root / "other-cards/drafts")
+    assert not watcher.ignored(root)
+    assert not watcher.ignored(tmp_path / "elsewhere/.git")
+
+
+def test_iter_dirs_prunes_ignored_directories(tmp_path):
+    for rel in ["cards/flip/assets/img", "cards/drafts/wip", ".git/objects", "games/snake"]:
+        (tmp_path / rel).mkdir(parents=True)
+    watcher = Watcher([tmp_path], IGNORE)
+    found = {p.relative_to(tmp_path).as_posix() for p in iter_dirs(tmp_path, watcher.ignored)}
+    assert found == {'.', 'cards', 'cards/flip', 'games', 'games/snake'}
+
+
+def test_polling_watcher_skips_ignored_paths(tmp_path):
+    (tmp_path / "cards/flip").mkdir(parents=True)
+    watcher = PollingWatcher([tmp_path], ignore=IGNORE)
+    (tmp_path / "cards/flip/.swp").write_text("x")
+    (tmp_path / "cards/flip/script.js").write_text("x")
+    changed = watcher.diff()
+    assert tmp_path / "cards/flip/script.js" in changed
+    assert tmp_path / "cards/flip/.swp" not in changed
+
+
+@inotify_only
+def test_inotify_reports_changes_outside_ignored_dirs(tmp_path):
+    (tmp_path / "cards/flip").mkdir(parents=True)
+    (tmp_path / "cards/flip/assets").mkdir()
+    watcher = InotifyWatcher([tmp_path], debounce=0.05, ignore=IGNORE)
+    try:
+        (tmp_path / "cards/flip/assets/logo.png").write_bytes(b"png")
+        (tmp_path / "cards/flip/script.js").write_text("x")
+        assert watcher.wait() == {tmp_path / "cards/flip/script.js"}
+    finally:
+        watcher.close()
+
+
+@inotify_only
+def test_inotify_overflow_asks_for_a_full_rescan(tmp_path, monkeypatch, capsys):
+    watcher = InotifyWatcher([tmp_path], debounce=0.05)
+    pending = [EVENT_HEADER.pack(-1, IN_Q_OVERFLOW, 0, 0)]
+
+    def read(fd, size):
+        if pending:
+            return pending.pop()
+        raise BlockingIOError
+
+    def select(readable, writable, errors, timeout=None):
+        return (readable if pending else []), [], []
+
+    monkeypatch.setattr(watcher_module.os, 'read', read)
+    monkeypatch.setattr(watcher_module.select, 'select', select)
+    try:
+        assert watcher.wait() is None
+        assert "overflowed" in capsys.readouterr().out
+        assert not watcher.overflowed
+    finally:
+        monkeypatch.undo()
+        watcher.close()
+
+
+def test_rebuild_without_paths_rescans_everything(build_index, portfolio, capsys):
+    builder = build_index.ProjectIndexBuilder(portfolio, cache_backend='json')
+    builder.build()
+    capsys.readouterr()
+    builder.rebuild(None)
+    assert "Rescanning projects" in capsys.readouterr().out
+    assert len(builder.projects) == 3